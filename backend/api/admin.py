@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Dataset, Equipment, DatasetSummary
+from .models import Dataset, Equipment, DatasetSummary, Job, UploadSession
 
 
 @admin.register(Dataset)
@@ -34,3 +34,24 @@ class DatasetSummaryAdmin(admin.ModelAdmin):
         "avg_temperature",
     ]
     search_fields = ["dataset__name"]
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "kind",
+        "state",
+        "user",
+        "rows_processed",
+        "attempts",
+        "lease_owner",
+        "created_at",
+    ]
+    list_filter = ["kind", "state"]
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ["id", "filename", "user", "total_size", "part_size", "state", "created_at"]
+    list_filter = ["state"]
@@ -0,0 +1,303 @@
+"""
+Chart-ready analytics, computed at ingest.
+
+``TypeStats`` folds count/mean/M2/min/max of every numeric field per equipment
+type, one vectorised groupby per chunk, and merges like the other parts of
+``SummaryAccumulator``. ``build`` turns an accumulator into the artifact the
+``analytics/`` endpoint serves and clients draw from without the rows:
+
+* ``by_type``: per-type count and mean/std/min/max of each parameter
+* ``histograms``: exact row counts in equal-width bins over [min, max] per
+  parameter (``Histograms``). The range is only known once every row has been
+  read, so ingest counts them in a second pass over the stored rows; appends
+  that stay within the range add their counts, others recount
+* ``correlation``: the Pearson matrix of the parameters, from ``CoMoments``
+
+``scatter_sample`` and ``density`` give a bounded-size view of two parameters
+against each other for the ``scatter/`` endpoint, whatever the row count.
+"""
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from . import storage
+from .sketches import Moments
+
+MAX_BINS = 200
+SCATTER_MODES = ('sample', 'density')
+MAX_SCATTER_POINTS = 20000
+MAX_DENSITY_BINS = 256
+
+
+def default_bins():
+    return getattr(settings, 'ANALYTICS_HISTOGRAM_BINS', 15)
+
+
+def default_scatter_points():
+    return getattr(settings, 'SCATTER_SAMPLE_POINTS', 2000)
+
+
+def default_density_bins():
+    return getattr(settings, 'DENSITY_GRID_BINS', 64)
+
+
+class TypeStats:
+    def __init__(self, fields):
+        self.fields = list(fields)
+        # {type: {field: {"moments": Moments, "min": float, "max": float}}}
+        self.groups = {}
+
+    def update(self, columns):
+        if not len(columns['equipment_type']):
+            return self
+        frame = pd.DataFrame({field: columns[field] for field in self.fields})
+        grouped = frame.groupby(columns['equipment_type'], sort=False)
+        count = grouped.size()
+        mean, m2 = grouped.mean(), grouped.var(ddof=0) * count.to_numpy()[:, None]
+        low, high = grouped.min(), grouped.max()
+        for eq_type in count.index:
+            self._merge_group(eq_type, {
+                field: {
+                    "moments": Moments(int(count[eq_type]), float(mean.at[eq_type, field]),
+                                       float(m2.at[eq_type, field])),
+                    "min": float(low.at[eq_type, field]),
+                    "max": float(high.at[eq_type, field]),
+                }
+                for field in self.fields
+            })
+        return self
+
+    def _merge_group(self, eq_type, stats):
+        ours = self.groups.get(eq_type)
+        if ours is None:
+            self.groups[eq_type] = stats
+            return
+        for field, theirs in stats.items():
+            ours[field]["moments"].merge(theirs["moments"])
+            ours[field]["min"] = min(ours[field]["min"], theirs["min"])
+            ours[field]["max"] = max(ours[field]["max"], theirs["max"])
+
+    def merge(self, other):
+        for eq_type, stats in other.groups.items():
+            self._merge_group(eq_type, {
+                field: {**values, "moments": Moments(**values["moments"].to_dict())}
+                for field, values in stats.items()
+            })
+        return self
+
+    def rows(self):
+        """One entry per type, most common first."""
+        result = []
+        for eq_type, stats in self.groups.items():
+            entry = {"type": eq_type, "count": next(iter(stats.values()))["moments"].count}
+            for field, values in stats.items():
+                entry[field] = {
+                    "mean": values["moments"].mean,
+                    "std": values["moments"].std(),
+                    "min": values["min"],
+                    "max": values["max"],
+                }
+            result.append(entry)
+        return sorted(result, key=lambda entry: (-entry["count"], entry["type"]))
+
+    def to_dict(self):
+        return {
+            eq_type: {
+                field: {**values["moments"].to_dict(), "min": values["min"], "max": values["max"]}
+                for field, values in stats.items()
+            }
+            for eq_type, stats in self.groups.items()
+        }
+
+    @classmethod
+    def from_dict(cls, fields, data):
+        stats = cls(fields)
+        stats.groups = {
+            eq_type: {
+                field: {"moments": Moments.from_dict(values), "min": values["min"], "max": values["max"]}
+                for field, values in by_field.items()
+            }
+            for eq_type, by_field in data.items()
+        }
+        return stats
+
+
+class Histograms:
+    """
+    Exact counts of each parameter in equal-width bins over a fixed range,
+    folded a chunk at a time with ``np.histogram`` (the last bin includes its
+    upper edge). Counts over the same edges merge by adding them.
+    """
+
+    def __init__(self, ranges, bins):
+        # ranges: {field: (low, high)}
+        self.edges = {field: bin_edges(low, high, bins) for field, (low, high) in ranges.items()}
+        self.counts = {field: np.zeros(bins, dtype=np.int64) for field in ranges}
+
+    def update(self, columns):
+        for field, edges in self.edges.items():
+            self.counts[field] += np.histogram(columns[field], bins=edges)[0]
+        return self
+
+    def feed(self, chunks):
+        """Yields ``chunks`` unchanged, counting each one on the way through."""
+        for columns in chunks:
+            self.update(columns)
+            yield columns
+
+    def covers(self, mins, maxs):
+        """Whether values between ``mins`` and ``maxs`` all fall within the bins."""
+        return all(
+            mins[field] is None or (edges[0] <= mins[field] and maxs[field] <= edges[-1])
+            for field, edges in self.edges.items()
+        )
+
+    def merge(self, other):
+        for field, counts in other.counts.items():
+            self.counts[field] += counts
+        return self
+
+    def to_dict(self):
+        return {
+            field: {"edges": self.edges[field].tolist(), "counts": self.counts[field].tolist()}
+            for field in self.edges
+        }
+
+    @classmethod
+    def from_dict(cls, data, counts=True):
+        """Histograms over the bins in ``data``; with ``counts=False`` they start empty."""
+        histograms = cls({}, 0)
+        for field, values in data.items():
+            histograms.edges[field] = np.asarray(values["edges"], dtype=float)
+            histograms.counts[field] = (
+                np.asarray(values["counts"], dtype=np.int64) if counts
+                else np.zeros(len(values["counts"]), dtype=np.int64)
+            )
+        return histograms
+
+
+def build(accumulator, histograms):
+    """The analytics artifact for a SummaryAccumulator and its ``Histograms.to_dict()``."""
+    fields = list(accumulator.sketches)
+    return {
+        "count": accumulator.count,
+        "by_type": accumulator.type_stats.rows(),
+        "histograms": histograms,
+        "correlation": {"fields": fields, "matrix": accumulator.comoments.correlation()},
+    }
+
+
+def allocate(counts, budget):
+    """
+    Splits a point budget across groups of the given sizes. Each group first
+    gets an equal floor, so rare types still show, and the rest is shared in
+    proportion to size. No group gets more than it has.
+    """
+    if sum(counts) <= budget:
+        return list(counts)
+    floor = budget // (4 * len(counts))
+    quotas = [min(count, floor) for count in counts]
+    left = [count - quota for count, quota in zip(counts, quotas)]
+    spare, remaining = budget - sum(quotas), sum(left)
+    shares = [divmod(spare * rest, remaining) for rest in left]
+    quotas = [quota + share for quota, (share, _) in zip(quotas, shares)]
+    # Points lost to rounding go to the largest remainders
+    by_remainder = sorted(range(len(counts)), key=lambda index: -shares[index][1])
+    for index in by_remainder[:budget - sum(quotas)]:
+        quotas[index] += 1
+    return quotas
+
+
+def scatter_sample(columns, x, y, points, seed):
+    """
+    At most ``points`` rows of ``x`` against ``y``, sampled per equipment type
+    (see ``allocate``): one group per type, most common first, each with the
+    type's full ``count`` so clients can tell how much was left out. The same
+    seed picks the same rows.
+    """
+    types, codes = np.unique(columns['equipment_type'].astype(str), return_inverse=True)
+    counts = np.bincount(codes, minlength=len(types))
+    order = sorted(range(len(types)), key=lambda index: (-counts[index], types[index]))
+    quotas = allocate([int(counts[index]) for index in order], points)
+    rng = np.random.default_rng(seed)
+    groups = []
+    for index, quota in zip(order, quotas):
+        members = np.flatnonzero(codes == index)
+        if quota < len(members):
+            members = np.sort(rng.choice(members, quota, replace=False))
+        groups.append({
+            "type": str(types[index]),
+            "count": int(counts[index]),
+            "x": columns[x][members].tolist(),
+            "y": columns[y][members].tolist(),
+        })
+    return {"mode": "sample", "x": x, "y": y, "count": len(codes), "points": sum(quotas), "groups": groups}
+
+
+def bin_edges(low, high, bins):
+    """``bins + 1`` equal-width edges over [low, high], widened around a single value."""
+    low, high = (0.0, 1.0) if low is None else (float(low), float(high))
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def _edges(values, bins):
+    return bin_edges(values.min(), values.max(), bins) if len(values) else bin_edges(None, None, bins)
+
+
+def density(columns, x, y, bins):
+    """
+    Row counts of ``x`` against ``y`` on a ``bins`` x ``bins`` grid spanning
+    both ranges, for heatmap / hexbin-style rendering: ``counts[i][j]`` is the
+    number of rows in x bin ``i`` and y bin ``j``.
+    """
+    x_edges, y_edges = _edges(columns[x], bins), _edges(columns[y], bins)
+    counts, _, _ = np.histogram2d(columns[x], columns[y], bins=[x_edges, y_edges])
+    counts = counts.astype(np.int64)
+    return {
+        "mode": "density",
+        "x": x,
+        "y": y,
+        "count": len(columns[x]),
+        "x_edges": x_edges.tolist(),
+        "y_edges": y_edges.tolist(),
+        "counts": counts.tolist(),
+        "max": int(counts.max()),
+    }
+
+
+def _bounded_int(value, name, maximum):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+    if not 1 <= number <= maximum:
+        raise ValueError(f"{name} must be between 1 and {maximum}")
+    return number
+
+
+def parse_bins(value):
+    """``?bins=`` as an int in [1, MAX_BINS]; raises ValueError otherwise."""
+    return _bounded_int(value, "bins", MAX_BINS)
+
+
+def parse_scatter(params):
+    """
+    The scatter endpoint's query as ``{"x", "y", "mode", "resolution"}``:
+    ``?x=``/``?y=`` (temperature vs pressure by default), ``?mode=sample`` with
+    ``?points=`` or ``?mode=density`` with ``?bins=``. Raises ValueError.
+    """
+    x, y = params.get('x', 'temperature'), params.get('y', 'pressure')
+    if x not in storage.NUMERIC or y not in storage.NUMERIC:
+        raise ValueError(f"x and y must be one of {', '.join(storage.NUMERIC)}")
+    if x == y:
+        raise ValueError("x and y must be different parameters")
+    mode = params.get('mode', 'sample')
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SCATTER_MODES)}")
+    if mode == 'sample':
+        resolution = _bounded_int(params.get('points', default_scatter_points()), "points", MAX_SCATTER_POINTS)
+    else:
+        resolution = _bounded_int(params.get('bins', default_density_bins()), "bins", MAX_DENSITY_BINS)
+    return {"x": x, "y": y, "mode": mode, "resolution": resolution}
@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+
+def _configure_sqlite(sender, connection, **kwargs):
+    # WAL lets API requests keep reading while a worker holds the write lock
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode=WAL;")
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        connection_created.connect(_configure_sqlite)
+
+        from rest_framework.authtoken.models import Token
+        from . import authentication
+
+        # Cached token lookups are dropped on logout and when the user changes
+        post_delete.connect(authentication.token_deleted, sender=Token)
+        post_save.connect(authentication.user_saved, sender=settings.AUTH_USER_MODEL)
@@ -0,0 +1,154 @@
+"""
+Token authentication without a query per request.
+
+DRF's ``TokenAuthentication`` joins Token and User on every request.
+``CachedTokenAuthentication`` remembers looked-up tokens in two places:
+
+* a bounded LRU in this process (``AUTH_TOKEN_CACHE_SIZE`` entries) holding
+  the token with its user, which answers without touching the database
+* the cache backend (``AUTH_TOKEN_CACHE_TTL`` seconds, see ``caching.py``),
+  holding only the user's id and a random stamp, so a hit there costs a
+  primary-key lookup of the user instead of the join. It is used only when
+  the backend is shared between processes (``caching.shared()``, as by
+  default).
+
+Deleting a token (logout) or saving its user (password change, deactivation)
+deletes both entries. With a shared backend every hit in the LRU is checked
+against the shared entry first: a local copy whose stamp is no longer there
+was revoked by some other process, and is looked up again. Local copies are
+kept ``AUTH_TOKEN_LOCAL_TTL`` seconds. With a per-process backend nothing can
+tell other processes about a revocation, so their copies are kept only
+``AUTH_TOKEN_PRIVATE_TTL`` seconds. Unknown tokens and inactive users are not
+cached, and fail exactly as with ``TokenAuthentication``.
+"""
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.authentication import TokenAuthentication
+
+from . import caching
+
+
+def local_size():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 1024)
+
+
+def local_ttl():
+    if caching.shared():
+        return getattr(settings, 'AUTH_TOKEN_LOCAL_TTL', 30)
+    # No process hears about another's revocations: keep copies brief
+    return getattr(settings, 'AUTH_TOKEN_PRIVATE_TTL', 3)
+
+
+def shared_ttl():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 300)
+
+
+class LRUCache:
+    """A thread-safe LRU whose entries also expire after a TTL."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, size):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local = LRUCache()
+
+
+def _cache_key(token_key):
+    # Token keys are credentials; keep them out of cache keys and file names
+    return "auth:token:" + hashlib.sha256(token_key.encode()).hexdigest()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Drop-in ``TokenAuthentication`` that caches token lookups (see module docstring)."""
+
+    def authenticate_credentials(self, key):
+        cache_key = _cache_key(key)
+        shared = caching.shared()
+        # [user id, stamp], deleted by invalidate() in whichever process revokes the token
+        stored = caching.backend().get(cache_key) if shared else None
+        entry = _local.get(cache_key)
+        if entry is not None and shared and entry[1] != _stamp(stored):
+            entry = None
+        if entry is None:
+            token = self._shared_token(key, stored)
+            if token is None:
+                # Raises AuthenticationFailed for unknown tokens and inactive users
+                _, token = super().authenticate_credentials(key)
+                if shared:
+                    # The user's id only: no credentials or password hashes in the cache
+                    stored = [token.user_id, uuid.uuid4().hex]
+                    caching.backend().set(cache_key, stored, shared_ttl())
+            entry = (token, _stamp(stored))
+            _local.set(cache_key, entry, local_ttl(), local_size())
+        token = entry[0]
+        # Each request gets its own user, so nothing a view sets on it is shared
+        return (copy.copy(token.user), token)
+
+    def _shared_token(self, key, stored):
+        if _stamp(stored) is None:
+            return None
+        user = get_user_model().objects.filter(pk=stored[0], is_active=True).first()
+        if user is None:
+            return None
+        return self.get_model()(key=key, user=user)
+
+
+def _stamp(stored):
+    if isinstance(stored, (list, tuple)) and len(stored) == 2:
+        return stored[1]
+    return None
+
+
+def invalidate(*token_keys):
+    for token_key in token_keys:
+        cache_key = _cache_key(token_key)
+        _local.discard(cache_key)
+        caching.backend().delete(cache_key)
+
+
+def token_deleted(sender, instance, **kwargs):
+    invalidate(instance.key)
+
+
+def user_saved(sender, instance, created, **kwargs):
+    # The password, is_active or anything else cached with the token may have changed
+    if created:
+        return
+    from rest_framework.authtoken.models import Token
+
+    invalidate(*Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
@@ -0,0 +1,180 @@
+"""
+Multi-file batch ingest.
+
+A batch is several uploaded files, or a zip of CSVs, received in one request.
+Every file is stored and content-hashed first; files the user already has are
+reported as duplicates. The rest are read and validated in parallel worker
+processes (``BATCH_INGEST_WORKERS``), which never touch the database and
+spill the validated chunks to disk rather than sending them back. The parent
+then streams each file's chunks into its own Dataset in its own transaction,
+so one bad file does not stop the others and memory stays at a chunk per
+process whatever the size of the batch.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+from . import uploads
+from .services import DatasetService, CSVValidationError
+
+logger = logging.getLogger('api')
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def max_files():
+    return getattr(settings, 'BATCH_INGEST_MAX_FILES', 100)
+
+
+def worker_count(files):
+    workers = getattr(settings, 'BATCH_INGEST_WORKERS', None) or min(4, os.cpu_count() or 1)
+    return max(1, min(workers, files))
+
+
+def _store_member(archive, info):
+    """Copies one zip member to ``uploads/`` and returns ``(full_path, sha256)``."""
+    full_path, out = uploads.create_upload_file(os.path.basename(info.filename))
+    digest = hashlib.sha256()
+    with archive.open(info) as member, out:
+        for block in iter(lambda: member.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+            out.write(block)
+    return full_path, digest.hexdigest()
+
+
+def store_files(files):
+    """
+    Stores every uploaded file and returns one entry per CSV: ``{"file", "name",
+    "path", "content_hash"}``, or ``{"file", "error"}`` for files that cannot be
+    used. Zips are expanded into their CSV members.
+    """
+    entries = []
+    for file in files:
+        if file.name.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(file) as archive:
+                    members = [
+                        info for info in archive.infolist()
+                        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                    ]
+                    for info in members:
+                        label = f"{file.name}/{info.filename}"
+                        if (info.filename.lower().endswith('.zip')
+                                or not DatasetService.is_supported_upload(info.filename)):
+                            entries.append({"file": label, "error": "Not a CSV file."})
+                            continue
+                        full_path, content_hash = _store_member(archive, info)
+                        entries.append({
+                            "file": label,
+                            "name": DatasetService.dataset_name(os.path.basename(info.filename)),
+                            "path": full_path,
+                            "content_hash": content_hash,
+                        })
+            except zipfile.BadZipFile as e:
+                entries.append({"file": file.name, "error": f"Could not read zip file: {e}"})
+            continue
+
+        if not DatasetService.is_supported_upload(file.name):
+            entries.append({"file": file.name, "error": "Not a CSV file."})
+            continue
+        full_path, content_hash = DatasetService.store_upload(file)
+        entries.append({
+            "file": file.name,
+            "name": DatasetService.dataset_name(file.name),
+            "path": full_path,
+            "content_hash": content_hash,
+        })
+    return entries
+
+
+def _parse_all(paths):
+    """
+    Yields ``DatasetService.parse_file`` results in order, from worker processes.
+    With a single worker nothing is parsed ahead: ``{}`` lets the file be read as
+    it is ingested.
+    """
+    workers = worker_count(len(paths))
+    if workers == 1:
+        for _ in paths:
+            yield {}
+        return
+    # Spawned rather than forked: a gunicorn worker holds database connections and threads
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as pool:
+        yield from pool.map(DatasetService.parse_file, paths)
+
+
+def ingest(entries, user):
+    """
+    Ingests stored batch entries for ``user`` and returns one result per entry:
+    ``{"file", "status": "created" | "duplicate" | "failed", "dataset", "rows",
+    "error", "details"}`` (keys that do not apply are omitted).
+    """
+    results = []
+    pending = []
+    for entry in entries:
+        if "error" in entry:
+            results.append({"file": entry["file"], "status": "failed", "error": entry["error"]})
+            continue
+        existing = DatasetService.find_existing(user, entry["content_hash"])
+        if existing is None:
+            # A file repeated inside the same batch is a duplicate of the first copy
+            existing = next(
+                (p for p in pending if p["content_hash"] == entry["content_hash"]), None
+            )
+        if existing is not None:
+            DatasetService.remove_file(entry["path"])
+            results.append({"file": entry["file"], "status": "duplicate", "of": existing})
+            continue
+        result = {"file": entry["file"], "status": "created"}
+        results.append(result)
+        pending.append({**entry, "result": result})
+
+    parsed = _parse_all([entry["path"] for entry in pending])
+    for entry, outcome in zip(pending, parsed):
+        result = entry["result"]
+        if "error" in outcome:
+            DatasetService.remove_file(entry["path"])
+            result.update(status="failed", error=outcome["error"])
+            if "details" in outcome:
+                result["details"] = outcome["details"]
+            continue
+        spill = outcome.get("spill")
+        try:
+            dataset = DatasetService.ingest_file(
+                entry["path"], entry["name"], user, content_hash=entry["content_hash"],
+                chunks=DatasetService.iter_spilled_chunks(spill) if spill else None,
+            )
+        except CSVValidationError as e:
+            result.update(status="failed", error=str(e), details=e.report.as_dict())
+        except ValueError as e:
+            result.update(status="failed", error=str(e))
+        except Exception:
+            logger.exception(f"Batch ingest of {entry['file']} failed")
+            result.update(status="failed", error="An internal error occurred while processing the file.")
+        else:
+            result.update(dataset=dataset.id, rows=dataset.row_count)
+        finally:
+            if spill:
+                DatasetService.remove_file(spill)
+
+    for result in results:
+        # Duplicates resolve to the stored dataset, or to the earlier file in this batch
+        of = result.pop("of", None)
+        if of is None:
+            continue
+        if isinstance(of, dict):
+            first = of["result"]
+            if first["status"] == "failed":
+                result.update(status="failed", error=first["error"])
+            else:
+                result["dataset"] = first["dataset"]
+        else:
+            result["dataset"] = of.id
+    return results
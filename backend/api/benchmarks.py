@@ -0,0 +1,246 @@
+"""
+Benchmarks for the ingest and serving paths.
+
+Run through ``python manage.py benchmark <target>``. Anything written to the
+database happens inside a transaction that is rolled back afterwards.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from . import encoding, loaders, storage
+from .models import Dataset, Equipment
+from .serializers import EquipmentSerializer
+from .services import DatasetService
+
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+def synthetic_frame(rows, seed=0):
+    """Builds a CSV-shaped DataFrame with ``rows`` random equipment records."""
+    rng = np.random.default_rng(seed)
+    types = rng.choice(EQUIPMENT_TYPES, size=rows)
+    return pd.DataFrame({
+        'Equipment Name': [f" {t}-{i} " for i, t in enumerate(types)],
+        'Type': types,
+        'Flowrate': rng.normal(120, 30, rows).round(2),
+        'Pressure': rng.normal(6, 1.5, rows).round(2),
+        'Temperature': rng.normal(115, 15, rows).round(2),
+    })
+
+
+@contextmanager
+def rolled_back():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def scratch_dataset():
+    """Creates a throwaway user and dataset; call inside ``rolled_back()``."""
+    user = User.objects.create_user(username=f"bench-{time.time_ns()}")
+    return Dataset.objects.create(name="benchmark.csv", uploaded_by=user, file_path="")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def _build_equipment_iterrows(dataset, df):
+    # The pre-columnar construction, kept here as the baseline
+    return [
+        Equipment(
+            dataset=dataset,
+            equipment_name=str(row['Equipment Name']).strip(),
+            equipment_type=str(row['Type']).strip(),
+            flowrate=float(row['Flowrate']),
+            pressure=float(row['Pressure']),
+            temperature=float(row['Temperature'])
+        )
+        for _, row in df.iterrows()
+    ]
+
+
+def _build_equipment_columnar(dataset, df):
+    columns, _ = DatasetService.validate_and_coerce(df)
+    return DatasetService.build_equipment(dataset, columns)
+
+
+def bench_build(rows, insert=False, **options):
+    """iterrows() vs validate-and-coerce + columnar construction, optionally including the insert."""
+    df = synthetic_frame(rows)
+    results = []
+    with rolled_back():
+        dataset = scratch_dataset()
+        for case, build in (
+            ('iterrows', _build_equipment_iterrows),
+            ('columnar', _build_equipment_columnar),
+        ):
+            def run():
+                objs = build(dataset, df)
+                if insert:
+                    Equipment.objects.bulk_create(objs, batch_size=DatasetService.bulk_batch_size())
+                return objs
+
+            seconds, _ = timed(run)
+            results.append({'case': case, 'rows': rows, 'seconds': seconds})
+    return results
+
+
+def _equipment_table_bytes():
+    """Bytes used by the Equipment table and its indexes (SQLite only)."""
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN ("
+            "SELECT name FROM sqlite_master WHERE tbl_name = 'api_equipment')"
+        )
+        return cursor.fetchone()[0]
+
+
+def _mb(size):
+    return "n/a" if size is None else f"{size / 1024 ** 2:.1f}MB"
+
+
+def bench_storage(rows, **options):
+    """Load time and disk footprint: Equipment rows vs. columnar Parquet."""
+    columns, _ = DatasetService.validate_and_coerce(synthetic_frame(rows))
+    results = []
+    with rolled_back():
+        dataset = scratch_dataset()
+
+        before = _equipment_table_bytes()
+        Equipment.objects.bulk_create(
+            DatasetService.build_equipment(dataset, columns),
+            batch_size=DatasetService.bulk_batch_size(),
+        )
+        after = _equipment_table_bytes()
+        seconds, _ = timed(lambda: pd.DataFrame(list(dataset.equipment.values())))
+        results.append({
+            'case': 'rows (ORM .values())', 'rows': rows, 'seconds': seconds,
+            'disk': _mb(None if before is None else after - before),
+        })
+
+        try:
+            with storage.ColumnarWriter(dataset.id) as writer:
+                writer.write(columns)
+            dataset.columnar_path = writer.directory
+            seconds, _ = timed(storage.load_frame, dataset)
+            size = sum(
+                os.path.getsize(os.path.join(writer.directory, f))
+                for f in os.listdir(writer.directory)
+            )
+            results.append({
+                'case': 'columnar (Parquet)', 'rows': rows, 'seconds': seconds, 'disk': _mb(size),
+            })
+        finally:
+            storage.remove(dataset)
+    return results
+
+
+def bench_loader(rows, **options):
+    """Insert throughput of each bulk loader usable on the current database."""
+    columns, _ = DatasetService.validate_and_coerce(synthetic_frame(rows))
+    chunk = DatasetService.bulk_batch_size() * 10
+    names = ['orm', 'executemany'] + (['copy'] if connection.vendor == 'postgresql' else [])
+    results = []
+    for name in names:
+        with rolled_back():
+            dataset = scratch_dataset()
+
+            def run():
+                with loaders.get_loader(name=name) as loader:
+                    for start in range(0, rows, chunk):
+                        loader.load(dataset, {k: v[start:start + chunk] for k, v in columns.items()})
+
+            seconds, _ = timed(run)
+            results.append({'case': name, 'rows': rows, 'seconds': seconds, 'vendor': connection.vendor})
+    return results
+
+
+def bench_serialize(rows, **options):
+    """Rows to JSON bytes: EquipmentSerializer vs. values_list tuples, whole and streamed."""
+    from rest_framework.renderers import JSONRenderer
+
+    columns, _ = DatasetService.validate_and_coerce(synthetic_frame(rows))
+    encoder = 'orjson' if encoding.orjson is not None else 'json'
+    results = []
+    with rolled_back():
+        dataset = scratch_dataset()
+        Equipment.objects.bulk_create(
+            DatasetService.build_equipment(dataset, columns),
+            batch_size=DatasetService.bulk_batch_size(),
+        )
+        cases = (
+            ('serializer', lambda: JSONRenderer().render(
+                EquipmentSerializer(dataset.equipment.order_by('id'), many=True).data)),
+            (f'values_list+{encoder}', lambda: encoding.dumps(encoding.equipment_rows(dataset))),
+            (f'stream+{encoder}', lambda: b''.join(encoding.iter_equipment_json(dataset))),
+        )
+        baseline = None
+        for case, run in cases:
+            seconds, body = timed(run)
+            baseline = baseline or body
+            results.append({
+                'case': case, 'rows': rows, 'seconds': seconds,
+                'bytes': len(body), 'identical': body == baseline,
+            })
+    return results
+
+
+def bench_auth(rows, **options):
+    """
+    Authentication cost per request (``rows`` requests): DRF's TokenAuthentication
+    against CachedTokenAuthentication, cold (first request) and warm.
+    """
+    from rest_framework.authtoken.models import Token
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from . import authentication
+
+    results = []
+    with rolled_back():
+        user = User.objects.create_user(username=f"bench-{time.time_ns()}")
+        token = Token.objects.create(user=user)
+        factory = APIRequestFactory()
+        requests = [
+            Request(factory.get('/api/history/', HTTP_AUTHORIZATION=f"Token {token.key}"))
+            for _ in range(rows)
+        ]
+        cases = (
+            ('token', TokenAuthentication()),
+            ('cached-token', authentication.CachedTokenAuthentication()),
+        )
+        for case, authenticator in cases:
+            authentication.invalidate(token.key)
+            queries = []
+            with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                first, _ = timed(authenticator.authenticate, requests[0])
+                seconds, _ = timed(lambda: [authenticator.authenticate(request) for request in requests])
+            results.append({
+                'case': case, 'rows': rows, 'seconds': seconds,
+                'us_per_request': round(seconds / rows * 1e6, 1),
+                'first_us': round(first * 1e6, 1),
+                'queries': len(queries),
+            })
+        authentication.invalidate(token.key)
+    return results
+
+
+BENCHMARKS = {
+    'auth': bench_auth,
+    'build': bench_build,
+    'loader': bench_loader,
+    'serialize': bench_serialize,
+    'storage': bench_storage,
+}
@@ -0,0 +1,126 @@
+"""
+Per-user cache for dataset listings and summaries.
+
+History, the dataset list and summaries only change when a user's datasets
+do: on upload, append, history clear and retention purges. Their payloads are
+kept in Django's cache (``API_CACHE_ALIAS``; file-based by default, so every
+gunicorn worker and background worker sees the same entries) under keys
+namespaced per user by a generation number::
+
+    api:<user_id>:<generation>:<name>
+
+``invalidate(user_id)`` bumps the user's generation once the change has
+committed, so every entry built before it becomes unreachable and simply
+expires. Neither locmem nor the file-based backend can delete by prefix, and
+nothing has to remember which keys were written. A generation that is evicted
+comes back as a new timestamp, never as a number that was already used.
+
+Hit and miss counts are kept per process and per name (``stats()``); they are
+reported by the health check. ``API_CACHE_ENABLED = False`` bypasses the
+cache entirely, and so does a backend private to each process (locmem,
+dummy): a change made by a worker or another gunicorn process could not
+invalidate its entries.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+_MISSING = object()
+_lock = threading.Lock()
+_counts = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def enabled():
+    return getattr(settings, 'API_CACHE_ENABLED', True) and shared()
+
+
+def timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+
+def backend():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def shared():
+    """Whether the cache backend is seen by every process, so invalidations reach them all."""
+    return not isinstance(backend(), (LocMemCache, DummyCache))
+
+
+def _generation_key(user_id):
+    return f"api:{user_id}:generation"
+
+
+def generation(user_id):
+    key = _generation_key(user_id)
+    current = backend().get(key)
+    if current is None:
+        # add() keeps whichever generation another process stored first
+        backend().add(key, time.time_ns(), timeout=None)
+        current = backend().get(key)
+    return current
+
+
+def key(user_id, name):
+    return f"api:{user_id}:{generation(user_id)}:{name}"
+
+
+def _count(name, outcome):
+    # "datasets?page=2" and "summary:7" are counted as "datasets" and "summary"
+    group = name.split('?', 1)[0].split(':', 1)[0]
+    with _lock:
+        _counts[group][outcome] += 1
+
+
+def get_or_set(user_id, name, compute):
+    """
+    The cached value of ``name`` in ``user_id``'s namespace, computed with
+    ``compute()`` and stored on a miss.
+    """
+    if not enabled():
+        return compute()
+    cache_key = key(user_id, name)
+    value = backend().get(cache_key, _MISSING)
+    if value is not _MISSING:
+        _count(name, "hits")
+        return value
+    _count(name, "misses")
+    value = compute()
+    backend().set(cache_key, value, timeout())
+    return value
+
+
+def _bump(user_id):
+    try:
+        backend().incr(_generation_key(user_id))
+    except ValueError:
+        # Evicted: start over from a generation no entry can have
+        backend().set(_generation_key(user_id), time.time_ns(), timeout=None)
+
+
+def invalidate(*user_ids):
+    """
+    Drops everything cached for the given users once the current transaction
+    commits (right away outside of one), so no request can cache the old state
+    in between.
+    """
+    for user_id in set(user_ids):
+        transaction.on_commit(lambda user_id=user_id: _bump(user_id))
+
+
+def stats():
+    """``{"enabled", "hits", "misses", "by_name": {name: {"hits", "misses"}}}`` for this process."""
+    with _lock:
+        by_name = {name: dict(counts) for name, counts in _counts.items()}
+    return {
+        "enabled": enabled(),
+        "hits": sum(counts["hits"] for counts in by_name.values()),
+        "misses": sum(counts["misses"] for counts in by_name.values()),
+        "by_name": by_name,
+    }
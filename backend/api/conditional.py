@@ -0,0 +1,69 @@
+"""
+Conditional GETs for dataset resources.
+
+A dataset's rows, summary and report only change when rows are appended,
+which bumps ``Dataset.version``. Each representation therefore gets a strong
+ETag derived from the dataset id, version and content hash, plus what selects
+the representation (path, query string and negotiated media type), and
+``Last-Modified`` from ``Dataset.updated_at``. A client that sends back a
+matching ``If-None-Match`` (or a fresh ``If-Modified-Since``) gets an empty
+``304 Not Modified`` without the view doing any work.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def cache_control():
+    # Responses are per user, and must be revalidated because appends change them
+    return getattr(settings, 'DATASET_CACHE_CONTROL', 'private, no-cache')
+
+
+def dataset_etag(request, dataset, variant=''):
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = '|'.join([
+        str(dataset.id),
+        str(dataset.version),
+        dataset.content_hash,
+        request.path,
+        request.GET.urlencode(),
+        renderer.media_type if renderer is not None else '',
+        variant,
+    ])
+    return '"%s"' % hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def add_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control()
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def dataset_resource(view=None, variant=''):
+    """
+    Decorates a detail view of ``DatasetViewSet`` with ETag / Last-Modified
+    validators and answers matching conditional requests with 304. ``variant``
+    goes into the ETag of representations that also depend on something other
+    than the dataset, such as the report layout.
+    """
+    if view is None:
+        return functools.partial(dataset_resource, variant=variant)
+
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        dataset = self.get_object()
+        etag = dataset_etag(request, dataset, variant)
+        # HTTP dates have whole seconds
+        last_modified = int(dataset.updated_at.timestamp())
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view(self, request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            add_validators(response, etag, last_modified)
+        return response
+    return wrapper
@@ -0,0 +1,109 @@
+"""
+Fast JSON for bulk equipment rows.
+
+``EquipmentSerializer(..., many=True)`` builds a model instance and runs the
+DRF field machinery for every row, which dominates large responses. Rows here
+are read as tuples with ``values_list`` and encoded with orjson when it is
+installed (the stdlib ``json`` otherwise), producing exactly the serializer's
+output. ``iter_equipment_json`` streams a whole dataset as a JSON array a
+chunk at a time, so memory stays flat however many rows there are.
+``equipment_columns`` gives the same rows column by column for the columnar
+formats in ``renderers``.
+"""
+import json
+
+import numpy as np
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import storage
+from .models import Equipment
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Same fields, in the same order, as EquipmentSerializer
+FIELDS = ['id'] + storage.FIELDS
+STREAM_CHUNK_SIZE = 5000
+
+_encoder = JSONEncoder()
+
+
+def dumps(data):
+    """Compact JSON bytes; types orjson does not know fall back to DRF's encoder."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, cls=JSONEncoder, separators=(',', ':'), allow_nan=False).encode()
+
+
+def equipment_rows(dataset):
+    """The dataset's rows as serializer-shaped dicts, without building model instances."""
+    if not dataset.has_rows:
+        return storage.equipment_records(dataset)
+    rows = Equipment.objects.filter(dataset_id=dataset.id).order_by('id').values_list(*FIELDS)
+    return [dict(zip(FIELDS, row)) for row in rows]
+
+
+def equipment_columns(dataset):
+    """
+    The dataset's rows as ``{field: array}`` (same fields as ``equipment_rows``):
+    NumPy arrays for ``id`` and the numeric fields, object arrays for text.
+    """
+    if not dataset.has_rows:
+        columns = storage.load_columns(dataset)
+        return {'id': np.arange(1, len(columns['flowrate']) + 1), **columns}
+    queryset = Equipment.objects.filter(dataset_id=dataset.id).order_by('id')
+    if storage.has_columnar(dataset):
+        # Both copies are written in ingest order, so only the ids need the table
+        ids = np.fromiter(queryset.values_list('id', flat=True), dtype=np.int64)
+        columns = storage.load_columns(dataset)
+        if len(ids) == len(columns['flowrate']):
+            return {'id': ids, **columns}
+    rows = queryset.values_list(*FIELDS)
+    values = list(zip(*rows)) or [()] * len(FIELDS)
+    return {
+        field: np.asarray(
+            column, dtype=np.int64 if field == 'id' else float if field in storage.NUMERIC else object
+        )
+        for field, column in zip(FIELDS, values)
+    }
+
+
+def rows_to_columns(rows):
+    """Turns serializer-shaped row dicts into ``{field: list}``."""
+    return {field: [row[field] for row in rows] for field in FIELDS}
+
+
+def _row_chunks(dataset):
+    if not dataset.has_rows:
+        for frame in storage.iter_frames(dataset, batch_size=STREAM_CHUNK_SIZE):
+            yield frame[FIELDS].to_dict(orient='records')
+        return
+    rows = (
+        Equipment.objects.filter(dataset_id=dataset.id).order_by('id')
+        .values_list(*FIELDS).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(dict(zip(FIELDS, row)))
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_equipment_json(dataset):
+    """Yields the dataset's rows as one JSON array, in byte chunks."""
+    yield b'['
+    first = True
+    for chunk in _row_chunks(dataset):
+        if not chunk:
+            continue
+        # Each chunk is encoded as an array; drop its brackets and join with commas
+        body = dumps(chunk)[1:-1]
+        yield body if first else b',' + body
+        first = False
+    yield b']'
+
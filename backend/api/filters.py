@@ -0,0 +1,83 @@
+"""
+Server-side filters for equipment rows.
+
+``EquipmentFilters.from_params`` reads ``name`` (substring), ``search``
+(substring of name or type), ``type`` (exact) and ``<field>_min`` /
+``<field>_max`` for flowrate, pressure and temperature. The same filters
+apply to an Equipment queryset or to a frame read from columnar storage.
+"""
+import pandas as pd
+from django.db.models import Q
+
+RANGE_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+
+class EquipmentFilters:
+    def __init__(self, name='', search='', equipment_type='', ranges=None):
+        self.name = name
+        self.search = search
+        self.equipment_type = equipment_type
+        # {field: (min or None, max or None)}
+        self.ranges = ranges or {}
+
+    @classmethod
+    def from_params(cls, params):
+        """Raises ValueError for a non-numeric bound."""
+        ranges = {}
+        for field in RANGE_FIELDS:
+            bounds = []
+            for bound in ('min', 'max'):
+                value = params.get(f"{field}_{bound}")
+                if value in (None, ''):
+                    bounds.append(None)
+                    continue
+                try:
+                    bounds.append(float(value))
+                except ValueError:
+                    raise ValueError(f"{field}_{bound} must be a number")
+            if bounds != [None, None]:
+                ranges[field] = tuple(bounds)
+        return cls(
+            name=params.get('name', '').strip(),
+            search=params.get('search', '').strip(),
+            equipment_type=params.get('type', '').strip(),
+            ranges=ranges,
+        )
+
+    def __bool__(self):
+        return bool(self.name or self.search or self.equipment_type or self.ranges)
+
+    def apply(self, queryset):
+        if self.name:
+            queryset = queryset.filter(equipment_name__icontains=self.name)
+        if self.search:
+            queryset = queryset.filter(
+                Q(equipment_name__icontains=self.search) | Q(equipment_type__icontains=self.search)
+            )
+        if self.equipment_type:
+            queryset = queryset.filter(equipment_type=self.equipment_type)
+        for field, (low, high) in self.ranges.items():
+            if low is not None:
+                queryset = queryset.filter(**{f"{field}__gte": low})
+            if high is not None:
+                queryset = queryset.filter(**{f"{field}__lte": high})
+        return queryset
+
+    def mask(self, frame):
+        """Boolean Series selecting the matching rows of an equipment-shaped DataFrame."""
+        keep = pd.Series(True, index=frame.index)
+        if self.name:
+            keep &= frame['equipment_name'].str.contains(self.name, case=False, regex=False)
+        if self.search:
+            keep &= (
+                frame['equipment_name'].str.contains(self.search, case=False, regex=False)
+                | frame['equipment_type'].astype(str).str.contains(self.search, case=False, regex=False)
+            )
+        if self.equipment_type:
+            keep &= frame['equipment_type'].astype(str) == self.equipment_type
+        for field, (low, high) in self.ranges.items():
+            if low is not None:
+                keep &= frame[field] >= low
+            if high is not None:
+                keep &= frame[field] <= high
+        return keep
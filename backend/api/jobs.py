@@ -0,0 +1,211 @@
+"""
+Database-backed background jobs.
+
+Jobs are rows in the ``Job`` table. A worker claims one by flipping it to
+``running`` and stamping its own id and a lease expiry with a single
+conditional UPDATE; only one worker can win that UPDATE, and a job whose
+lease has expired (its worker died) becomes claimable again. Handlers are
+registered per job kind with ``@handler``.
+
+A worker runs its jobs inline, or with ``--concurrency N`` in a pool of N
+processes (``run_in_process``), so slow jobs such as report renders neither
+block each other nor the worker's claiming loop.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import retention
+from .models import Dataset, Job
+from .services import DatasetService, CSVValidationError
+
+logger = logging.getLogger('api')
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Registers ``fn(job)`` as the handler for jobs of ``kind``."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def lease_seconds():
+    return getattr(settings, 'JOB_LEASE_SECONDS', 900)
+
+
+def enqueue(kind, user=None, dataset=None, payload=None):
+    return Job.objects.create(kind=kind, user=user, dataset=dataset, payload=payload or {})
+
+
+def enqueue_claimed(kind, worker_id, user=None, dataset=None, payload=None):
+    """
+    Creates a job already claimed by ``worker_id``, for callers that ``run`` it
+    themselves: it is never queued, so no worker can claim it while its lease holds.
+    """
+    now = timezone.now()
+    return Job.objects.create(
+        kind=kind, user=user, dataset=dataset, payload=payload or {},
+        state=Job.STATE_RUNNING, lease_owner=worker_id,
+        lease_expires_at=now + timedelta(seconds=lease_seconds()), attempts=1, started_at=now,
+    )
+
+
+def claim_next(worker_id, kinds=None):
+    """
+    Claims the oldest runnable job for ``worker_id`` and returns it, or ``None``.
+    """
+    now = timezone.now()
+    max_attempts = getattr(settings, 'JOB_MAX_ATTEMPTS', 3)
+    runnable = Job.objects.filter(
+        Q(state=Job.STATE_QUEUED)
+        | Q(state=Job.STATE_RUNNING, lease_expires_at__lt=now)
+    )
+    if kinds:
+        runnable = runnable.filter(kind__in=kinds)
+
+    for job in runnable.order_by('created_at')[:20]:
+        if job.attempts >= max_attempts:
+            Job.objects.filter(pk=job.pk, attempts=job.attempts, state=job.state).update(
+                state=Job.STATE_FAILED,
+                error={"error": f"Gave up after {job.attempts} attempts (worker lease expired)."},
+                finished_at=now,
+            )
+            continue
+        # Compare-and-swap on the state we just read; losing the race updates 0 rows
+        claimed = Job.objects.filter(
+            pk=job.pk, state=job.state, attempts=job.attempts, lease_owner=job.lease_owner
+        ).update(
+            state=Job.STATE_RUNNING,
+            lease_owner=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds()),
+            attempts=F('attempts') + 1,
+            started_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=job.pk)
+    return None
+
+
+def renew_lease(job, **fields):
+    """
+    Extends the lease of a job we own, optionally updating progress fields.
+    Returns 0 once the job is no longer ours (its lease expired and it was re-claimed).
+    """
+    return Job.objects.filter(pk=job.pk, lease_owner=job.lease_owner).update(
+        lease_expires_at=timezone.now() + timedelta(seconds=lease_seconds()), **fields
+    )
+
+
+def finish(job, state, **fields):
+    if state == Job.STATE_SUCCEEDED:
+        fields.setdefault('progress', 1.0)
+    Job.objects.filter(pk=job.pk, lease_owner=job.lease_owner).update(
+        state=state, finished_at=timezone.now(), lease_expires_at=None, **fields
+    )
+
+
+def run(job):
+    """Runs a claimed job through its handler and records the outcome."""
+    fn = HANDLERS.get(job.kind)
+    if fn is None:
+        finish(job, Job.STATE_FAILED, error={"error": f"Unknown job kind: {job.kind}"})
+        return
+
+    try:
+        fn(job)
+    except CSVValidationError as e:
+        finish(job, Job.STATE_FAILED, error={"error": str(e), "details": e.report.as_dict()})
+    except ValueError as e:
+        finish(job, Job.STATE_FAILED, error={"error": str(e)})
+    except Exception as e:
+        logger.exception(f"Job {job.pk} ({job.kind}) crashed")
+        finish(job, Job.STATE_FAILED, error={"error": f"Internal error: {e}"})
+
+
+def run_in_process(job_id):
+    """Pool process entry point: runs the job ``job_id``, already claimed by the parent worker."""
+    try:
+        run(Job.objects.get(pk=job_id))
+    finally:
+        connections.close_all()
+
+
+@handler(Job.KIND_INGEST)
+def ingest(job):
+    def on_progress(rows):
+        # Runs between chunk commits, so pollers see the count and the lease stays ours
+        if not renew_lease(job, rows_processed=rows):
+            raise ValueError("The job was taken over by another worker.")
+
+    payload = job.payload
+    file_path = payload['file_path']
+    content_hash = payload.get('content_hash', '')
+    idempotency_key = payload.get('idempotency_key', '')
+
+    # Rows committed by an earlier attempt whose worker died mid-ingest
+    DatasetService.discard_staged(
+        Dataset.all_objects.filter(uploaded_by=job.user, file_path=file_path, ingesting=True)
+    )
+    # An identical upload may have finished while this one was queued, or this
+    # job's own dataset committed just before its worker died
+    dataset = DatasetService.find_existing(job.user, content_hash, idempotency_key)
+    if dataset is not None:
+        if dataset.file_path != file_path:
+            DatasetService.remove_file(file_path)
+    else:
+        dataset = DatasetService.ingest_file(
+            file_path, payload['name'], job.user, on_progress=on_progress,
+            content_hash=content_hash, idempotency_key=idempotency_key, staged=True,
+        )
+    finish(job, Job.STATE_SUCCEEDED, dataset=dataset, rows_processed=dataset.row_count)
+    logger.info(f"Job {job.pk} ingested dataset {dataset.id} ({dataset.row_count} rows)")
+
+
+@handler(Job.KIND_RETENTION)
+def enforce_retention(job):
+    removed = retention.enforce(job.user)
+    finish(job, Job.STATE_SUCCEEDED, rows_processed=removed)
+
+
+@handler(Job.KIND_PURGE)
+def purge_deleted(job):
+    removed = retention.purge(retention.deleted_ids(job.user))
+    finish(job, Job.STATE_SUCCEEDED, rows_processed=removed)
+
+
+@handler(Job.KIND_REPORT)
+def render_report(job):
+    from . import reports
+
+    # The dataset may have been deleted (SET_NULL) or hidden since the job was queued
+    dataset = job.dataset
+    if dataset is None or dataset.deleted_at is not None:
+        raise ValueError("The dataset no longer exists.")
+
+    reported = [0.0]
+
+    def on_progress(fraction):
+        # A write per percent at most, which also keeps the lease alive
+        if fraction - reported[0] >= 0.01:
+            reported[0] = fraction
+            renew_lease(job, progress=fraction)
+
+    # The version rendered: downloads check it is still the dataset's current one
+    version = dataset.version
+    if reports.cached_pdf(dataset) is None:
+        # Downloads are served from the file, so it is kept even if over the cache budget
+        reports.render_to_cache(dataset, on_progress, required=True)
+    finish(job, Job.STATE_SUCCEEDED, payload={**job.payload, "version": version})
+
+
+@handler(Job.KIND_REMOVE_FILES)
+def remove_files(job):
+    retention.remove_files(job.payload.get('paths', []), job.payload.get('dataset_ids', []))
+    finish(job, Job.STATE_SUCCEEDED)
@@ -0,0 +1,148 @@
+"""
+Bulk loaders for Equipment rows.
+
+``DatasetService`` hands each validated chunk (typed column arrays from
+``validate_and_coerce``) to a loader picked for the database behind
+``DATABASES['default']``:
+
+* PostgreSQL streams the chunk through ``COPY ... FROM STDIN``.
+* SQLite runs one prepared ``executemany`` INSERT per chunk, with the page
+  cache raised for the duration of the load.
+* Anything else falls back to ``bulk_create``.
+
+``EQUIPMENT_BULK_LOADER`` ("auto", "copy", "executemany" or "orm") overrides
+the automatic choice. Loaders are context managers; open one per ingest or append.
+"""
+import io
+
+import pandas as pd
+from django.conf import settings
+from django.db import connection as default_connection
+
+from .models import Equipment
+
+FIELDS = ['dataset_id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+
+def _columns(connection):
+    table = connection.ops.quote_name(Equipment._meta.db_table)
+    names = ", ".join(
+        connection.ops.quote_name(Equipment._meta.get_field(field).column) for field in FIELDS
+    )
+    return table, names
+
+
+class BulkLoader:
+    """Base loader: ``load(dataset, columns)`` inserts one chunk and returns its row count."""
+
+    name = None
+
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+
+    def load(self, dataset, columns):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class OrmLoader(BulkLoader):
+    """Portable fallback through ``bulk_create``."""
+
+    name = 'orm'
+
+    def load(self, dataset, columns):
+        from .services import DatasetService
+
+        objs = DatasetService.build_equipment(dataset, columns)
+        Equipment.objects.using(self.connection.alias).bulk_create(
+            objs, batch_size=DatasetService.bulk_batch_size()
+        )
+        return len(objs)
+
+
+class ExecutemanyLoader(BulkLoader):
+    """
+    One prepared INSERT executed over the whole chunk (SQLite). The page cache is
+    enlarged while the loader is open and restored on exit; pragmas that SQLite
+    refuses to change inside a transaction (synchronous, temp_store) are left alone.
+    """
+
+    name = 'executemany'
+    PRAGMAS = {'cache_size': -64000}  # 64MB
+
+    def __enter__(self):
+        self._saved = {}
+        if self.connection.vendor == 'sqlite':
+            with self.connection.cursor() as cursor:
+                for pragma, value in self.PRAGMAS.items():
+                    cursor.execute(f"PRAGMA {pragma}")
+                    self._saved[pragma] = cursor.fetchone()[0]
+                    cursor.execute(f"PRAGMA {pragma} = {int(value)}")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._saved:
+            with self.connection.cursor() as cursor:
+                for pragma, value in self._saved.items():
+                    cursor.execute(f"PRAGMA {pragma} = {int(value)}")
+        return False
+
+    def load(self, dataset, columns):
+        table, names = _columns(self.connection)
+        rows = list(zip(
+            [dataset.id] * len(columns['equipment_name']),
+            columns['equipment_name'].tolist(),
+            columns['equipment_type'].tolist(),
+            columns['flowrate'].tolist(),
+            columns['pressure'].tolist(),
+            columns['temperature'].tolist(),
+        ))
+        sql = f"INSERT INTO {table} ({names}) VALUES ({', '.join(['%s'] * len(FIELDS))})"
+        with self.connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        return len(rows)
+
+
+class CopyLoader(BulkLoader):
+    """Streams the chunk as CSV through ``COPY FROM STDIN`` (PostgreSQL, psycopg 2 or 3)."""
+
+    name = 'copy'
+
+    def load(self, dataset, columns):
+        table, names = _columns(self.connection)
+        frame = pd.DataFrame({field: columns[field] for field in FIELDS[1:]})
+        frame.insert(0, 'dataset_id', dataset.id)
+        buffer = io.StringIO()
+        frame.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+
+        sql = f"COPY {table} ({names}) FROM STDIN WITH (FORMAT csv)"
+        self.connection.ensure_connection()
+        with self.connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        return len(frame)
+
+
+LOADERS = {loader.name: loader for loader in (OrmLoader, ExecutemanyLoader, CopyLoader)}
+VENDOR_LOADERS = {'postgresql': CopyLoader, 'sqlite': ExecutemanyLoader}
+
+
+def get_loader(connection=None, name=None):
+    """Returns the loader for ``connection`` (the default database unless given)."""
+    connection = connection or default_connection
+    name = name or getattr(settings, 'EQUIPMENT_BULK_LOADER', 'auto')
+    if name == 'auto':
+        return VENDOR_LOADERS.get(connection.vendor, OrmLoader)(connection)
+    if name not in LOADERS:
+        raise ValueError(f"Unknown EQUIPMENT_BULK_LOADER: {name}")
+    return LOADERS[name](connection)
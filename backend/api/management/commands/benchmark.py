@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Runs an ingest/serving benchmark against synthetic data and prints rows per second."
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=sorted(BENCHMARKS))
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[100_000, 1_000_000],
+            help="Synthetic dataset sizes to run (default: 100000 1000000)",
+        )
+        parser.add_argument(
+            "--insert", action="store_true",
+            help="Include the database insert where the target supports it",
+        )
+
+    def handle(self, *args, **options):
+        bench = BENCHMARKS[options["target"]]
+        self.stdout.write(f"{'case':<24}{'rows':>12}{'seconds':>12}{'rows/s':>14}")
+        for rows in options["rows"]:
+            if rows <= 0:
+                raise CommandError("--rows values must be positive")
+            for result in bench(rows, insert=options["insert"]):
+                rate = result["rows"] / result["seconds"] if result["seconds"] else float("inf")
+                extra = "  ".join(f"{k}={v}" for k, v in result.items()
+                                  if k not in ("case", "rows", "seconds"))
+                self.stdout.write(
+                    f"{result['case']:<24}{result['rows']:>12}{result['seconds']:>12.3f}{rate:>14,.0f}"
+                    + (f"  {extra}" if extra else "")
+                )
@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections
+
+from api import jobs, workers
+
+
+class Command(BaseCommand):
+    help = "Runs a background worker that claims and executes queued jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Drain the queue and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--poll-interval", type=float,
+            default=getattr(settings, "JOB_POLL_INTERVAL", 1.0),
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument(
+            "--kind", action="append", dest="kinds",
+            help="Only run jobs of this kind (repeatable)",
+        )
+        parser.add_argument(
+            "--worker-id", default=f"{socket.gethostname()}:{os.getpid()}",
+            help="Lease owner name recorded on claimed jobs",
+        )
+        parser.add_argument(
+            "--concurrency", type=int,
+            default=getattr(settings, "JOB_CONCURRENCY", 1),
+            help="Jobs run at once, each in its own process (default 1: run inline)",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        worker_id = options["worker_id"]
+        concurrency = options["concurrency"]
+        pool = None
+        if concurrency > 1:
+            # Fresh interpreters: no database connection or lock is inherited from this one
+            pool = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=workers.init_process,
+            )
+        running = set()
+        self.stdout.write(f"Worker {worker_id} started ({concurrency} at a time)")
+        while not self.stopping:
+            if running:
+                running = self._reap(running)
+                if len(running) >= concurrency:
+                    running = self._reap(running, timeout=options["poll_interval"])
+                    continue
+
+            close_old_connections()
+            try:
+                job = jobs.claim_next(worker_id, kinds=options["kinds"])
+            except OperationalError as e:
+                # e.g. SQLite "database is locked" while another worker commits
+                self.stderr.write(f"Could not claim a job: {e}")
+                job = None
+
+            if job is not None:
+                self.stdout.write(f"Running {job}")
+                if pool is None:
+                    jobs.run(job)
+                else:
+                    running.add(pool.submit(jobs.run_in_process, job.pk))
+                continue
+            if options["once"] and not running:
+                break
+            if running:
+                running = self._reap(running, timeout=options["poll_interval"])
+            else:
+                time.sleep(options["poll_interval"])
+        if pool is not None:
+            # Jobs already handed to the pool are finished, not abandoned
+            pool.shutdown(wait=True)
+        self.stdout.write(f"Worker {worker_id} stopped")
+
+    def _reap(self, running, timeout=0):
+        """Waits up to ``timeout`` for a pooled job to end; returns those still running."""
+        done, running = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            # jobs.run records failures on the job; this is a crash of the process itself
+            if future.exception() is not None:
+                self.stderr.write(f"Worker process failed: {future.exception()}")
+        return running
+
+    def _stop(self, signum, frame):
+        # Finish the current job, then exit
+        self.stopping = True
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='idempotency_key',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['uploaded_by', 'content_hash'], name='api_dataset_uploade_1ebc1d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['uploaded_by', 'idempotency_key'], name='api_dataset_uploade_be1228_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_dataset_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='columnar_path',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='has_rows',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_dataset_columnar_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetsummary',
+            name='aggregates',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_datasetsummary_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetsummary',
+            name='sketches',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:57
+
+from django.db import migrations, models
+import django.db.models.manager
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_datasetsummary_sketches'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='dataset',
+            options={'base_manager_name': 'all_objects'},
+        ),
+        migrations.AlterModelManagers(
+            name='dataset',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['uploaded_by', 'deleted_at'], name='api_dataset_uploade_63551e_idx'),
+        ),
+    ]
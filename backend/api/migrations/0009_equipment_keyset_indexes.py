@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_dataset_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='equipment',
+            name='dataset',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='equipment', to='api.dataset'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['dataset', 'id'], name='api_equipme_dataset_9e2ef6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['dataset', 'equipment_type', 'id'], name='api_equipme_dataset_cb9a08_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_equipment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
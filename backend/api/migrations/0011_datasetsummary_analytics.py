@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_dataset_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datasetsummary',
+            name='analytics',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
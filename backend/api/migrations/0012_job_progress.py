@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_datasetsummary_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_job_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='ingesting',
+            field=models.BooleanField(default=False),
+        ),
+    ]
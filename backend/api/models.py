@@ -1,21 +1,56 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 
 
+class LiveDatasetManager(models.Manager):
+    """Hides datasets that are soft-deleted and waiting to be purged, or still being ingested."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True, ingesting=False)
+
+
 class Dataset(models.Model):
     name = models.CharField(max_length=255)
     uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     row_count = models.IntegerField(default=0)
     file_path = models.CharField(max_length=500)
+    # SHA-256 of the uploaded bytes, used to detect re-uploads of the same export
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    idempotency_key = models.CharField(max_length=255, blank=True, default="")
+    # Directory of Parquet files holding the rows (see api.storage); empty if none
+    columnar_path = models.CharField(max_length=500, blank=True, default="")
+    # False when rows were written only to columnar storage, not to Equipment
+    has_rows = models.BooleanField(default=True)
+    # Set when the dataset is cleared; its rows and files are purged in the background
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # Set while a background ingest commits the rows chunk by chunk (see DatasetService.ingest_file)
+    ingesting = models.BooleanField(default=False)
+    # Bumped whenever the rows change (appends); part of every ETag (see api.conditional)
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = LiveDatasetManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        base_manager_name = "all_objects"
+        indexes = [
+            models.Index(fields=["uploaded_by", "content_hash"]),
+            models.Index(fields=["uploaded_by", "idempotency_key"]),
+            models.Index(fields=["uploaded_by", "deleted_at"]),
+        ]
 
     def __str__(self):
         return self.name
 
 
 class Equipment(models.Model):
+    # Indexed through the composite indexes below, which lead with dataset_id
     dataset = models.ForeignKey(
-        Dataset, on_delete=models.CASCADE, related_name="equipment"
+        Dataset, on_delete=models.CASCADE, related_name="equipment", db_index=False
     )
     equipment_name = models.CharField(max_length=255)
     equipment_type = models.CharField(max_length=100)
@@ -23,6 +58,14 @@ class Equipment(models.Model):
     pressure = models.FloatField()
     temperature = models.FloatField()
 
+    class Meta:
+        indexes = [
+            # Keyset pages: WHERE dataset_id = ? AND id > ? ORDER BY id
+            models.Index(fields=["dataset", "id"]),
+            # The same, filtered to one equipment type
+            models.Index(fields=["dataset", "equipment_type", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.equipment_name} ({self.equipment_type})"
 
@@ -42,6 +85,100 @@ class DatasetSummary(models.Model):
     max_pressure = models.FloatField()
     min_temperature = models.FloatField()
     max_temperature = models.FloatField()
+    # Mergeable SummaryAccumulator state (count, sum, sumsq, min, max, type counts,
+    # per-type moments, co-moments)
+    aggregates = models.JSONField(default=dict, blank=True)
+    # Per numeric field: moments and a t-digest (see sketches.py) for std and quantiles
+    sketches = models.JSONField(default=dict, blank=True)
+    # Chart-ready per-type stats, histograms and correlation (see analytics.py)
+    analytics = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"Summary for {self.dataset.name}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work stored in the database. Workers started with
+    ``manage.py run_worker`` claim jobs by taking a time-limited lease, so any
+    number of processes or hosts can drain the same table.
+    """
+
+    KIND_INGEST = "ingest"
+    KIND_RETENTION = "retention"
+    KIND_REMOVE_FILES = "remove_files"
+    KIND_PURGE = "purge"
+    KIND_REPORT = "report"
+
+    STATE_QUEUED = "queued"
+    STATE_RUNNING = "running"
+    STATE_SUCCEEDED = "succeeded"
+    STATE_FAILED = "failed"
+    STATE_CHOICES = [
+        (STATE_QUEUED, "Queued"),
+        (STATE_RUNNING, "Running"),
+        (STATE_SUCCEEDED, "Succeeded"),
+        (STATE_FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=32)
+    state = models.CharField(max_length=16, choices=STATE_CHOICES, default=STATE_QUEUED)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name="jobs"
+    )
+    dataset = models.ForeignKey(
+        Dataset, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs"
+    )
+    payload = models.JSONField(default=dict, blank=True)
+    error = models.JSONField(null=True, blank=True)
+    rows_processed = models.BigIntegerField(default=0)
+    # Fraction done, for jobs that can tell (reports); 1 once succeeded
+    progress = models.FloatField(default=0)
+    attempts = models.IntegerField(default=0)
+    lease_owner = models.CharField(max_length=128, blank=True, default="")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["state", "created_at"])]
+
+    def __str__(self):
+        return f"{self.kind} job #{self.pk} ({self.state})"
+
+
+class UploadSession(models.Model):
+    """
+    A resumable upload: the client PUTs numbered parts of ``part_size`` bytes
+    (the last one may be shorter) and then completes the session, which
+    stitches the parts together and hands the file to the ingest pipeline.
+    """
+
+    STATE_OPEN = "open"
+    STATE_COMPLETED = "completed"
+    STATE_CHOICES = [
+        (STATE_OPEN, "Open"),
+        (STATE_COMPLETED, "Completed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    part_size = models.BigIntegerField()
+    state = models.CharField(max_length=16, choices=STATE_CHOICES, default=STATE_OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def part_count(self):
+        return max(1, -(-self.total_size // self.part_size))
+
+    def expected_part_size(self, number):
+        if number == self.part_count - 1:
+            return self.total_size - number * self.part_size
+        return self.part_size
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.filename})"
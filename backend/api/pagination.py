@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination for equipment rows.
+
+Pages are ordered by id. The cursor handed back with each page is an opaque
+token for the last id on it, and the next page is ``id > cursor``: an index
+range scan on ``(dataset_id, id)`` that costs the same on page 1 and page
+20,000, unlike OFFSET. Rows kept only in columnar storage use their 1-based
+position as id and are paged the same way.
+"""
+import base64
+import itertools
+
+from django.conf import settings
+from django.http import QueryDict
+
+from . import storage
+from .models import Equipment
+
+FIELDS = ['id', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+
+def page_size(params):
+    default = getattr(settings, 'EQUIPMENT_PAGE_SIZE', 50)
+    maximum = getattr(settings, 'EQUIPMENT_PAGE_MAX_SIZE', 1000)
+    try:
+        limit = int(params.get('limit', default))
+    except ValueError:
+        raise ValueError("limit must be a positive integer")
+    if limit <= 0:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Returns the id the cursor points past (0 for no cursor). Raises ValueError if invalid."""
+    if not value:
+        return 0
+    try:
+        raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+        prefix, last_id = raw.split(':', 1)
+        if prefix != 'id':
+            raise ValueError
+        return int(last_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def _rows_from_table(dataset, filters, after, limit):
+    queryset = Equipment.objects.filter(dataset_id=dataset.id, id__gt=after)
+    return list(filters.apply(queryset).order_by('id').values(*FIELDS)[:limit + 1])
+
+
+def _rows_from_columnar(dataset, filters, after, limit):
+    matches = (frame[filters.mask(frame)] if filters else frame
+               for frame in storage.iter_frames(dataset, start=after))
+    rows = []
+    for frame in matches:
+        rows.extend(itertools.islice(frame[FIELDS].to_dict(orient='records'), limit + 1 - len(rows)))
+        if len(rows) > limit:
+            break
+    return rows
+
+
+def equipment_page(request, dataset, filters):
+    """
+    One page of the dataset's rows matching ``filters``:
+    ``{"results", "next_cursor", "next"}``, ``next`` being the URL of the
+    following page (both ``None`` on the last page).
+    """
+    params = request.query_params
+    limit = page_size(params)
+    after = decode_cursor(params.get('cursor'))
+    if dataset.has_rows:
+        rows = _rows_from_table(dataset, filters, after, limit)
+    else:
+        rows = _rows_from_columnar(dataset, filters, after, limit)
+
+    next_cursor = next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['id'])
+        query = QueryDict(mutable=True)
+        query.update(params)
+        query['cursor'] = next_cursor
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+    return {"results": rows, "next_cursor": next_cursor, "next": next_url}
@@ -0,0 +1,111 @@
+"""
+Response formats for equipment data.
+
+Besides JSON (rows as objects), the dataset detail and equipment endpoints
+negotiate two column-oriented formats through ``Accept`` or ``?format=``:
+
+* ``columnar`` (``application/vnd.equipment.columnar+json``): the rows become
+  ``{"id": [...], "equipment_name": [...], "flowrate": [...], ...}``, so the
+  field names are sent once instead of once per row.
+* ``arrow`` (``application/vnd.apache.arrow.stream``): an Arrow IPC stream of
+  one record batch with typed columns, which clients read straight into
+  NumPy arrays. Whatever else the response holds (summary, cursors, errors)
+  travels as JSON in the schema metadata under ``meta``. Offered only when
+  pyarrow is installed.
+
+The views hand these renderers column dicts (see ``encoding.equipment_columns``);
+the ``columnar`` context flag tells ``DatasetSerializer`` to build them.
+"""
+import importlib.util
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from . import encoding
+
+COLUMNAR_FORMATS = ('columnar', 'arrow')
+
+
+def compression():
+    """Buffer compression for Arrow IPC ("zstd", "lz4" or None)."""
+    return getattr(settings, 'ARROW_IPC_COMPRESSION', 'zstd') or None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` that encodes with orjson when it is installed."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type or '', renderer_context or {})
+        if encoding.orjson is None or data is None or indent:
+            return super().render(data, accepted_media_type, renderer_context)
+        return encoding.dumps(data)
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    media_type = 'application/vnd.equipment.columnar+json'
+    format = 'columnar'
+
+
+def _is_columns(value):
+    return isinstance(value, dict) and set(encoding.FIELDS) <= set(value)
+
+
+def split_columns(data):
+    """
+    Returns ``(columns, rest)``: the equipment columns in ``data`` (the whole of
+    it, or its ``equipment`` / ``results`` entry) and everything else.
+    """
+    if _is_columns(data):
+        return data, None
+    if isinstance(data, dict):
+        for key in ('equipment', 'results'):
+            if _is_columns(data.get(key)):
+                return data[key], {k: v for k, v in data.items() if k != key}
+    return None, data
+
+
+class ArrowRenderer(BaseRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import pyarrow as pa
+
+        if data is None:
+            return b''
+        columns, rest = split_columns(data)
+        schema = pa.schema([
+            ('id', pa.int64()),
+            ('equipment_name', pa.string()),
+            # A handful of distinct types: sent once, referenced by index
+            ('equipment_type', pa.dictionary(pa.int32(), pa.string())),
+            ('flowrate', pa.float64()),
+            ('pressure', pa.float64()),
+            ('temperature', pa.float64()),
+        ] if columns is not None else [])
+        if rest is not None:
+            schema = schema.with_metadata({'meta': encoding.dumps(rest)})
+        if columns is None:
+            table = schema.empty_table()
+        else:
+            table = pa.table({
+                field: pa.array(columns[field], type=pa.string()).dictionary_encode()
+                if field == 'equipment_type' else columns[field]
+                for field in encoding.FIELDS
+            }, schema=schema)
+
+        sink = pa.BufferOutputStream()
+        options = pa.ipc.IpcWriteOptions(compression=compression())
+        with pa.ipc.new_stream(sink, schema, options=options) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+def columnar_renderers():
+    """The column-oriented renderers usable here; Arrow needs pyarrow."""
+    renderers = [ColumnarJSONRenderer]
+    if importlib.util.find_spec('pyarrow') is not None:
+        renderers.append(ArrowRenderer)
+    return renderers
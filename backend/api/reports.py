@@ -0,0 +1,437 @@
+"""
+PDF reports: rendering and an on-disk cache.
+
+A report depends only on the dataset's rows and summary, which change only
+when rows are appended (bumping ``Dataset.version``), and on the report
+layout. Rendered PDFs are kept as ``MEDIA_ROOT/reports/<id>-<version>-<template>.pdf``
+and served from there. Bump ``TEMPLATE_VERSION`` whenever the layout changes,
+so no older file is served again; it is part of the report's ETag too.
+
+The directory is bounded by ``REPORT_CACHE_MAX_BYTES`` and evicted least
+recently used first: a hit touches the file's mtime, and every write removes
+the oldest files until the rest fits. A report larger than the whole budget
+is not cached at all, except for report jobs, whose download is served from
+the file; it then stays until the next write. A dataset's files are removed when it is
+purged or appended to. With ``REPORT_PRERENDER`` a background job renders the
+report right after ingest, so the first download is a hit too (run a worker,
+see ``jobs.py``). Report jobs (``POST datasets/{id}/report-jobs/``) render
+through the same cache, reporting progress as they go; without
+``REPORT_ASYNC`` they run within the request that starts them.
+"""
+import io
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.lib.units import inch
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from . import storage
+from .services import DatasetService
+
+logger = logging.getLogger('api')
+
+# Bump whenever render() produces a different document
+TEMPLATE_VERSION = 1
+# Rough equipment table rows per page, to estimate layout progress
+ROWS_PER_PAGE = 40
+
+
+def cache_enabled():
+    return getattr(settings, 'REPORT_CACHE_ENABLED', True)
+
+
+def cache_max_bytes():
+    return getattr(settings, 'REPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024)
+
+
+def background():
+    # Like retention, report jobs only go to a worker where one is expected to run
+    return getattr(settings, 'REPORT_ASYNC', getattr(settings, 'INGEST_ASYNC', False))
+
+
+def prerender_enabled():
+    return getattr(settings, 'REPORT_PRERENDER', False)
+
+
+def cache_dir():
+    return default_storage.path("reports")
+
+
+def cache_path(dataset):
+    return os.path.join(cache_dir(), f"{dataset.id}-{dataset.version}-{TEMPLATE_VERSION}.pdf")
+
+
+def get_pdf(dataset):
+    """The dataset's report as PDF bytes, from the cache when it has been rendered."""
+    if not cache_enabled():
+        return render(dataset)
+    return cached_pdf(dataset) or render_to_cache(dataset)
+
+
+def cached_pdf(dataset):
+    """The cached report of the dataset's current version, or ``None``."""
+    path = cache_path(dataset)
+    try:
+        with open(path, 'rb') as f:
+            pdf = f.read()
+    except FileNotFoundError:
+        return None
+    # Most recently used, as far as eviction is concerned
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return pdf
+
+
+def render_to_cache(dataset, on_progress=None, required=False):
+    """
+    Renders the report and stores it in the cache, whatever ``REPORT_CACHE_ENABLED``
+    says. ``required`` keeps even a report larger than the cache (see ``store``).
+    """
+    path = cache_path(dataset)
+    pdf = render(dataset, on_progress)
+    store(path, pdf, required)
+    return pdf
+
+
+def store(path, pdf, required=False):
+    """
+    Writes a report to the cache and evicts older ones to make room. A report
+    larger than ``REPORT_CACHE_MAX_BYTES`` is skipped unless ``required``.
+    """
+    if len(pdf) > cache_max_bytes() and not required:
+        logger.info(f"Not caching {os.path.basename(path)}: {len(pdf)} bytes is over REPORT_CACHE_MAX_BYTES")
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Readers only ever see a complete file
+    partial = f"{path}.{os.getpid()}-{threading.get_ident()}.partial"
+    with open(partial, 'wb') as f:
+        f.write(pdf)
+    os.replace(partial, path)
+    evict(keep=path)
+
+
+def _entries():
+    try:
+        with os.scandir(cache_dir()) as it:
+            return [entry for entry in it if entry.name.endswith('.pdf')]
+    except FileNotFoundError:
+        return []
+
+
+def evict(max_bytes=None, keep=None):
+    """
+    Removes least recently used reports, other than ``keep``, until the cache fits
+    ``max_bytes``; returns how many.
+    """
+    limit = cache_max_bytes() if max_bytes is None else max_bytes
+    files = []
+    for entry in _entries():
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+    return removed
+
+
+def discard(dataset_ids):
+    """Removes every cached report of the given datasets, whatever their version."""
+    prefixes = tuple(f"{dataset_id}-" for dataset_id in dataset_ids)
+    if not prefixes:
+        return
+    for entry in _entries():
+        if entry.name.startswith(prefixes):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+def schedule_prerender(dataset):
+    """Queues a job rendering the dataset's report, if ``REPORT_PRERENDER`` is on."""
+    if not (prerender_enabled() and cache_enabled()):
+        return
+    from . import jobs
+    from .models import Job
+
+    jobs.enqueue(Job.KIND_REPORT, user=dataset.uploaded_by, dataset=dataset)
+
+
+def render(dataset, on_progress=None):
+    """
+    Renders the dataset's PDF report and returns its bytes. ``on_progress(fraction)``
+    is called as it goes, ending a little short of 1.
+    """
+    report_progress = on_progress or (lambda fraction: None)
+    summary = dataset.summary
+    # Typed columns straight from columnar storage when the dataset has it
+    df = storage.load_frame(dataset)
+    report_progress(0.05)
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=inch/2, leftMargin=inch/2,
+        topMargin=inch/2, bottomMargin=inch/2
+    )
+
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # Styles
+    title_style = ParagraphStyle(
+        "ReportTitle", 
+        parent=styles["Heading1"], 
+        fontSize=24, 
+        textColor=colors.HexColor("#1a1a2e"),
+        alignment=1, 
+        spaceAfter=30
+    )
+    h2_style = ParagraphStyle(
+        "ReportH2", 
+        parent=styles["Heading2"], 
+        fontSize=16, 
+        textColor=colors.HexColor("#2d3436"),
+        spaceBefore=20, 
+        spaceAfter=10
+    )
+
+    # Title
+    elements.append(Paragraph("Chemical Equipment Analysis Report", title_style))
+    elements.append(Paragraph(f"<b>Dataset Name:</b> {dataset.name}", styles["Normal"]))
+    elements.append(Paragraph(f"<b>Date Generated:</b> {dataset.created_at.strftime('%Y-%m-%d %H:%M')}", styles["Normal"]))
+    elements.append(Spacer(1, 20))
+
+    # Summary Table
+    elements.append(Paragraph("Executive Summary", h2_style))
+    summary_data = [
+        ["Metric", "Value", "Metric", "Value"],
+        ["Total Equipment", summary.total_count, "Avg Flowrate", f"{summary.avg_flowrate:.2f}"],
+        ["Avg Pressure", f"{summary.avg_pressure:.2f}", "Avg Temperature", f"{summary.avg_temperature:.2f}"],
+        ["Max Pressure", f"{summary.max_pressure:.2f}", "Max Temperature", f"{summary.max_temperature:.2f}"]
+    ]
+
+    t = Table(summary_data, colWidths=[2*inch, 1.5*inch, 2*inch, 1.5*inch])
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#f1f2f6")),
+        ('GRID', (0,0), (-1,-1), 1, colors.HexColor("#dfe6e9")),
+        ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
+        ('PADDING', (0,0), (-1,-1), 12),
+    ]))
+    elements.append(t)
+    elements.append(Spacer(1, 20))
+
+    # Advanced Statistics (from the stored sketches, not the rows)
+    if summary.total_count:
+        elements.append(Paragraph("Detailed Statistical Analysis", h2_style))
+
+        sketches = DatasetService.column_sketches(dataset)
+        stats_data = [["Parameter", "Mean", "Median", "Std Dev", "Min", "Max"]]
+        for param in ['flowrate', 'pressure', 'temperature']:
+            sketch = sketches[param]
+            std = sketch.moments.std(ddof=1)
+            stats_data.append([
+                param.capitalize(),
+                f"{sketch.moments.mean:.2f}",
+                f"{sketch.quantile(0.5):.2f}",
+                "n/a" if std is None else f"{std:.2f}",
+                f"{sketch.digest.min:.2f}",
+                f"{sketch.digest.max:.2f}"
+            ])
+
+        t_stats = Table(stats_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch, 1*inch])
+        t_stats.setStyle(TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#dfe6e9")),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+            ('ALIGN', (1,1), (-1,-1), 'CENTER'),
+            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ]))
+        elements.append(t_stats)
+        elements.append(Spacer(1, 20))
+
+    # Equipment List (Truncated if too long, or full?)
+    # For a report, usually full list is okay unless huge. Let's list top 50 or so?
+    # Requirement says "Generate PDF report", implies full report. 
+    elements.append(Paragraph("Detailed Equipment List", h2_style))
+
+    data_table = [["Name", "Type", "Flowrate", "Pressure", "Temp"]]
+    for name, eq_type, flowrate, pressure, temperature in zip(
+        df["equipment_name"], df["equipment_type"],
+        df["flowrate"], df["pressure"], df["temperature"],
+    ):
+        data_table.append([
+            name,
+            eq_type,
+            f"{flowrate:.2f}",
+            f"{pressure:.2f}",
+            f"{temperature:.2f}"
+        ])
+
+    t_data = Table(data_table, repeatRows=1)
+    t_data.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#2d3436")),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('FONTSIZE', (0,0), (-1,-1), 9),
+    ]))
+    elements.append(t_data)
+    report_progress(0.15)
+    elements.append(Spacer(1, 20))
+
+    # Visualizations Section
+    elements.append(Paragraph("Visualizations", h2_style))
+
+    # 1. Type Distribution Pie Chart
+    pie_chart = _create_pie_chart(summary.type_distribution)
+    if pie_chart:
+        elements.append(Paragraph("Equipment Type Distribution", styles["Heading3"]))
+        elements.append(pie_chart)
+        elements.append(Spacer(1, 15))
+
+    # 2. Averages Bar Chart
+    bar_chart = _create_bar_chart(summary)
+    if bar_chart:
+        elements.append(Paragraph("Average Performance Metrics", styles["Heading3"]))
+        elements.append(bar_chart)
+        elements.append(Spacer(1, 15))
+
+    # 3. Correlation Heatmap
+    corr_heatmap = _create_correlation_heatmap(DatasetService.analytics(dataset)["correlation"])
+    if corr_heatmap:
+        elements.append(Paragraph("Parameter Correlation Matrix", styles["Heading3"]))
+        elements.append(corr_heatmap)
+        elements.append(Spacer(1, 15))
+
+    report_progress(0.25)
+
+    # Laying out the pages takes most of the time; count them against an estimate
+    pages = len(df) / ROWS_PER_PAGE + 4
+
+    def on_page(canvas, document):
+        report_progress(min(0.25 + 0.74 * document.page / pages, 0.99))
+
+    doc.build(elements, onFirstPage=on_page, onLaterPages=on_page)
+    return buffer.getvalue()
+
+
+def _create_correlation_heatmap(correlation):
+    """Generate a correlation heatmap Image flowable from the stored analytics"""
+    cols = correlation["fields"]
+    if not cols:
+        return None
+
+    try:
+        # Constant columns have no correlation (None)
+        corr_matrix = np.array(correlation["matrix"], dtype=float)
+
+        plt.figure(figsize=(5, 4))
+        plt.imshow(corr_matrix, cmap='coolwarm', interpolation='nearest', vmin=-1, vmax=1)
+        plt.colorbar()
+
+        # Add labels
+        ticks = np.arange(len(cols))
+        plt.xticks(ticks, [c.capitalize() for c in cols], rotation=45)
+        plt.yticks(ticks, [c.capitalize() for c in cols])
+        plt.title('Correlation Matrix')
+
+        # Add text annotations
+        for i in range(len(cols)):
+            for j in range(len(cols)):
+                value = corr_matrix[i, j]
+                text = "n/a" if np.isnan(value) else f"{value:.2f}"
+                plt.text(j, i, text, ha="center", va="center", color="black")
+
+        img_buffer = io.BytesIO()
+        plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
+        plt.close()
+
+        img_buffer.seek(0)
+        return Image(img_buffer, width=4*inch, height=3.2*inch)
+    except Exception as e:
+        logger.error(f"Failed to create heatmap: {e}")
+        return None
+
+
+def _create_pie_chart(distribution):
+    """Generate a pie chart Image flowable"""
+    if not distribution:
+        return None
+
+    try:
+        plt.figure(figsize=(6, 4))
+        labels = list(distribution.keys())
+        sizes = list(distribution.values())
+        colors = ['#00D9A5', '#FF6B35', '#00A8E8', '#FFD166', '#EF476F', '#8338EC']
+
+        plt.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors[:len(labels)], startangle=90)
+        plt.axis('equal')
+        plt.title('Equipment Types')
+
+        img_buffer = io.BytesIO()
+        plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
+        plt.close()
+
+        img_buffer.seek(0)
+        return Image(img_buffer, width=5*inch, height=3.5*inch)
+    except Exception as e:
+        logger.error(f"Failed to create pie chart: {e}")
+        return None
+
+
+def _create_bar_chart(summary):
+    """Generate a bar chart Image flowable"""
+    try:
+        plt.figure(figsize=(6, 4))
+        metrics = ['Avg Flow', 'Avg Pressure', 'Avg Temp']
+        values = [summary.avg_flowrate, summary.avg_pressure, summary.avg_temperature]
+        colors = ['#00D9A5', '#FF6B35', '#00A8E8']
+
+        bars = plt.bar(metrics, values, color=colors)
+        plt.ylabel('Values')
+        plt.title('Average Metrics')
+        plt.grid(axis='y', alpha=0.3)
+
+        # Add values on top of bars
+        for bar in bars:
+            height = bar.get_height()
+            plt.text(bar.get_x() + bar.get_width()/2., height,
+                    f'{height:.2f}',
+                    ha='center', va='bottom')
+
+        img_buffer = io.BytesIO()
+        plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
+        plt.close()
+
+        img_buffer.seek(0)
+        return Image(img_buffer, width=5*inch, height=3.5*inch)
+    except Exception as e:
+        logger.error(f"Failed to create bar chart: {e}")
+        return None
@@ -0,0 +1,144 @@
+"""
+Dataset retention and purging.
+
+Each user keeps their newest ``DATASET_RETENTION_LIMIT`` datasets. Retention
+runs after an upload has committed, never inside it: with ``RETENTION_ASYNC``
+it is queued as a job for the worker, otherwise it runs right after the
+commit. Rows are removed with set-based DELETEs (Equipment, then summaries,
+then datasets, a batch of datasets at a time) and the files are removed
+afterwards, by a job of their own when running in the background.
+
+Retention passes also sweep up expired resumable upload sessions (see
+``uploads.expire``), so their parts do not pile up where clients gave up.
+
+Clearing history only soft-deletes (``Dataset.deleted_at``) and queues a
+purge job. Every retention pass also sweeps up soft-deleted datasets, so they
+are purged even where no worker runs.
+
+Purging is idempotent: datasets are locked with ``SKIP LOCKED`` where the
+database supports it, a DELETE of rows that are already gone affects nothing,
+and removing a missing file is a no-op, so several workers may enforce
+retention at the same time.
+"""
+import os
+import shutil
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, storage, uploads
+from .models import Dataset, DatasetSummary, Equipment, Job
+
+PURGE_BATCH_SIZE = 500
+
+
+def retention_limit():
+    return getattr(settings, 'DATASET_RETENTION_LIMIT', 5)
+
+
+def background():
+    return getattr(settings, 'RETENTION_ASYNC', getattr(settings, 'INGEST_ASYNC', False))
+
+
+def schedule(user):
+    """Enforces ``user``'s retention limit, now or through a queued job."""
+    if not background():
+        enforce(user)
+        return
+    from . import jobs
+
+    # One queued retention job per user is enough; it sees every upload made before it runs
+    if not Job.objects.filter(kind=Job.KIND_RETENTION, user=user, state=Job.STATE_QUEUED).exists():
+        jobs.enqueue(Job.KIND_RETENTION, user=user)
+
+
+def expired_ids(user):
+    keep = retention_limit()
+    return list(
+        Dataset.objects.filter(uploaded_by=user)
+        .order_by('-created_at', '-id')
+        .values_list('id', flat=True)[keep:]
+    )
+
+
+def deleted_ids(user):
+    return list(
+        Dataset.all_objects.filter(uploaded_by=user, deleted_at__isnull=False)
+        .values_list('id', flat=True)
+    )
+
+
+def enforce(user):
+    """
+    Purges the user's datasets beyond the retention limit, and any soft-deleted
+    ones; returns how many were removed. Expired upload sessions are removed too.
+    """
+    uploads.expire()
+    return purge(expired_ids(user) + deleted_ids(user))
+
+
+def soft_delete(user):
+    """
+    Hides all of the user's datasets at once and queues their purge. Returns the
+    number of datasets hidden.
+    """
+    from . import jobs
+
+    with transaction.atomic():
+        count = Dataset.objects.filter(uploaded_by=user).update(deleted_at=timezone.now())
+        caching.invalidate(user.id)
+        if count and not Job.objects.filter(kind=Job.KIND_PURGE, user=user, state=Job.STATE_QUEUED).exists():
+            jobs.enqueue(Job.KIND_PURGE, user=user)
+    return count
+
+
+def purge(dataset_ids):
+    """
+    Deletes the given datasets and their rows in batches of set-based statements,
+    then removes their files. Returns the number of datasets deleted.
+    """
+    deleted = 0
+    for start in range(0, len(dataset_ids), PURGE_BATCH_SIZE):
+        batch = dataset_ids[start:start + PURGE_BATCH_SIZE]
+        with transaction.atomic():
+            claimed = list(
+                Dataset.all_objects.select_for_update(skip_locked=True)
+                .filter(id__in=batch)
+                .values_list('id', 'file_path', 'uploaded_by_id')
+            )
+            if not claimed:
+                continue
+            ids = [dataset_id for dataset_id, _, _ in claimed]
+            # Neither model has dependents, so these are single DELETE ... WHERE dataset_id IN (...)
+            Equipment.objects.filter(dataset_id__in=ids).delete()
+            DatasetSummary.objects.filter(dataset_id__in=ids).delete()
+            deleted += Dataset.all_objects.filter(id__in=ids).delete()[1].get(Dataset._meta.label, 0)
+
+            paths = [path for _, path, _ in claimed if path]
+            transaction.on_commit(lambda ids=ids, paths=paths: schedule_file_removal(paths, ids))
+            caching.invalidate(*(user_id for _, _, user_id in claimed))
+    return deleted
+
+
+def schedule_file_removal(paths, dataset_ids):
+    if not background():
+        remove_files(paths, dataset_ids)
+        return
+    from . import jobs
+
+    jobs.enqueue(Job.KIND_REMOVE_FILES, payload={"paths": paths, "dataset_ids": dataset_ids})
+
+
+def remove_files(paths, dataset_ids):
+    """Removes uploaded files, columnar directories and cached reports; missing ones are skipped."""
+    from . import reports
+
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    for dataset_id in dataset_ids:
+        shutil.rmtree(storage.dataset_dir(dataset_id), ignore_errors=True)
+    reports.discard(dataset_ids)
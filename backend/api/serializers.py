@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Dataset, Equipment, DatasetSummary
+from . import encoding
+from .models import Dataset, Equipment, DatasetSummary, Job
 
 
 class EquipmentSerializer(serializers.ModelSerializer):
@@ -33,10 +34,57 @@ class DatasetSummarySerializer(serializers.ModelSerializer):
         ]
 
 
+def field_list(value):
+    """Splits a comma-separated query parameter (`?fields=id,name`) into names."""
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
 class DatasetSerializer(serializers.ModelSerializer):
-    equipment = EquipmentSerializer(many=True, read_only=True)
+    """
+    A dataset with its optional relations. The context may carry `include`
+    (which of `OPTIONAL_FIELDS` to add; `DEFAULT_INCLUDE` otherwise) and
+    `fields` (only these fields, optional ones included). Unknown names are
+    ignored. The full row list is only sent when asked for.
+    """
+    OPTIONAL_FIELDS = ("equipment", "summary")
+    DEFAULT_INCLUDE = ("summary",)
+
+    equipment = serializers.SerializerMethodField()
     summary = DatasetSummarySerializer(read_only=True)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context)
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, context):
+        if context.get("fields"):
+            return set(context["fields"])
+        include = context.get("include")
+        if include is None:
+            include = cls.DEFAULT_INCLUDE
+        base = [name for name in cls.Meta.fields if name not in cls.OPTIONAL_FIELDS]
+        return set(base) | (set(include) & set(cls.OPTIONAL_FIELDS))
+
+    @classmethod
+    def request_context(cls, request):
+        """Serializer context for `?fields=` / `?include=` on ``request``."""
+        context = {"request": request}
+        for param in ("fields", "include"):
+            if param in request.query_params:
+                context[param] = field_list(request.query_params[param])
+        return context
+
+    def get_equipment(self, obj):
+        if self.context.get("columnar"):
+            # {field: array}, for the formats in renderers.COLUMNAR_FORMATS
+            return encoding.equipment_columns(obj)
+        # Tuples straight from the database; same output as EquipmentSerializer
+        return encoding.equipment_rows(obj)
+
     class Meta:
         model = Dataset
         fields = ["id", "name", "created_at", "row_count", "equipment", "summary"]
@@ -46,3 +94,21 @@ class DatasetListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Dataset
         fields = ["id", "name", "created_at", "row_count"]
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "state",
+            "dataset",
+            "rows_processed",
+            "progress",
+            "error",
+            "attempts",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
@@ -1,11 +1,177 @@
+import numpy as np
 import pandas as pd
+import hashlib
+from collections import Counter
 from django.db import transaction
-from django.core.files.storage import default_storage
 from django.conf import settings
 from .models import Dataset, Equipment, DatasetSummary
 import os
+import contextlib
+import pickle
+import tempfile
+import gzip
+import zipfile
+import zlib
+from . import analytics, caching, loaders, retention, storage, uploads
+from .sketches import ColumnSketch, CoMoments
 
 REQUIRED_COLUMNS = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+UPLOAD_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst', '.zip')
+UPLOAD_SUFFIXES_HELP = "File must be a CSV (optionally compressed as .csv.gz, .csv.zst or a single-file .zip)"
+
+try:
+    from zstandard import ZstdError
+except ImportError:
+    ZstdError = zlib.error
+DECOMPRESSION_ERRORS = (gzip.BadGzipFile, EOFError, zlib.error, zipfile.BadZipFile, ZstdError)
+
+# CSV column -> Equipment field the typed array is stored under
+TEXT_FIELDS = {'Equipment Name': 'equipment_name', 'Type': 'equipment_type'}
+NUMERIC_FIELDS = {'Flowrate': 'flowrate', 'Pressure': 'pressure', 'Temperature': 'temperature'}
+
+
+class ValidationReport:
+    """
+    Structured list of rejected cells. Only the first ``max_examples`` are kept,
+    but every bad cell is counted.
+    """
+
+    def __init__(self, max_examples=None):
+        if max_examples is None:
+            max_examples = getattr(settings, 'CSV_VALIDATION_MAX_ERRORS', 20)
+        self.max_examples = max_examples
+        self.error_count = 0
+        self.errors = []
+
+    def add(self, rows, column, reason):
+        """Records ``reason`` for every row index in ``rows`` (a NumPy array)."""
+        self.error_count += len(rows)
+        room = self.max_examples - len(self.errors)
+        for row in rows[:max(room, 0)].tolist():
+            self.errors.append({"row": row, "column": column, "reason": reason})
+
+    def __bool__(self):
+        return self.error_count > 0
+
+    def as_dict(self):
+        return {
+            "error_count": self.error_count,
+            "errors": sorted(self.errors, key=lambda e: (e["row"], e["column"])),
+            "truncated": self.error_count > len(self.errors),
+        }
+
+
+class CSVValidationError(ValueError):
+    """Raised when cells fail validation; carries the ValidationReport."""
+
+    def __init__(self, report):
+        super().__init__(
+            f"CSV contains {report.error_count} invalid value(s). "
+            "Flowrate, Pressure, and Temperature must be numeric values; "
+            "Equipment Name and Type must not be empty."
+        )
+        self.report = report
+
+
+class SummaryAccumulator:
+    """
+    Running summary (count/sum/sum of squares/min/max/type counts) folded one
+    chunk at a time, so the summary never needs the whole dataset in memory.
+    Each numeric field also gets a ColumnSketch (moments and a t-digest) for
+    std and quantiles, and per-type statistics and co-moments feed the chart
+    analytics (see api.analytics). Accumulators merge, and their state is stored with the
+    DatasetSummary so appended rows can be folded in without re-reading the
+    existing ones.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sums = {field: 0.0 for field in NUMERIC_FIELDS.values()}
+        self.sumsqs = {field: 0.0 for field in NUMERIC_FIELDS.values()}
+        self.mins = {field: None for field in NUMERIC_FIELDS.values()}
+        self.maxs = {field: None for field in NUMERIC_FIELDS.values()}
+        self.type_counts = Counter()
+        self.sketches = {field: ColumnSketch() for field in NUMERIC_FIELDS.values()}
+        self.type_stats = analytics.TypeStats(NUMERIC_FIELDS.values())
+        self.comoments = CoMoments(len(NUMERIC_FIELDS))
+
+    def update(self, columns):
+        """Folds in a chunk of typed columns as returned by ``validate_and_coerce``."""
+        size = len(columns['equipment_type'])
+        if not size:
+            return
+        self.count += size
+        for field in NUMERIC_FIELDS.values():
+            values = columns[field]
+            self.sums[field] += float(values.sum())
+            self.sumsqs[field] += float(np.dot(values, values))
+            chunk_min, chunk_max = float(values.min()), float(values.max())
+            self.mins[field] = chunk_min if self.mins[field] is None else min(self.mins[field], chunk_min)
+            self.maxs[field] = chunk_max if self.maxs[field] is None else max(self.maxs[field], chunk_max)
+            self.sketches[field].update(values)
+        types, counts = np.unique(columns['equipment_type'], return_counts=True)
+        self.type_counts.update(dict(zip(types.tolist(), counts.tolist())))
+        self.type_stats.update(columns)
+        self.comoments.update(np.column_stack([columns[field] for field in NUMERIC_FIELDS.values()]))
+
+    def merge(self, other):
+        """Folds another accumulator into this one."""
+        self.count += other.count
+        for field in NUMERIC_FIELDS.values():
+            self.sums[field] += other.sums[field]
+            self.sumsqs[field] += other.sumsqs[field]
+            for ours, theirs, pick in ((self.mins, other.mins, min), (self.maxs, other.maxs, max)):
+                if theirs[field] is not None:
+                    ours[field] = theirs[field] if ours[field] is None else pick(ours[field], theirs[field])
+        self.type_counts.update(other.type_counts)
+        for field, sketch in self.sketches.items():
+            sketch.merge(other.sketches[field])
+        self.type_stats.merge(other.type_stats)
+        self.comoments.merge(other.comoments)
+        return self
+
+    def mean(self, field):
+        return self.sums[field] / self.count if self.count else None
+
+    def std(self, field):
+        """Population standard deviation."""
+        if not self.count:
+            return None
+        mean = self.sums[field] / self.count
+        return max(self.sumsqs[field] / self.count - mean * mean, 0.0) ** 0.5
+
+    def state(self):
+        """JSON-serializable state, stored as ``DatasetSummary.aggregates``."""
+        return {
+            "count": self.count,
+            "sum": dict(self.sums),
+            "sumsq": dict(self.sumsqs),
+            "min": dict(self.mins),
+            "max": dict(self.maxs),
+            "type_counts": dict(self.type_counts),
+            "by_type": self.type_stats.to_dict(),
+            "comoments": self.comoments.to_dict(),
+        }
+
+    def sketch_state(self):
+        """JSON-serializable sketches, stored as ``DatasetSummary.sketches``."""
+        return {field: sketch.to_dict() for field, sketch in self.sketches.items()}
+
+    @classmethod
+    def from_state(cls, state, sketch_state):
+        accumulator = cls()
+        accumulator.count = state["count"]
+        accumulator.sums.update(state["sum"])
+        accumulator.sumsqs.update(state["sumsq"])
+        accumulator.mins.update(state["min"])
+        accumulator.maxs.update(state["max"])
+        accumulator.type_counts.update(state["type_counts"])
+        accumulator.sketches.update(
+            {field: ColumnSketch.from_dict(data) for field, data in sketch_state.items()}
+        )
+        accumulator.type_stats = analytics.TypeStats.from_dict(NUMERIC_FIELDS.values(), state["by_type"])
+        accumulator.comoments = CoMoments.from_dict(state["comoments"])
+        return accumulator
 
 class DatasetService:
     @staticmethod
@@ -16,60 +182,223 @@ class DatasetService:
         missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
-        
-        # Validate data types
+
+    @staticmethod
+    def validate_and_coerce(df, row_offset=0, report=None):
+        """
+        Validates a chunk and converts each column exactly once.
+
+        Returns ``(columns, report)`` where ``columns`` maps Equipment field names to
+        NumPy arrays (object arrays of stripped strings, float64 for the measurements)
+        and ``report`` is a ValidationReport whose row indices are 0-based data rows
+        offset by ``row_offset``.
+        """
+        DatasetService.validate_csv(df)
+        report = report if report is not None else ValidationReport()
+        rows = np.arange(row_offset, row_offset + len(df))
+        columns = {}
+
+        for col, field in TEXT_FIELDS.items():
+            raw = df[col]
+            text = raw.astype(str).str.strip()
+            missing = raw.isna().to_numpy()
+            blank = ~missing & (text == '').to_numpy()
+            report.add(rows[missing], col, "missing value")
+            report.add(rows[blank], col, "blank value")
+            columns[field] = text.to_numpy(dtype=object)
+
+        for col, field in NUMERIC_FIELDS.items():
+            raw = df[col]
+            values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=float)
+            missing = raw.isna().to_numpy()
+            not_numeric = ~missing & np.isnan(values)
+            infinite = np.isinf(values)
+            report.add(rows[missing], col, "missing value")
+            report.add(rows[not_numeric], col, "not a number")
+            report.add(rows[infinite], col, "not a finite number")
+            columns[field] = values
+
+        return columns, report
+
+    @staticmethod
+    def is_supported_upload(filename):
+        return filename.lower().endswith(UPLOAD_SUFFIXES)
+
+    @staticmethod
+    def dataset_name(filename):
+        """Name a dataset after the CSV inside a compressed upload ("x.csv.gz" -> "x.csv")."""
+        lower = filename.lower()
+        for suffix in ('.gz', '.zst'):
+            if lower.endswith('.csv' + suffix):
+                return filename[:-len(suffix)]
+        if lower.endswith('.zip'):
+            return filename[:-len('.zip')] + '.csv'
+        return filename
+
+    @staticmethod
+    @contextlib.contextmanager
+    def open_csv_stream(full_path):
+        """
+        Opens a stored upload as a binary stream of CSV bytes. Compressed uploads
+        are inflated on the fly while pandas reads, never written out in full.
+        """
+        lower = full_path.lower()
+        with contextlib.ExitStack() as stack:
+            if lower.endswith('.gz'):
+                stream = stack.enter_context(gzip.open(full_path, 'rb'))
+            elif lower.endswith('.zst'):
+                try:
+                    import zstandard
+                except ImportError:
+                    raise ValueError("Server cannot read .zst uploads (zstandard is not installed).")
+                raw = stack.enter_context(open(full_path, 'rb'))
+                stream = stack.enter_context(zstandard.ZstdDecompressor().stream_reader(raw))
+            elif lower.endswith('.zip'):
+                archive = stack.enter_context(zipfile.ZipFile(full_path))
+                entries = [
+                    info for info in archive.infolist()
+                    if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+                ]
+                if len(entries) != 1:
+                    raise ValueError("Zip uploads must contain exactly one CSV file.")
+                stream = stack.enter_context(archive.open(entries[0]))
+            else:
+                stream = stack.enter_context(open(full_path, 'rb'))
+            yield stream
+
+    @staticmethod
+    def read_csv_chunks(full_path):
+        """
+        Yields the CSV in bounded chunks with normalized headers.
+        """
+        chunk_size = getattr(settings, 'CSV_INGEST_CHUNK_SIZE', 50000)
         try:
-            pd.to_numeric(df['Flowrate'])
-            pd.to_numeric(df['Pressure'])
-            pd.to_numeric(df['Temperature'])
-        except ValueError:
-            raise ValueError("Flowrate, Pressure, and Temperature must be numeric values.")
+            with DatasetService.open_csv_stream(full_path) as stream:
+                with pd.read_csv(stream, chunksize=chunk_size) as reader:
+                    for chunk in reader:
+                        chunk.columns = [c.strip() for c in chunk.columns]
+                        yield chunk
+        except DECOMPRESSION_ERRORS as e:
+            raise ValueError(f"Could not decompress the uploaded file: {e}")
+
+    @staticmethod
+    def store_upload(file):
+        """
+        Persists an uploaded file under ``uploads/`` and returns ``(full_path, sha256)``.
+        The content hash is computed while the chunks are written, in the same pass.
+        """
+        full_path, out = uploads.create_upload_file(file.name)
+        digest = hashlib.sha256()
+        with out:
+            for chunk in file.chunks():
+                digest.update(chunk)
+                out.write(chunk)
+        return full_path, digest.hexdigest()
+
+    @staticmethod
+    def remove_file(path):
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass # Log this in production
+
+    @staticmethod
+    def find_existing(user, content_hash='', idempotency_key=''):
+        """
+        Returns the user's dataset created with the same Idempotency-Key, or else
+        with identical content, or ``None``.
+        """
+        datasets = Dataset.objects.filter(uploaded_by=user).select_related('summary').order_by('-created_at')
+        if idempotency_key:
+            match = datasets.filter(idempotency_key=idempotency_key).first()
+            if match:
+                return match
+        if content_hash:
+            return datasets.filter(content_hash=content_hash).first()
+        return None
 
     @staticmethod
     def process_dataset(file, user):
         """
         Handles the full process of saving file, parsing CSV, saving to DB, and generating summary.
+        Uploading content the user already has returns the existing dataset.
         """
-        # Save file temporarily or permanently depending on storage backend
-        file_path = default_storage.save(f"uploads/{file.name}", file)
-        full_path = default_storage.path(file_path)
+        full_path, content_hash = DatasetService.store_upload(file)
+        existing = DatasetService.find_existing(user, content_hash)
+        if existing:
+            DatasetService.remove_file(full_path)
+            return existing
+        return DatasetService.ingest_file(
+            full_path, DatasetService.dataset_name(file.name), user, content_hash=content_hash
+        )
 
-        try:
-            df = pd.read_csv(full_path)
-            # Normalize headers
-            df.columns = [c.strip() for c in df.columns]
-            
-            DatasetService.validate_csv(df)
+    @staticmethod
+    def ingest_file(full_path, name, user, on_progress=None, content_hash='', idempotency_key='',
+                    chunks=None, staged=False):
+        """
+        Parses a stored CSV into a Dataset with its Equipment rows and summary.
 
-            with transaction.atomic():
-                # Create Dataset Record
-                dataset = Dataset.objects.create(
-                    name=file.name,
-                    uploaded_by=user,
-                    row_count=len(df),
-                    file_path=full_path
-                )
+        The CSV is streamed in chunks of ``CSV_INGEST_CHUNK_SIZE`` rows; each chunk is
+        validated, bulk inserted and folded into a running summary, so peak memory
+        does not grow with the number of rows. ``on_progress(rows)`` is called after
+        every chunk. ``chunks`` may supply already validated column chunks (see
+        ``parse_file``) in place of reading ``full_path``.
 
-                # Bulk Create Equipment
-                equipment_list = [
-                    Equipment(
-                        dataset=dataset,
-                        equipment_name=str(row['Equipment Name']).strip(),
-                        equipment_type=str(row['Type']).strip(),
-                        flowrate=float(row['Flowrate']),
-                        pressure=float(row['Pressure']),
-                        temperature=float(row['Temperature'])
+        Everything commits in one transaction, unless ``staged``: the dataset is then
+        created hidden (``Dataset.ingesting``) and every chunk commits on its own, so
+        what ``on_progress`` writes is seen by other connections while the ingest
+        runs. The dataset appears when its summary commits, and is deleted on failure.
+        """
+        write_rows = storage.rows_enabled()
+        # Staged ingests commit per step; otherwise the steps share one transaction
+        step = transaction.atomic if staged else contextlib.nullcontext
+        dataset = None
+        try:
+            with contextlib.nullcontext() if staged else transaction.atomic():
+                with step():
+                    # Create Dataset Record (row_count is filled in once all chunks are read)
+                    dataset = Dataset.objects.create(
+                        name=name,
+                        uploaded_by=user,
+                        row_count=0,
+                        file_path=full_path,
+                        content_hash=content_hash,
+                        idempotency_key=idempotency_key,
+                        has_rows=write_rows,
+                        ingesting=staged,
                     )
-                    for _, row in df.iterrows()
-                ]
-                Equipment.objects.bulk_create(equipment_list)
 
-                # Generate and Save Summary
-                summary_data = DatasetService.generate_summary(df)
-                DatasetSummary.objects.create(dataset=dataset, **summary_data)
-                
-                # Cleanup Old Datasets (Keep max 5)
-                DatasetService.cleanup_old_datasets()
+                accumulator = SummaryAccumulator()
+                columnar = storage.ColumnarWriter(dataset.id) if storage.columnar_enabled() else None
+                loader = loaders.get_loader() if write_rows else None
+                with columnar or contextlib.nullcontext(), loader or contextlib.nullcontext():
+                    if chunks is None:
+                        chunks = DatasetService.iter_validated_chunks(full_path)
+                    DatasetService._ingest_chunks(
+                        dataset, chunks, accumulator, columnar, loader, on_progress, step
+                    )
+                if columnar is not None:
+                    dataset.columnar_path = columnar.directory
+
+                if accumulator.count == 0:
+                    raise ValueError("CSV file contains no data rows.")
+                # The bins span [min, max], known only now: count the stored rows into them
+                histograms = DatasetService.histograms(dataset, accumulator)
+
+                with step():
+                    dataset.row_count = accumulator.count
+                    dataset.ingesting = False
+                    dataset.save(update_fields=['row_count', 'columnar_path', 'ingesting'])
+
+                    # Generate and Save Summary
+                    summary_data = DatasetService.generate_summary(accumulator, histograms)
+                    DatasetSummary.objects.create(dataset=dataset, **summary_data)
+
+                    # Retention runs once this upload has committed (see retention.py)
+                    transaction.on_commit(lambda: retention.schedule(user))
+                    transaction.on_commit(lambda: DatasetService.report_changed(dataset))
+                    caching.invalidate(user.id)
 
                 return dataset
 
@@ -78,39 +407,280 @@ class DatasetService:
             # though transaction rollback handles DB.
             if os.path.exists(full_path):
                 os.remove(full_path)
+            if dataset is not None:
+                if staged:
+                    DatasetService.discard_staged([dataset])
+                else:
+                    storage.remove(dataset)
             raise e
 
     @staticmethod
-    def generate_summary(df):
-        return {
-            "total_count": len(df),
-            "avg_flowrate": df["Flowrate"].mean(),
-            "avg_pressure": df["Pressure"].mean(),
-            "avg_temperature": df["Temperature"].mean(),
-            "type_distribution": df["Type"].value_counts().to_dict(),
-            "min_flowrate": df["Flowrate"].min(),
-            "max_flowrate": df["Flowrate"].max(),
-            "min_pressure": df["Pressure"].min(),
-            "max_pressure": df["Pressure"].max(),
-            "min_temperature": df["Temperature"].min(),
-            "max_temperature": df["Temperature"].max(),
-        }
+    def discard_staged(datasets):
+        """Deletes datasets whose staged ingest did not finish, with the rows committed so far."""
+        ids = [dataset.id for dataset in datasets]
+        with transaction.atomic():
+            Equipment.objects.filter(dataset_id__in=ids).delete()
+            Dataset.all_objects.filter(id__in=ids, ingesting=True).delete()
+        for dataset in datasets:
+            storage.remove(dataset)
+
+    @staticmethod
+    def summary_accumulator(dataset):
+        """
+        The dataset's running summary as a SummaryAccumulator. Summaries saved before
+        aggregates, sketches and analytics were stored are rebuilt from the dataset's rows.
+        """
+        summary = getattr(dataset, 'summary', None)
+        if summary is not None and "comoments" in summary.aggregates and summary.sketches:
+            return SummaryAccumulator.from_state(summary.aggregates, summary.sketches)
+        accumulator = SummaryAccumulator()
+        if dataset.row_count:
+            accumulator.update(storage.load_columns(dataset))
+        return accumulator
+
+    @staticmethod
+    def column_sketches(dataset):
+        """
+        ``{field: ColumnSketch}`` for the dataset, read from its summary. Older
+        summaries get their sketches computed from the rows once and saved.
+        """
+        summary = dataset.summary
+        if not summary.sketches:
+            accumulator = DatasetService.summary_accumulator(dataset)
+            summary.aggregates = accumulator.state()
+            summary.sketches = accumulator.sketch_state()
+            summary.save(update_fields=['aggregates', 'sketches'])
+        return {field: ColumnSketch.from_dict(data) for field, data in summary.sketches.items()}
+
+    @staticmethod
+    def analytics(dataset):
+        """The dataset's chart analytics; older summaries get them computed once and saved."""
+        summary = dataset.summary
+        if not summary.analytics:
+            accumulator = DatasetService.summary_accumulator(dataset)
+            fields = DatasetService.generate_summary(
+                accumulator, DatasetService.histograms(dataset, accumulator)
+            )
+            for name in ('aggregates', 'sketches', 'analytics'):
+                setattr(summary, name, fields[name])
+            summary.save(update_fields=['aggregates', 'sketches', 'analytics'])
+        return summary.analytics
+
+    @staticmethod
+    def histograms(dataset, accumulator, bins=None):
+        """
+        Exact histograms of the dataset's parameters over the [min, max] of
+        ``accumulator``, counted in one pass over the stored rows a batch at a time.
+        """
+        ranges = {field: (accumulator.mins[field], accumulator.maxs[field]) for field in storage.NUMERIC}
+        counts = analytics.Histograms(ranges, bins or analytics.default_bins())
+        for columns in storage.iter_columns(dataset, storage.NUMERIC):
+            counts.update(columns)
+        return counts.to_dict()
+
+    @staticmethod
+    def binned_histograms(dataset, bins):
+        """The dataset's histograms with ``bins`` bins (``?bins=``), cached per version like ``scatter``."""
+        key = f"histograms:{dataset.id}:{dataset.version}:{dataset.content_hash[:16]}:{bins}"
+        data = caching.backend().get(key)
+        if data is None:
+            data = DatasetService.histograms(dataset, DatasetService.summary_accumulator(dataset), bins)
+            caching.backend().set(key, data, getattr(settings, 'SCATTER_CACHE_TIMEOUT', 3600))
+        return data
+
+    @staticmethod
+    def scatter(dataset, x, y, mode, resolution):
+        """
+        A bounded-size view of ``x`` against ``y`` (see ``analytics.parse_scatter``),
+        cached per dataset version, parameter pair, mode and resolution.
+        """
+        key = f"scatter:{dataset.id}:{dataset.version}:{dataset.content_hash[:16]}:{mode}:{x}:{y}:{resolution}"
+        data = caching.backend().get(key)
+        if data is None:
+            columns = storage.load_columns(dataset, ['equipment_type', x, y])
+            if mode == 'sample':
+                data = analytics.scatter_sample(columns, x, y, resolution, seed=dataset.id)
+            else:
+                data = analytics.density(columns, x, y, resolution)
+            caching.backend().set(key, data, getattr(settings, 'SCATTER_CACHE_TIMEOUT', 3600))
+        return data
+
+    @staticmethod
+    def report_changed(dataset, appended=False):
+        """Drops reports rendered from older rows and queues the new one (see reports.py)."""
+        from . import reports
+
+        if appended:
+            reports.discard([dataset.id])
+        reports.schedule_prerender(dataset)
+
+    @staticmethod
+    def append_file(dataset, full_path, on_progress=None):
+        """
+        Adds the rows of a stored CSV to an existing dataset. Only the new rows are
+        read: they are validated, loaded into the same storage the dataset already
+        uses, and their aggregates are merged into the stored summary.
+        """
+        columnar = None
+        try:
+            with transaction.atomic():
+                dataset = Dataset.objects.select_for_update().get(pk=dataset.pk)
+                if dataset.columnar_path and not storage.columnar_enabled():
+                    raise ValueError("This dataset is stored as Parquet, which the server cannot write.")
+
+                accumulator = DatasetService.summary_accumulator(dataset)
+                added = SummaryAccumulator()
+                # The new rows are counted into the stored bins as they are read
+                stored = (dataset.summary.analytics or {}).get("histograms")
+                counts = analytics.Histograms.from_dict(stored, counts=False) if stored else None
+                chunks = DatasetService.iter_validated_chunks(full_path)
+                if counts is not None:
+                    chunks = counts.feed(chunks)
+                if dataset.columnar_path:
+                    columnar = storage.ColumnarWriter(dataset.id, append=True)
+                loader = loaders.get_loader() if dataset.has_rows else None
+                with columnar or contextlib.nullcontext(), loader or contextlib.nullcontext():
+                    DatasetService._ingest_chunks(dataset, chunks, added, columnar, loader, on_progress)
+                if added.count == 0:
+                    raise ValueError("CSV file contains no data rows.")
+
+                accumulator.merge(added)
+                if counts is not None and counts.covers(added.mins, added.maxs):
+                    histograms = analytics.Histograms.from_dict(stored).merge(counts).to_dict()
+                else:
+                    # The range grew, so every bin moves: recount all rows
+                    histograms = DatasetService.histograms(dataset, accumulator)
+                # The dataset no longer matches any single uploaded file
+                dataset.row_count = accumulator.count
+                dataset.content_hash = ''
+                # Invalidates every ETag handed out for the old rows
+                dataset.version += 1
+                dataset.save(update_fields=['row_count', 'content_hash', 'version', 'updated_at'])
+                dataset.summary, _ = DatasetSummary.objects.update_or_create(
+                    dataset=dataset, defaults=DatasetService.generate_summary(accumulator, histograms)
+                )
+                caching.invalidate(dataset.uploaded_by_id)
+                transaction.on_commit(lambda: DatasetService.report_changed(dataset, appended=True))
+        except Exception:
+            # Only this request's part: other appends may have committed their own
+            if columnar is not None:
+                columnar.abort()
+            raise
+        finally:
+            DatasetService.remove_file(full_path)
+        return dataset
+
+    @staticmethod
+    def iter_validated_chunks(full_path):
+        """
+        Yields the typed columns of each CSV chunk, raising CSVValidationError at the
+        first chunk with bad cells (row numbers in the report are file-wide).
+        """
+        rows = 0
+        for df in DatasetService.read_csv_chunks(full_path):
+            # Parse each column once; every later stage reads these arrays
+            columns, report = DatasetService.validate_and_coerce(df, row_offset=rows)
+            if report:
+                raise CSVValidationError(report)
+            rows += len(df)
+            yield columns
 
     @staticmethod
-    def cleanup_old_datasets():
+    def parse_file(full_path):
         """
-        Maintains only the last 5 datasets. Deletes older ones including files.
+        Reads and validates a whole stored CSV without touching the database, for use
+        in worker processes. The validated chunks are spilled to a file next to the
+        CSV as they are read, one pickle each, so only a chunk at a time is held in
+        memory. Returns ``{"spill": path}`` (read back with ``iter_spilled_chunks``)
+        or ``{"error": ..., ["details": ...]}``.
         """
-        # Get IDs of the last 5 datasets
-        last_5_ids = Dataset.objects.order_by('-created_at').values_list('id', flat=True)[:5]
-        
-        # Find datasets NOT in the last 5
-        datasets_to_delete = Dataset.objects.exclude(id__in=last_5_ids)
-        
-        for dataset in datasets_to_delete:
-            if dataset.file_path and os.path.exists(dataset.file_path):
+        fd, spill_path = tempfile.mkstemp(suffix='.chunks', dir=os.path.dirname(full_path))
+        try:
+            with os.fdopen(fd, 'wb') as spill:
+                for columns in DatasetService.iter_validated_chunks(full_path):
+                    pickle.dump(columns, spill, protocol=pickle.HIGHEST_PROTOCOL)
+            return {"spill": spill_path}
+        except CSVValidationError as e:
+            DatasetService.remove_file(spill_path)
+            return {"error": str(e), "details": e.report.as_dict()}
+        except ValueError as e:
+            DatasetService.remove_file(spill_path)
+            return {"error": str(e)}
+        except BaseException:
+            DatasetService.remove_file(spill_path)
+            raise
+
+    @staticmethod
+    def iter_spilled_chunks(spill_path):
+        """Yields the column chunks ``parse_file`` spilled to ``spill_path``, one at a time."""
+        with open(spill_path, 'rb') as spill:
+            while True:
                 try:
-                    os.remove(dataset.file_path)
-                except OSError:
-                    pass # Log this in production
-            dataset.delete()
+                    yield pickle.load(spill)
+                except EOFError:
+                    return
+
+    @staticmethod
+    def _ingest_chunks(dataset, chunks, accumulator, columnar, loader, on_progress=None,
+                       step=contextlib.nullcontext):
+        for columns in chunks:
+            # Bulk Load Equipment (COPY / executemany / bulk_create, see loaders.py)
+            if loader is not None:
+                with step():
+                    loader.load(dataset, columns)
+            if columnar is not None:
+                columnar.write(columns)
+            accumulator.update(columns)
+            if on_progress:
+                on_progress(accumulator.count)
+
+    @staticmethod
+    def bulk_batch_size():
+        return getattr(settings, 'EQUIPMENT_BULK_BATCH_SIZE', 5000)
+
+    @staticmethod
+    def build_equipment(dataset, columns):
+        """
+        Builds unsaved Equipment instances from the typed columns of a chunk.
+        """
+        dataset_id = dataset.id
+        return [
+            Equipment(
+                dataset_id=dataset_id,
+                equipment_name=name,
+                equipment_type=equipment_type,
+                flowrate=flowrate,
+                pressure=pressure,
+                temperature=temperature,
+            )
+            for name, equipment_type, flowrate, pressure, temperature in zip(
+                columns['equipment_name'].tolist(),
+                columns['equipment_type'].tolist(),
+                columns['flowrate'].tolist(),
+                columns['pressure'].tolist(),
+                columns['temperature'].tolist(),
+            )
+        ]
+
+    @staticmethod
+    def generate_summary(accumulator, histograms):
+        """
+        Builds the DatasetSummary fields from a SummaryAccumulator and the dataset's
+        exact histograms (``DatasetService.histograms``).
+        """
+        return {
+            "total_count": accumulator.count,
+            "avg_flowrate": accumulator.mean("flowrate"),
+            "avg_pressure": accumulator.mean("pressure"),
+            "avg_temperature": accumulator.mean("temperature"),
+            "type_distribution": dict(accumulator.type_counts),
+            "min_flowrate": accumulator.mins["flowrate"],
+            "max_flowrate": accumulator.maxs["flowrate"],
+            "min_pressure": accumulator.mins["pressure"],
+            "max_pressure": accumulator.maxs["pressure"],
+            "min_temperature": accumulator.mins["temperature"],
+            "max_temperature": accumulator.maxs["temperature"],
+            "aggregates": accumulator.state(),
+            "sketches": accumulator.sketch_state(),
+            "analytics": analytics.build(accumulator, histograms),
+        }
@@ -0,0 +1,208 @@
+"""
+Compact, mergeable statistical sketches of a numeric column.
+
+``Moments`` keeps count/mean/M2 (merged with Chan et al.'s parallel update,
+so variance stays accurate where sum-of-squares would cancel). ``TDigest`` is
+a merging t-digest: a few hundred weighted centroids, dense at the tails, that
+answer any quantile with small relative error. Both fold in NumPy chunks, merge
+across chunks or datasets, and round-trip through JSON, so a report or a
+cross-dataset percentile never needs the underlying rows. ``CoMoments`` does
+for a group of columns what ``Moments`` does for one, for correlations.
+"""
+import math
+
+import numpy as np
+from django.conf import settings
+
+
+def default_compression():
+    return getattr(settings, 'SKETCH_COMPRESSION', 200)
+
+
+class Moments:
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        if len(values):
+            self.merge(Moments(len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum())))
+        return self
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        return self
+
+    def variance(self, ddof=0):
+        if self.count - ddof <= 0:
+            return None
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        variance = self.variance(ddof)
+        return None if variance is None else math.sqrt(variance)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["count"], data["mean"], data["m2"])
+
+
+class CoMoments:
+    """
+    Count, mean vector and co-moment matrix of several columns, merged the same
+    way as ``Moments``; gives the covariance and correlation matrices.
+    """
+
+    def __init__(self, size, count=0, mean=None, comoment=None):
+        self.count = count
+        self.mean = np.zeros(size) if mean is None else np.asarray(mean, dtype=float)
+        self.comoment = np.zeros((size, size)) if comoment is None else np.asarray(comoment, dtype=float)
+
+    def update(self, matrix):
+        """Folds in an (n, size) array of observations."""
+        if len(matrix):
+            mean = matrix.mean(axis=0)
+            centered = matrix - mean
+            self.merge(CoMoments(len(self.mean), len(matrix), mean, centered.T @ centered))
+        return self
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment = (self.comoment + other.comoment
+                         + np.outer(delta, delta) * self.count * other.count / total)
+        self.mean = self.mean + delta * other.count / total
+        self.count = total
+        return self
+
+    def correlation(self):
+        """Pearson correlation matrix as nested lists; ``None`` where a column is constant."""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = np.clip(self.comoment / np.outer(scale, scale), -1, 1)
+        np.fill_diagonal(matrix, np.where(scale > 0, 1.0, np.nan))
+        return [[float(v) if np.isfinite(v) else None for v in row] for row in matrix]
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean.tolist(), "comoment": self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(len(data["mean"]), data["count"], data["mean"], data["comoment"])
+
+
+class TDigest:
+    """
+    Merging t-digest with the k1 (arcsine) scale function. Centroids whose
+    cumulative-weight position falls in the same unit of k are combined, which
+    bounds the digest to about ``compression / 2`` centroids.
+    """
+
+    def __init__(self, compression=None):
+        self.compression = compression or default_compression()
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = None
+        self.max = None
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if len(values):
+            self._absorb(values, np.ones(len(values)), float(values.min()), float(values.max()))
+        return self
+
+    def merge(self, other):
+        if len(other.means):
+            self._absorb(other.means, other.weights, other.min, other.max)
+        return self
+
+    def _absorb(self, means, weights, low, high):
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(2 * q_left - 1)
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        # cluster ids are non-decreasing, so bincount keeps the centroids sorted
+        merged_weights = np.bincount(cluster, weights=weights)
+        merged_sums = np.bincount(cluster, weights=means * weights)
+        keep = merged_weights > 0
+        self.weights = merged_weights[keep]
+        self.means = merged_sums[keep] / self.weights
+
+    def quantile(self, q):
+        """Estimated value at quantile ``q`` (a float or array in [0, 1])."""
+        if not len(self.means):
+            return None if np.isscalar(q) else [None] * len(q)
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], centers, [total]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        result = np.interp(np.clip(np.asarray(q, dtype=float), 0, 1) * total, xs, ys)
+        return float(result) if np.isscalar(q) else result.tolist()
+
+    def to_dict(self):
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data["compression"])
+        digest.means = np.asarray(data["means"], dtype=float)
+        digest.weights = np.asarray(data["weights"], dtype=float)
+        digest.min, digest.max = data["min"], data["max"]
+        return digest
+
+
+class ColumnSketch:
+    """Moments plus a t-digest for one numeric column."""
+
+    def __init__(self, moments=None, digest=None):
+        self.moments = moments or Moments()
+        self.digest = digest or TDigest()
+
+    def update(self, values):
+        self.moments.update(values)
+        self.digest.update(values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.digest.merge(other.digest)
+        return self
+
+    def quantile(self, q):
+        return self.digest.quantile(q)
+
+    def to_dict(self):
+        return {"moments": self.moments.to_dict(), "digest": self.digest.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(Moments.from_dict(data["moments"]), TDigest.from_dict(data["digest"]))
@@ -0,0 +1,219 @@
+"""
+Columnar (Parquet) storage of dataset rows.
+
+During ingest each dataset is written once as compressed Parquet, one row
+group per ingest chunk, under ``columnar/<dataset id>/`` in the media root.
+Analytics read typed columns straight from those files instead of rebuilding
+a frame through the ORM. Whether the per-row ``Equipment`` table is also
+filled is controlled by ``DATASET_STORAGE`` ("rows", "columnar" or "both").
+"""
+import importlib.util
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from .models import Equipment
+
+FIELDS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+NUMERIC = ['flowrate', 'pressure', 'temperature']
+
+
+def _mode():
+    return getattr(settings, 'DATASET_STORAGE', 'both')
+
+
+def columnar_enabled():
+    # pyarrow is required for Parquet; without it everything stays in the row table
+    return _mode() in ('columnar', 'both') and importlib.util.find_spec('pyarrow') is not None
+
+
+def rows_enabled():
+    return _mode() in ('rows', 'both') or not columnar_enabled()
+
+
+def dataset_dir(dataset_id):
+    return default_storage.path(f"columnar/{dataset_id}")
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ('equipment_name', pa.string()),
+        ('equipment_type', pa.dictionary(pa.int32(), pa.string())),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+
+
+class ColumnarWriter:
+    """
+    Appends typed column chunks (as produced by ``validate_and_coerce``) to a new
+    Parquet file in the dataset's directory. Unless ``append`` is set, anything
+    already in that directory is discarded first. Use as a context manager.
+
+    Each writer gets a part name no other writer can pick, so concurrent appends
+    never overwrite one another and ``abort`` only ever removes its own file.
+    Names start with the creation time, which keeps parts in ingest order.
+    """
+
+    def __init__(self, dataset_id, append=False):
+        import pyarrow.parquet as pq
+
+        directory = dataset_dir(dataset_id)
+        if not append:
+            shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"part-{time.time_ns():020d}-{uuid.uuid4().hex}.parquet")
+        self.schema = _schema()
+        self._writer = pq.ParquetWriter(
+            self.path, self.schema,
+            compression=getattr(settings, 'COLUMNAR_COMPRESSION', 'zstd'),
+        )
+
+    def write(self, columns):
+        import pyarrow as pa
+
+        table = pa.Table.from_arrays(
+            [pa.array(columns[field]) for field in FIELDS], names=FIELDS
+        ).cast(self.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def abort(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def has_columnar(dataset):
+    return bool(dataset.columnar_path) and os.path.isdir(dataset.columnar_path)
+
+
+def _read_table(dataset, fields):
+    import pyarrow.parquet as pq
+    return pq.read_table(dataset.columnar_path, columns=fields)
+
+
+def load_columns(dataset, fields=None):
+    """
+    Returns ``{field: numpy array}`` for the dataset, in ingest order. Reads the
+    Parquet files when present and falls back to the Equipment table.
+    """
+    fields = fields or FIELDS
+    if has_columnar(dataset):
+        table = _read_table(dataset, fields)
+        return {
+            field: (table.column(field).to_numpy() if field in NUMERIC
+                    else table.column(field).to_numpy(zero_copy_only=False).astype(object, copy=False))
+            for field in fields
+        }
+    rows = Equipment.objects.filter(dataset_id=dataset.id).order_by('id').values_list(*fields)
+    values = list(zip(*rows)) or [()] * len(fields)
+    return {
+        field: np.asarray(col, dtype=float if field in NUMERIC else object)
+        for field, col in zip(fields, values)
+    }
+
+
+def load_frame(dataset, fields=None):
+    """DataFrame of the dataset's rows (same columns as the Equipment model, minus ids)."""
+    fields = fields or FIELDS
+    if has_columnar(dataset):
+        return _read_table(dataset, fields).to_pandas()
+    return pd.DataFrame(load_columns(dataset, fields), columns=fields)
+
+
+def iter_columns(dataset, fields=None, batch_size=50000):
+    """
+    Yields the dataset's rows as ``{field: numpy array}`` batches (typed as in
+    ``load_columns``), in ingest order, holding one batch at a time.
+    """
+    fields = fields or FIELDS
+    if has_columnar(dataset):
+        import pyarrow.parquet as pq
+
+        for name in sorted(f for f in os.listdir(dataset.columnar_path) if f.endswith('.parquet')):
+            parquet = pq.ParquetFile(os.path.join(dataset.columnar_path, name))
+            for batch in parquet.iter_batches(batch_size=batch_size, columns=fields):
+                yield {
+                    field: (batch.column(field).to_numpy() if field in NUMERIC
+                            else batch.column(field).to_numpy(zero_copy_only=False).astype(object, copy=False))
+                    for field in fields
+                }
+        return
+    rows = Equipment.objects.filter(dataset_id=dataset.id).order_by('id').values_list(*fields)
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield _batch_columns(batch, fields)
+            batch = []
+    if batch:
+        yield _batch_columns(batch, fields)
+
+
+def _batch_columns(rows, fields):
+    return {
+        field: np.asarray(col, dtype=float if field in NUMERIC else object)
+        for field, col in zip(fields, zip(*rows))
+    }
+
+
+def equipment_records(dataset):
+    """
+    Equipment-shaped dicts read from columnar storage. Rows stored only in
+    Parquet have no database id, so ``id`` is the 1-based row position.
+    """
+    frame = load_frame(dataset)
+    frame.insert(0, 'id', np.arange(1, len(frame) + 1))
+    return frame.to_dict(orient='records')
+
+
+def iter_frames(dataset, start=0, batch_size=8192):
+    """
+    Yields the dataset's columnar rows from position ``start`` (0-based) onwards as
+    DataFrames with a 1-based ``id`` column (see ``equipment_records``), skipping
+    whole files before ``start`` using their metadata.
+    """
+    import pyarrow.parquet as pq
+
+    offset = 0
+    for name in sorted(f for f in os.listdir(dataset.columnar_path) if f.endswith('.parquet')):
+        parquet = pq.ParquetFile(os.path.join(dataset.columnar_path, name))
+        rows = parquet.metadata.num_rows
+        if offset + rows <= start:
+            offset += rows
+            continue
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=FIELDS):
+            size = batch.num_rows
+            if offset + size > start:
+                frame = batch.to_pandas()
+                frame.insert(0, 'id', np.arange(offset + 1, offset + size + 1))
+                yield frame.iloc[max(start - offset, 0):]
+            offset += size
+
+
+def remove(dataset):
+    shutil.rmtree(dataset_dir(dataset.id), ignore_errors=True)
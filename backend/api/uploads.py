@@ -0,0 +1,177 @@
+"""
+Resumable, part-based uploads.
+
+Parts are written to ``upload_sessions/<session id>/<n>.part`` under the media
+root. A part only becomes visible once it has been fully received (it is
+written to a uniquely named temporary file and renamed), so a dropped
+connection never leaves a truncated part behind and the client simply
+re-sends it.
+
+Every part received counts as activity (``UploadSession.updated_at``).
+Sessions idle for longer than ``UPLOAD_SESSION_EXPIRY`` seconds are deleted
+with their parts by ``expire``, which every retention pass runs.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .models import UploadSession
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def expiry_seconds():
+    return getattr(settings, 'UPLOAD_SESSION_EXPIRY', 24 * 60 * 60)
+
+
+def session_dir(session):
+    return default_storage.path(f"upload_sessions/{session.id}")
+
+
+def part_path(session, number):
+    return os.path.join(session_dir(session), f"{number}.part")
+
+
+def create_session(user, filename, total_size, part_size):
+    max_part = getattr(settings, 'UPLOAD_PART_MAX_SIZE', 64 * 1024 * 1024)
+    max_total = getattr(settings, 'UPLOAD_SESSION_MAX_SIZE', 2 * 1024 ** 3)
+    if total_size <= 0:
+        raise ValueError("size must be a positive number of bytes.")
+    if total_size > max_total:
+        raise ValueError(f"File is too large (limit is {max_total} bytes).")
+    if not 0 < part_size <= max_part:
+        raise ValueError(f"part_size must be between 1 and {max_part} bytes.")
+
+    session = UploadSession.objects.create(
+        user=user, filename=os.path.basename(filename),
+        total_size=total_size, part_size=part_size,
+    )
+    os.makedirs(session_dir(session), exist_ok=True)
+    return session
+
+
+def write_part(session, number, stream, length, sha256=None):
+    """
+    Stores part ``number`` read from ``stream`` (``length`` bytes). Re-sending a
+    part replaces it. Raises ValueError if the part is out of range, has the
+    wrong size or does not match the given SHA-256 hex digest.
+    """
+    if not 0 <= number < session.part_count:
+        raise ValueError(f"Part number must be between 0 and {session.part_count - 1}.")
+    expected = session.expected_part_size(number)
+    if length != expected:
+        raise ValueError(f"Part {number} must be exactly {expected} bytes, got {length}.")
+
+    final_path = part_path(session, number)
+    # Unique per request, so concurrent uploads of the same part never share a file
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{number}.", suffix='.tmp', dir=session_dir(session))
+    digest = hashlib.sha256()
+    received = 0
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            while received < length:
+                block = stream.read(min(READ_BLOCK_SIZE, length - received))
+                if not block:
+                    break
+                digest.update(block)
+                out.write(block)
+                received += len(block)
+        if received != length:
+            raise ValueError(f"Part {number} ended after {received} of {length} bytes.")
+        if sha256 and digest.hexdigest() != sha256.lower():
+            raise ValueError(f"Part {number} failed its SHA-256 check.")
+        os.replace(tmp_path, final_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    UploadSession.objects.filter(pk=session.pk).update(updated_at=timezone.now())
+    return {"part": number, "offset": number * session.part_size, "size": received}
+
+
+def received_parts(session):
+    parts = []
+    for number in range(session.part_count):
+        path = part_path(session, number)
+        if os.path.exists(path):
+            parts.append({
+                "part": number,
+                "offset": number * session.part_size,
+                "size": os.path.getsize(path),
+            })
+    return parts
+
+
+def describe(session):
+    received = received_parts(session)
+    have = {p["part"] for p in received}
+    return {
+        "id": str(session.id),
+        "filename": session.filename,
+        "state": session.state,
+        "total_size": session.total_size,
+        "part_size": session.part_size,
+        "part_count": session.part_count,
+        "received": received,
+        "missing": [n for n in range(session.part_count) if n not in have],
+    }
+
+
+def create_upload_file(filename):
+    """
+    Creates a new file under ``uploads/`` named after ``filename`` and returns
+    ``(full_path, file opened for binary writing)``. The name is claimed by an
+    exclusive create, so concurrent uploads of the same name each get their own.
+    """
+    while True:
+        full_path = default_storage.path(default_storage.get_available_name(f"uploads/{filename}"))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        try:
+            return full_path, open(full_path, 'xb')
+        except FileExistsError:
+            # Taken since get_available_name looked; look again
+            continue
+
+
+def assemble(session):
+    """
+    Concatenates all parts into a new file under ``uploads/`` and returns
+    ``(full_path, sha256)``. Raises ValueError if any part is still missing.
+    """
+    missing = describe(session)["missing"]
+    if missing:
+        raise ValueError(f"Upload is incomplete; missing parts: {missing[:20]}")
+
+    full_path, out = create_upload_file(session.filename)
+    digest = hashlib.sha256()
+    with out:
+        for number in range(session.part_count):
+            with open(part_path(session, number), 'rb') as part:
+                for block in iter(lambda: part.read(READ_BLOCK_SIZE), b''):
+                    digest.update(block)
+                    out.write(block)
+    return full_path, digest.hexdigest()
+
+
+def discard(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def expire():
+    """
+    Deletes every user's upload sessions that have been idle for longer than
+    ``UPLOAD_SESSION_EXPIRY``, with their parts; returns how many.
+    """
+    cutoff = timezone.now() - timedelta(seconds=expiry_seconds())
+    expired = 0
+    for session in UploadSession.objects.filter(updated_at__lt=cutoff):
+        # Skipped if a part or completion has touched it since it was read
+        if UploadSession.objects.filter(pk=session.pk, updated_at=session.updated_at).delete()[0]:
+            discard(session)
+            expired += 1
+    return expired
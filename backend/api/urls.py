@@ -2,22 +2,44 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UploadCSVView,
+    BatchUploadView,
+    UploadSessionCreateView,
+    UploadSessionDetailView,
+    UploadPartView,
+    UploadSessionCompleteView,
     DatasetViewSet,
+    JobViewSet,
     DatasetHistoryView,
     RegisterView,
     LoginView,
+    LogoutView,
     ValidateTokenView,
     home,
 )
 
 router = DefaultRouter()
 router.register(r"datasets", DatasetViewSet, basename="dataset")
+router.register(r"jobs", JobViewSet, basename="job")
 
 urlpatterns = [
     path("", include(router.urls)),
     path("upload/", UploadCSVView.as_view(), name="upload"),
+    path("upload/batch/", BatchUploadView.as_view(), name="upload-batch"),
+    path("uploads/", UploadSessionCreateView.as_view(), name="upload-session-create"),
+    path("uploads/<uuid:session_id>/", UploadSessionDetailView.as_view(), name="upload-session"),
+    path(
+        "uploads/<uuid:session_id>/parts/<int:number>/",
+        UploadPartView.as_view(),
+        name="upload-part",
+    ),
+    path(
+        "uploads/<uuid:session_id>/complete/",
+        UploadSessionCompleteView.as_view(),
+        name="upload-session-complete",
+    ),
     path("history/", DatasetHistoryView.as_view(), name="history"),
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", LoginView.as_view(), name="login"),
+    path("logout/", LogoutView.as_view(), name="logout"),
     path("validate-token/", ValidateTokenView.as_view(), name="validate-token"),
 ]
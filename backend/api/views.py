@@ -1,40 +1,40 @@
 import io
 import os
 import logging
-from .models import Dataset, Equipment, DatasetSummary
+import socket
+import threading
+from .models import Dataset, Equipment, Job, UploadSession
 from .serializers import (
     DatasetSerializer, 
     DatasetListSerializer, 
     DatasetSummarySerializer, 
-    EquipmentSerializer
+    JobSerializer,
 )
-from .services import DatasetService
+from .services import (
+    DatasetService, CSVValidationError, REQUIRED_COLUMNS, UPLOAD_SUFFIXES_HELP, NUMERIC_FIELDS,
+)
+from . import (
+    analytics, batch, caching, conditional, encoding, jobs, pagination, renderers, reports, retention,
+    uploads, storage,
+)
+from .filters import EquipmentFilters
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.shortcuts import render
-from django.http import JsonResponse
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from rest_framework import status, viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
 def health_check(request):
     """Health check endpoint for UptimeRobot to keep Render service awake."""
-    return JsonResponse({"status": "ok"})
-
-# Report generation imports
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.units import inch
-
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import numpy as np
-import pandas as pd
+    return JsonResponse({"status": "ok", "cache": caching.stats()})
 
 logger = logging.getLogger('api')
 
@@ -55,32 +55,320 @@ class UploadCSVView(APIView):
             )
 
         file = request.FILES["file"]
-        if not file.name.endswith(".csv"):
+        if not DatasetService.is_supported_upload(file.name):
             return Response(
-                {"error": "File must be a CSV"}, 
+                {"error": UPLOAD_SUFFIXES_HELP}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # User is guaranteed to be authenticated now
-        user = request.user
+        full_path, content_hash = DatasetService.store_upload(file)
+        return ingest_response(
+            request, full_path, DatasetService.dataset_name(file.name), content_hash
+        )
+
+
+class BatchUploadView(APIView):
+    """
+    Ingests several CSVs in one request: repeat the `files` field, or send a zip
+    of CSVs. Files are validated in parallel and each one that passes becomes its
+    own dataset; the response lists the outcome per file.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        files = request.FILES.getlist("files") + request.FILES.getlist("file")
+        if not files:
+            return Response(
+                {"error": "No files uploaded"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = batch.store_files(files)
+        if not entries:
+            return Response(
+                {"error": "The upload contains no CSV files."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = batch.max_files()
+        if len(entries) > limit:
+            for entry in entries:
+                DatasetService.remove_file(entry.get("path"))
+            return Response(
+                {"error": f"A batch may contain at most {limit} files."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
+        logger.info(f"Starting batch ingest of {len(entries)} file(s)")
+        results = batch.ingest(entries, request.user)
+        data = {
+            "created": sum(1 for r in results if r["status"] == "created"),
+            "duplicates": sum(1 for r in results if r["status"] == "duplicate"),
+            "failed": sum(1 for r in results if r["status"] == "failed"),
+            "results": results,
+        }
+        if data["failed"] == len(results):
+            data["error"] = f"No files could be ingested ({results[0]['file']}: {results[0]['error']})"
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+def wants_async(request):
+    """`?async=1` (or an `async` form field) overrides the INGEST_ASYNC default."""
+    flag = request.query_params.get("async", request.data.get("async"))
+    if flag is None:
+        return getattr(settings, "INGEST_ASYNC", False)
+    return str(flag).lower() in ("1", "true", "yes")
+
+
+def ingest_response(request, full_path, name, content_hash=""):
+    """
+    Ingests a stored CSV for the requesting user, inline (201 + dataset) or as a
+    background job (202 + job) depending on `wants_async`. If the user already has
+    a dataset with the same content or `Idempotency-Key`, the stored copy is
+    dropped and that dataset is returned with 200.
+    """
+    # User is guaranteed to be authenticated now
+    user = request.user
+    idempotency_key = request.headers.get("Idempotency-Key", "")[:255]
+
+    existing = DatasetService.find_existing(user, content_hash, idempotency_key)
+    if existing:
+        DatasetService.remove_file(full_path)
+        logger.info(f"Upload of {name} matches existing dataset: {existing.id}")
+        return Response(
+            DatasetSerializer(existing, context=DatasetSerializer.request_context(request)).data,
+            status=status.HTTP_200_OK
+        )
+
+    if wants_async(request):
+        if idempotency_key:
+            pending = Job.objects.filter(
+                user=user, kind=Job.KIND_INGEST,
+                state__in=[Job.STATE_QUEUED, Job.STATE_RUNNING],
+                payload__idempotency_key=idempotency_key,
+            ).first()
+            if pending:
+                DatasetService.remove_file(full_path)
+                return Response(JobSerializer(pending).data, status=status.HTTP_202_ACCEPTED)
+        job = jobs.enqueue(
+            Job.KIND_INGEST, user=user,
+            payload={
+                "file_path": full_path,
+                "name": name,
+                "content_hash": content_hash,
+                "idempotency_key": idempotency_key,
+            },
+        )
+        logger.info(f"Queued ingest job {job.id} for file: {name}")
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": reverse("job-detail", args=[job.id])},
+        )
+
+    try:
+        logger.info(f"Starting processing for file: {name}")
+        dataset = DatasetService.ingest_file(
+            full_path, name, user,
+            content_hash=content_hash, idempotency_key=idempotency_key,
+        )
+        logger.info(f"Successfully processed dataset: {dataset.id}")
+
+        serializer = DatasetSerializer(dataset, context=DatasetSerializer.request_context(request))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    except CSVValidationError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        return Response(
+            {"error": str(e), "details": e.report.as_dict()},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except ValueError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.exception("Unexpected error during CSV processing")
+        return Response(
+            {"error": "An internal error occurred while processing the file."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+class UploadSessionCreateView(APIView):
+    """
+    Starts a resumable upload. Body: `filename`, `size` (bytes) and `part_size` (bytes).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        filename = request.data.get("filename", "")
+        if not DatasetService.is_supported_upload(filename):
+            return Response(
+                {"error": UPLOAD_SUFFIXES_HELP},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         try:
-            logger.info(f"Starting processing for file: {file.name}")
-            dataset = DatasetService.process_dataset(file, user)
-            logger.info(f"Successfully processed dataset: {dataset.id}")
-            
-            serializer = DatasetSerializer(dataset)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            session = uploads.create_session(
+                request.user, filename,
+                int(request.data.get("size", 0)),
+                int(request.data.get("part_size", 0)),
+            )
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(uploads.describe(session), status=status.HTTP_201_CREATED)
 
+
+class UploadSessionDetailView(APIView):
+    """Lists the parts received so far (GET) or abandons the upload (DELETE)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, session_id):
+        session = get_object_or_404(UploadSession, id=session_id, user=request.user)
+        return Response(uploads.describe(session))
+
+    def delete(self, request, session_id):
+        session = get_object_or_404(UploadSession, id=session_id, user=request.user)
+        uploads.discard(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadPartView(APIView):
+    """
+    Receives one part as the raw request body. An optional `X-Content-SHA256`
+    header is checked against the received bytes.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, session_id, number):
+        session = get_object_or_404(
+            UploadSession, id=session_id, user=request.user, state=UploadSession.STATE_OPEN
+        )
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+            # Read straight from the WSGI stream so the part is never buffered whole
+            part = uploads.write_part(
+                session, number, request.stream, length,
+                sha256=request.headers.get("X-Content-SHA256"),
+            )
         except ValueError as e:
-            logger.warning(f"Validation error: {str(e)}")
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            logger.exception("Unexpected error during CSV processing")
+        return Response(part)
+
+
+class UploadSessionCompleteView(APIView):
+    """
+    Stitches the parts together and ingests the file (`?async=1` queues a job).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        session = get_object_or_404(UploadSession, id=session_id, user=request.user)
+        # Only one request may complete a session
+        claimed = UploadSession.objects.filter(
+            pk=session.pk, state=UploadSession.STATE_OPEN
+        ).update(state=UploadSession.STATE_COMPLETED, updated_at=timezone.now())
+        if not claimed:
             return Response(
-                {"error": "An internal error occurred while processing the file."}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": "Upload has already been completed"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        try:
+            full_path, content_hash = uploads.assemble(session)
+        except ValueError as e:
+            UploadSession.objects.filter(pk=session.pk).update(state=UploadSession.STATE_OPEN)
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        uploads.discard(session)
+        return ingest_response(
+            request, full_path, DatasetService.dataset_name(session.filename), content_hash
+        )
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Status of the user's background jobs (state, rows processed, progress, errors).
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user).order_by("-created_at")
+
+    @action(detail=True, methods=["get"])
+    def report(self, request, pk=None):
+        """
+        The PDF rendered by a succeeded report job. 409 while the job has not
+        succeeded; 410 once the dataset has changed or the file was evicted,
+        in which case a new job has to be started.
+        """
+        job = self.get_object()
+        if job.kind != Job.KIND_REPORT:
+            return Response({"error": "Not a report job"}, status=status.HTTP_404_NOT_FOUND)
+        if job.state != Job.STATE_SUCCEEDED:
+            return Response(
+                {"error": "The report is not ready", "job": JobSerializer(job).data},
+                status=status.HTTP_409_CONFLICT,
+            )
+        dataset = job.dataset
+        pdf = None
+        if dataset is not None and dataset.deleted_at is None and job.payload.get("version") == dataset.version:
+            pdf = reports.cached_pdf(dataset)
+        if pdf is None:
+            return Response(
+                {"error": "This report is no longer available; start a new report job."},
+                status=status.HTTP_410_GONE,
             )
+        response = HttpResponse(pdf, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{dataset.name}_report.pdf"'
+        return response
+
+DEFAULT_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def quantiles_response(request, datasets):
+    """
+    Answers `?q=0.5,0.9` (default: 5/25/50/75/95th percentiles) and `?fields=`
+    for the merged sketches of `datasets`, without reading any rows.
+    """
+    try:
+        qs = [float(q) for q in request.query_params.get("q", "").split(",") if q.strip()]
+    except ValueError:
+        return Response({"error": "q must be a comma-separated list of numbers"}, status=status.HTTP_400_BAD_REQUEST)
+    qs = qs or DEFAULT_QUANTILES
+    if not all(0 <= q <= 1 for q in qs):
+        return Response({"error": "q values must be between 0 and 1"}, status=status.HTTP_400_BAD_REQUEST)
+    numeric = list(NUMERIC_FIELDS.values())
+    fields = [f for f in request.query_params.get("fields", "").split(",") if f] or numeric
+    unknown = [f for f in fields if f not in numeric]
+    if unknown:
+        return Response(
+            {"error": f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(numeric)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    merged = {}
+    for dataset in datasets:
+        for field, sketch in DatasetService.column_sketches(dataset).items():
+            merged[field] = sketch if field not in merged else merged[field].merge(sketch)
+
+    result = {}
+    for field in fields:
+        sketch = merged.get(field)
+        if sketch is None:
+            continue
+        result[field] = {
+            "mean": sketch.moments.mean if sketch.moments.count else None,
+            "std": sketch.moments.std(ddof=1),
+            "min": sketch.digest.min,
+            "max": sketch.digest.max,
+            "quantiles": dict(zip((str(q) for q in qs), sketch.quantile(qs))),
+        }
+    return Response({
+        "datasets": [dataset.id for dataset in datasets],
+        "count": sum(dataset.row_count for dataset in datasets),
+        "fields": result,
+    })
+
 
 class DatasetViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -89,304 +377,291 @@ class DatasetViewSet(viewsets.ReadOnlyModelViewSet):
     # queryset = Dataset.objects.all().order_by("-created_at") # Removed to use get_queryset
     serializer_class = DatasetSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = [renderers.FastJSONRenderer, BrowsableAPIRenderer]
 
     def get_queryset(self):
-        return Dataset.objects.filter(uploaded_by=self.request.user).order_by("-created_at")
+        queryset = Dataset.objects.filter(uploaded_by=self.request.user).order_by("-created_at")
+        if self.action != "list":
+            queryset = queryset.select_related("summary")
+        return queryset
+
+    def get_object(self):
+        # Looked up once per request, whether by a conditional check or by the view
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def list(self, request, *args, **kwargs):
+        # Only changes on upload, append and delete, which invalidate it (see caching.py)
+        def compute():
+            return super(DatasetViewSet, self).list(request, *args, **kwargs).data
+
+        return Response(caching.get_or_set(request.user.id, f"datasets?{request.GET.urlencode()}", compute))
+
+    @conditional.dataset_resource
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_renderers(self):
+        classes = list(self.renderer_classes)
+        if self.action in ("retrieve", "equipment"):
+            # Rows can also go out column by column (JSON arrays or Arrow IPC)
+            classes[1:1] = renderers.columnar_renderers()
+        return [renderer() for renderer in classes]
+
+    def is_columnar(self):
+        renderer = getattr(self.request, "accepted_renderer", None)
+        return renderer is not None and renderer.format in renderers.COLUMNAR_FORMATS
+
+    def get_serializer_context(self):
+        context = {
+            **super().get_serializer_context(),
+            **DatasetSerializer.request_context(self.request),
+            "columnar": self.is_columnar(),
+        }
+        if context["columnar"]:
+            # Columnar formats exist to carry the rows, so they include them by default
+            context.setdefault("include", DatasetSerializer.OPTIONAL_FIELDS)
+        return context
 
     def get_serializer_class(self):
         if self.action == "list":
             return DatasetListSerializer
         return DatasetSerializer
 
+    @action(detail=False, methods=["get"], url_path=r"by-hash/(?P<content_hash>[0-9a-fA-F]{64})")
+    def by_hash(self, request, content_hash=None):
+        """Lets a client ask whether it already uploaded a file before sending it."""
+        dataset = DatasetService.find_existing(request.user, content_hash.lower())
+        if dataset is None:
+            return Response(
+                {"error": "No dataset with this content hash"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(DatasetListSerializer(dataset).data)
+
+    @action(detail=True, methods=["post"])
+    def append(self, request, pk=None):
+        """
+        Appends the rows of an uploaded CSV (`file`) to this dataset; the summary is
+        updated from the new rows alone.
+        """
+        dataset = self.get_object()
+        file = request.FILES.get("file")
+        if file is None:
+            return Response({"error": "No file uploaded"}, status=status.HTTP_400_BAD_REQUEST)
+        if not DatasetService.is_supported_upload(file.name):
+            return Response({"error": UPLOAD_SUFFIXES_HELP}, status=status.HTTP_400_BAD_REQUEST)
+
+        full_path, _ = DatasetService.store_upload(file)
+        try:
+            dataset = DatasetService.append_file(dataset, full_path)
+        except CSVValidationError as e:
+            logger.warning(f"Validation error: {str(e)}")
+            return Response(
+                {"error": str(e), "details": e.report.as_dict()},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except ValueError as e:
+            logger.warning(f"Validation error: {str(e)}")
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        logger.info(f"Appended {file.name} to dataset {dataset.id} ({dataset.row_count} rows)")
+        return Response(DatasetSerializer(dataset, context=DatasetSerializer.request_context(request)).data)
+
     @action(detail=True, methods=["get"])
+    @conditional.dataset_resource
     def equipment(self, request, pk=None):
-        equipment = Equipment.objects.filter(dataset_id=pk)
-        serializer = EquipmentSerializer(equipment, many=True)
-        return Response(serializer.data)
+        """
+        All rows, or with `limit`, `cursor` or any filter (`name`, `search`, `type`,
+        `flowrate_min`, `flowrate_max`, `pressure_min`, ...) one keyset page of the
+        matching rows: `{"results", "next_cursor", "next"}`. The `columnar` and `arrow`
+        formats send the rows as columns.
+        """
+        dataset = self.get_object()
+        try:
+            filters = EquipmentFilters.from_params(request.query_params)
+            if filters or "limit" in request.query_params or "cursor" in request.query_params:
+                page = pagination.equipment_page(request, dataset, filters)
+                if self.is_columnar():
+                    page["results"] = encoding.rows_to_columns(page["results"])
+                return Response(page)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if self.is_columnar():
+            return Response(encoding.equipment_columns(dataset))
+        # The full list is streamed straight from row tuples, never held in memory
+        return StreamingHttpResponse(
+            encoding.iter_equipment_json(dataset), content_type="application/json"
+        )
+
+    @action(detail=True, methods=["get"])
+    @conditional.dataset_resource
+    def export(self, request, pk=None):
+        """Downloads the rows as Parquet (`?filetype=parquet`) or CSV (default)."""
+        dataset = self.get_object()
+        base_name = os.path.splitext(dataset.name)[0]
+        if request.query_params.get("filetype") == "parquet":
+            if not storage.has_columnar(dataset):
+                return Response(
+                    {"error": "No columnar copy of this dataset"}, status=status.HTTP_404_NOT_FOUND
+                )
+            buffer = io.BytesIO()
+            import pyarrow.parquet as pq
+            pq.write_table(pq.read_table(dataset.columnar_path), buffer, compression="zstd")
+            response = HttpResponse(buffer.getvalue(), content_type="application/vnd.apache.parquet")
+            response["Content-Disposition"] = f'attachment; filename="{base_name}.parquet"'
+            return response
+
+        frame = storage.load_frame(dataset)
+        frame.columns = REQUIRED_COLUMNS
+        response = HttpResponse(frame.to_csv(index=False), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="{base_name}.csv"'
+        return response
 
     @action(detail=True, methods=["get"])
+    @conditional.dataset_resource
     def summary(self, request, pk=None):
-        try:
-            summary = DatasetSummary.objects.get(dataset_id=pk)
-            serializer = DatasetSummarySerializer(summary)
-            return Response(serializer.data)
-        except DatasetSummary.DoesNotExist:
+        dataset = self.get_object()
+        if not hasattr(dataset, "summary"):
             return Response(
                 {"error": "Summary not found"}, status=status.HTTP_404_NOT_FOUND
             )
+        data = caching.get_or_set(
+            request.user.id, f"summary:{dataset.id}:{dataset.version}",
+            lambda: DatasetSummarySerializer(dataset.summary).data,
+        )
+        return Response(data)
 
     @action(detail=True, methods=["get"])
-    def report(self, request, pk=None):
-        """Generates a PDF report for the dataset."""
-        try:
-            dataset = self.get_object()
-            summary = dataset.summary
-            equipment = dataset.equipment.all()
-            
-            return self._generate_pdf(dataset, summary, equipment)
-        except Exception as e:
-            logger.error(f"Error generating report: {e}")
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    @conditional.dataset_resource
+    def analytics(self, request, pk=None):
+        """
+        Chart-ready per-type statistics, histograms and correlation matrix, computed
+        at ingest. `?bins=` redraws the histograms with another number of bins.
+        """
+        dataset = self.get_object()
+        if not hasattr(dataset, "summary"):
+            return Response({"error": "Summary not found"}, status=status.HTTP_404_NOT_FOUND)
+        data = DatasetService.analytics(dataset)
+        if "bins" in request.query_params:
+            try:
+                bins = analytics.parse_bins(request.query_params["bins"])
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            data = {**data, "histograms": DatasetService.binned_histograms(dataset, bins)}
+        return Response(data)
 
-    def _generate_pdf(self, dataset, summary, equipment):
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=letter,
-            rightMargin=inch/2, leftMargin=inch/2,
-            topMargin=inch/2, bottomMargin=inch/2
-        )
+    @action(detail=True, methods=["get"])
+    @conditional.dataset_resource
+    def scatter(self, request, pk=None):
+        """
+        Two parameters against each other at a bounded size, however many rows:
+        `?x=temperature&y=pressure` (the default pair), then either `?mode=sample`
+        (default) for at most `?points=` rows stratified by equipment type, or
+        `?mode=density` for row counts on a `?bins=` x `?bins=` grid.
+        """
+        dataset = self.get_object()
+        try:
+            options = analytics.parse_scatter(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(DatasetService.scatter(dataset, **options))
 
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Styles
-        title_style = ParagraphStyle(
-            "ReportTitle", 
-            parent=styles["Heading1"], 
-            fontSize=24, 
-            textColor=colors.HexColor("#1a1a2e"),
-            alignment=1, 
-            spaceAfter=30
-        )
-        h2_style = ParagraphStyle(
-            "ReportH2", 
-            parent=styles["Heading2"], 
-            fontSize=16, 
-            textColor=colors.HexColor("#2d3436"),
-            spaceBefore=20, 
-            spaceAfter=10
+    @action(detail=True, methods=["get"])
+    @conditional.dataset_resource
+    def quantiles(self, request, pk=None):
+        """Percentiles, mean and std of the numeric fields, answered from the stored sketches."""
+        return quantiles_response(request, [self.get_object()])
+
+    @action(detail=False, methods=["get"], url_path="quantiles", url_name="quantiles-across")
+    def quantiles_across(self, request):
+        """
+        Same as `quantiles`, over several datasets merged: `?ids=1,2,3` (default:
+        all of the user's datasets).
+        """
+        datasets = self.get_queryset().select_related("summary").filter(summary__isnull=False)
+        ids = request.query_params.get("ids")
+        if ids:
+            try:
+                datasets = datasets.filter(id__in=[int(i) for i in ids.split(",") if i.strip()])
+            except ValueError:
+                return Response({"error": "ids must be a comma-separated list of dataset ids"},
+                                status=status.HTTP_400_BAD_REQUEST)
+        return quantiles_response(request, list(datasets))
+
+    @action(detail=True, methods=["post"], url_path="report-jobs")
+    def report_jobs(self, request, pk=None):
+        """
+        Starts rendering the PDF report in the background: 202 with the job to
+        poll at `/api/jobs/{id}/`, whose PDF is then at `/api/jobs/{id}/report/`.
+        A render already queued or running for the dataset is returned instead of
+        a new one; a report already rendered, or rendered right away because
+        `REPORT_ASYNC` is off, comes back as a finished job (200).
+        """
+        dataset = self.get_object()
+        in_progress = Job.objects.filter(
+            kind=Job.KIND_REPORT, dataset=dataset, state__in=[Job.STATE_QUEUED, Job.STATE_RUNNING],
+        ).order_by("id")
+        pending = in_progress.first()
+        if pending is not None:
+            job, code = pending, status.HTTP_202_ACCEPTED
+        elif reports.cached_pdf(dataset) is not None:
+            job = Job.objects.create(
+                kind=Job.KIND_REPORT, user=request.user, dataset=dataset, state=Job.STATE_SUCCEEDED,
+                payload={"version": dataset.version}, progress=1.0, finished_at=timezone.now(),
+            )
+            code = status.HTTP_200_OK
+        elif reports.background():
+            job, code = jobs.enqueue(Job.KIND_REPORT, user=request.user, dataset=dataset), status.HTTP_202_ACCEPTED
+            logger.info(f"Queued report job {job.id} for dataset {dataset.id}")
+        else:
+            # No worker expected: render now, under a job claimed from the start so that
+            # no worker that does run picks it up and renders the same file
+            job = jobs.enqueue_claimed(
+                Job.KIND_REPORT, f"request:{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}",
+                user=request.user, dataset=dataset,
+            )
+            earlier = in_progress.filter(id__lt=job.id).first()
+            if earlier is not None:
+                # Another request or worker got there first; follow its job instead
+                job.delete()
+                job, code = earlier, status.HTTP_202_ACCEPTED
+            else:
+                jobs.run(job)
+                job.refresh_from_db()
+                code = status.HTTP_200_OK
+        return Response(
+            JobSerializer(job).data, status=code, headers={"Location": reverse("job-detail", args=[job.id])}
         )
 
-        # Title
-        elements.append(Paragraph("Chemical Equipment Analysis Report", title_style))
-        elements.append(Paragraph(f"<b>Dataset Name:</b> {dataset.name}", styles["Normal"]))
-        elements.append(Paragraph(f"<b>Date Generated:</b> {dataset.created_at.strftime('%Y-%m-%d %H:%M')}", styles["Normal"]))
-        elements.append(Spacer(1, 20))
-
-        # Summary Table
-        elements.append(Paragraph("Executive Summary", h2_style))
-        summary_data = [
-            ["Metric", "Value", "Metric", "Value"],
-            ["Total Equipment", summary.total_count, "Avg Flowrate", f"{summary.avg_flowrate:.2f}"],
-            ["Avg Pressure", f"{summary.avg_pressure:.2f}", "Avg Temperature", f"{summary.avg_temperature:.2f}"],
-            ["Max Pressure", f"{summary.max_pressure:.2f}", "Max Temperature", f"{summary.max_temperature:.2f}"]
-        ]
-        
-        t = Table(summary_data, colWidths=[2*inch, 1.5*inch, 2*inch, 1.5*inch])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#f1f2f6")),
-            ('GRID', (0,0), (-1,-1), 1, colors.HexColor("#dfe6e9")),
-            ('FONTNAME', (0,0), (-1,-1), 'Helvetica'),
-            ('PADDING', (0,0), (-1,-1), 12),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 20))
-
-        # Advanced Statistics (Calculated on the fly)
-        # Convert queryset/list to DataFrame for easy analysis
-        df = pd.DataFrame(list(equipment.values()))
-        if not df.empty:
-            elements.append(Paragraph("Detailed Statistical Analysis", h2_style))
-            
-            # Calculate Stats
-            stats_data = [["Parameter", "Mean", "Median", "Std Dev", "Min", "Max"]]
-            for param in ['flowrate', 'pressure', 'temperature']:
-                if param in df.columns:
-                    stats_data.append([
-                        param.capitalize(),
-                        f"{df[param].mean():.2f}",
-                        f"{df[param].median():.2f}",
-                        f"{df[param].std():.2f}",
-                        f"{df[param].min():.2f}",
-                        f"{df[param].max():.2f}"
-                    ])
-            
-            t_stats = Table(stats_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1*inch, 1*inch, 1*inch])
-            t_stats.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#dfe6e9")),
-                ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-                ('ALIGN', (1,1), (-1,-1), 'CENTER'),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ]))
-            elements.append(t_stats)
-            elements.append(Spacer(1, 20))
-
-        # Equipment List (Truncated if too long, or full?)
-        # For a report, usually full list is okay unless huge. Let's list top 50 or so?
-        # Requirement says "Generate PDF report", implies full report. 
-        elements.append(Paragraph("Detailed Equipment List", h2_style))
-        
-        data_table = [["Name", "Type", "Flowrate", "Pressure", "Temp"]]
-        for eq in equipment:  
-            data_table.append([
-                eq.equipment_name,
-                eq.equipment_type,
-                f"{eq.flowrate:.2f}",
-                f"{eq.pressure:.2f}",
-                f"{eq.temperature:.2f}"
-            ])
-            
-        t_data = Table(data_table, repeatRows=1)
-        t_data.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#2d3436")),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-            ('FONTSIZE', (0,0), (-1,-1), 9),
-        ]))
-        elements.append(t_data)
-        elements.append(Spacer(1, 20))
-
-        # Visualizations Section
-        elements.append(Paragraph("Visualizations", h2_style))
-        
-        # 1. Type Distribution Pie Chart
-        pie_chart = self._create_pie_chart(summary.type_distribution)
-        if pie_chart:
-            elements.append(Paragraph("Equipment Type Distribution", styles["Heading3"]))
-            elements.append(pie_chart)
-            elements.append(Spacer(1, 15))
-
-        # 2. Averages Bar Chart
-        bar_chart = self._create_bar_chart(summary)
-        if bar_chart:
-            elements.append(Paragraph("Average Performance Metrics", styles["Heading3"]))
-            elements.append(bar_chart)
-            elements.append(Spacer(1, 15))
-
-        # 3. Correlation Heatmap
-        corr_heatmap = self._create_correlation_heatmap(df)
-        if corr_heatmap:
-            elements.append(Paragraph("Parameter Correlation Matrix", styles["Heading3"]))
-            elements.append(corr_heatmap)
-            elements.append(Spacer(1, 15))
-
-        doc.build(elements)
-        buffer.seek(0)
-        
-        from django.http import HttpResponse
-        response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
-        response["Content-Disposition"] = f'attachment; filename="{dataset.name}_report.pdf"'
-        return response
-
-    def _create_correlation_heatmap(self, df):
-        """Generate a correlation heatmap Image flowable"""
-        if df.empty:
-            return None
-        
-        try:
-            cols = ['flowrate', 'pressure', 'temperature']
-            # Ensure columns exist
-            cols = [c for c in cols if c in df.columns]
-            if len(cols) < 2:
-                return None
-                
-            corr_matrix = df[cols].corr()
-            
-            plt.figure(figsize=(5, 4))
-            plt.imshow(corr_matrix, cmap='coolwarm', interpolation='nearest', vmin=-1, vmax=1)
-            plt.colorbar()
-            
-            # Add labels
-            ticks = np.arange(len(cols))
-            plt.xticks(ticks, [c.capitalize() for c in cols], rotation=45)
-            plt.yticks(ticks, [c.capitalize() for c in cols])
-            plt.title('Correlation Matrix')
-            
-            # Add text annotations
-            for i in range(len(cols)):
-                for j in range(len(cols)):
-                    text = f"{corr_matrix.iloc[i, j]:.2f}"
-                    plt.text(j, i, text, ha="center", va="center", color="black")
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-            plt.close()
-            
-            img_buffer.seek(0)
-            return Image(img_buffer, width=4*inch, height=3.2*inch)
-        except Exception as e:
-            logger.error(f"Failed to create heatmap: {e}")
-            return None
-
-    def _create_pie_chart(self, distribution):
-        """Generate a pie chart Image flowable"""
-        if not distribution:
-            return None
-            
-        try:
-            plt.figure(figsize=(6, 4))
-            labels = list(distribution.keys())
-            sizes = list(distribution.values())
-            colors = ['#00D9A5', '#FF6B35', '#00A8E8', '#FFD166', '#EF476F', '#8338EC']
-            
-            plt.pie(sizes, labels=labels, autopct='%1.1f%%', colors=colors[:len(labels)], startangle=90)
-            plt.axis('equal')
-            plt.title('Equipment Types')
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-            plt.close()
-            
-            img_buffer.seek(0)
-            return Image(img_buffer, width=5*inch, height=3.5*inch)
-        except Exception as e:
-            logger.error(f"Failed to create pie chart: {e}")
-            return None
-
-    def _create_bar_chart(self, summary):
-        """Generate a bar chart Image flowable"""
+    @action(detail=True, methods=["get"])
+    @conditional.dataset_resource(variant=f"report:{reports.TEMPLATE_VERSION}")
+    def report(self, request, pk=None):
+        """PDF report for the dataset, rendered once per version and then served from disk."""
         try:
-            plt.figure(figsize=(6, 4))
-            metrics = ['Avg Flow', 'Avg Pressure', 'Avg Temp']
-            values = [summary.avg_flowrate, summary.avg_pressure, summary.avg_temperature]
-            colors = ['#00D9A5', '#FF6B35', '#00A8E8']
-            
-            bars = plt.bar(metrics, values, color=colors)
-            plt.ylabel('Values')
-            plt.title('Average Metrics')
-            plt.grid(axis='y', alpha=0.3)
-            
-            # Add values on top of bars
-            for bar in bars:
-                height = bar.get_height()
-                plt.text(bar.get_x() + bar.get_width()/2., height,
-                        f'{height:.2f}',
-                        ha='center', va='bottom')
-            
-            img_buffer = io.BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-            plt.close()
-            
-            img_buffer.seek(0)
-            return Image(img_buffer, width=5*inch, height=3.5*inch)
+            dataset = self.get_object()
+            response = HttpResponse(reports.get_pdf(dataset), content_type="application/pdf")
+            response["Content-Disposition"] = f'attachment; filename="{dataset.name}_report.pdf"'
+            return response
         except Exception as e:
-            logger.error(f"Failed to create bar chart: {e}")
-            return None
+            logger.error(f"Error generating report: {e}")
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class DatasetHistoryView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
-        datasets = Dataset.objects.filter(uploaded_by=request.user).order_by("-created_at")[:5]
-        serializer = DatasetListSerializer(datasets, many=True)
-        return Response(serializer.data)
+        def compute():
+            datasets = Dataset.objects.filter(uploaded_by=request.user).order_by("-created_at")[:5]
+            return DatasetListSerializer(datasets, many=True).data
+
+        return Response(caching.get_or_set(request.user.id, "history", compute))
 
     def delete(self, request):
-        """Clear all dataset history for the authenticated user."""
+        """
+        Clear all dataset history for the authenticated user. Datasets are hidden
+        immediately; their rows and files are purged in the background.
+        """
         try:
-            # Get all datasets for this user
-            datasets = Dataset.objects.filter(uploaded_by=request.user)
-            count = datasets.count()
-
-            # Delete associated files and records
-            for dataset in datasets:
-                if dataset.file_path and os.path.exists(dataset.file_path):
-                    try:
-                        os.remove(dataset.file_path)
-                    except OSError:
-                        pass  # Log this in production
-                dataset.delete()
+            count = retention.soft_delete(request.user)
 
             logger.info(f"User {request.user.username} cleared {count} datasets from history")
             return Response(
@@ -452,6 +727,19 @@ class LoginView(APIView):
         )
 
 
+class LogoutView(APIView):
+    """
+    Revokes the token the request was made with; the next login issues a new
+    one. Cached lookups of the token are dropped with it.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if isinstance(request.auth, Token):
+            request.auth.delete()
+        return Response({"message": "Logged out"})
+
+
 class ValidateTokenView(APIView):
     """
     Validates if the provided authentication token is still valid.
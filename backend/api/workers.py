@@ -0,0 +1,14 @@
+"""
+Set-up of the processes ``run_worker --concurrency`` runs jobs in. Kept free of
+model imports: it runs before Django is set up in the new interpreter.
+"""
+import signal
+
+import django
+
+
+def init_process():
+    # The parent worker handles Ctrl-C and SIGTERM by letting running jobs finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    django.setup()
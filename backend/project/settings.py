@@ -66,9 +66,37 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Wait for a concurrent writer (e.g. a background worker) instead of failing
+        "OPTIONS": {"timeout": 20},
     }
 }
 
+# Files under BASE_DIR/cache by default, shared by every gunicorn worker and run_worker
+# process, so invalidations reach all of them. A per-process backend (LocMemCache) turns
+# the per-user API cache off, since its invalidations would only reach one process.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / "cache")),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    }
+}
+
+# Token lookups cached by api.authentication.CachedTokenAuthentication: in this process
+# (bounded LRU) and, when CACHE_BACKEND is shared by workers, as user ids there. With a
+# shared backend each local hit is checked against it, so revocations apply at once. With
+# a per-process backend (locmem, dummy) they cannot be, and a token revoked in one worker
+# keeps working in the others for up to AUTH_TOKEN_PRIVATE_TTL seconds.
+AUTH_TOKEN_CACHE_SIZE = 1024
+AUTH_TOKEN_LOCAL_TTL = 30
+AUTH_TOKEN_PRIVATE_TTL = 3
+AUTH_TOKEN_CACHE_TTL = 5 * 60
+
+# Per-user cache of history, dataset lists and summaries (api/caching.py)
+API_CACHE_ENABLED = os.environ.get("API_CACHE_ENABLED", "True") == "True"
+API_CACHE_ALIAS = "default"
+API_CACHE_TIMEOUT = 5 * 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -91,7 +119,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
     ],
@@ -102,6 +130,72 @@ REST_FRAMEWORK = {
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760
 
+# Resumable uploads (api/uploads/) are not bound by DATA_UPLOAD_MAX_MEMORY_SIZE
+UPLOAD_PART_MAX_SIZE = 64 * 1024 * 1024
+UPLOAD_SESSION_MAX_SIZE = int(os.environ.get("UPLOAD_SESSION_MAX_SIZE", str(2 * 1024 ** 3)))
+# Sessions without a part received for this many seconds are removed by retention passes
+UPLOAD_SESSION_EXPIRY = int(os.environ.get("UPLOAD_SESSION_EXPIRY", str(24 * 60 * 60)))
+
+# Uploaded CSVs are parsed and inserted this many rows at a time
+CSV_INGEST_CHUNK_SIZE = int(os.environ.get("CSV_INGEST_CHUNK_SIZE", "50000"))
+# Rows per INSERT statement when bulk creating Equipment
+EQUIPMENT_BULK_BATCH_SIZE = int(os.environ.get("EQUIPMENT_BULK_BATCH_SIZE", "5000"))
+# How Equipment rows are bulk loaded: "auto" picks COPY on PostgreSQL, executemany on
+# SQLite and bulk_create elsewhere; "copy", "executemany" or "orm" force one path.
+EQUIPMENT_BULK_LOADER = os.environ.get("EQUIPMENT_BULK_LOADER", "auto")
+# Batch uploads: files per request, and worker processes used to parse/validate them
+# (default: up to 4, bounded by CPU count)
+BATCH_INGEST_MAX_FILES = int(os.environ.get("BATCH_INGEST_MAX_FILES", "100"))
+BATCH_INGEST_WORKERS = int(os.environ.get("BATCH_INGEST_WORKERS", "0")) or None
+# Keyset pages of /api/datasets/<id>/equipment/?limit=&cursor=
+EQUIPMENT_PAGE_SIZE = 50
+EQUIPMENT_PAGE_MAX_SIZE = 1000
+# Buffer compression of Arrow IPC responses (?format=arrow): "zstd", "lz4" or "" for none
+ARROW_IPC_COMPRESSION = os.environ.get("ARROW_IPC_COMPRESSION", "zstd")
+# Cache-Control of dataset, equipment, summary and report responses; they carry ETags
+# and Last-Modified, so clients revalidate with a cheap conditional GET
+DATASET_CACHE_CONTROL = "private, no-cache"
+# Where ingested rows are kept: "rows" (Equipment table), "columnar" (Parquet only) or "both".
+# Columnar storage needs pyarrow; analytics and reports read it when present.
+DATASET_STORAGE = os.environ.get("DATASET_STORAGE", "both")
+COLUMNAR_COMPRESSION = "zstd"
+# t-digest compression for the per-parameter quantile sketches kept with each summary
+# (about compression / 2 centroids; higher is more accurate and larger)
+SKETCH_COMPRESSION = int(os.environ.get("SKETCH_COMPRESSION", "200"))
+# Bins per parameter in the stored chart analytics (api/analytics.py); ?bins= overrides per request
+ANALYTICS_HISTOGRAM_BINS = 15
+# scatter/ endpoint: default sample size, density grid bins per axis, and how long
+# results (and analytics/?bins= histograms) stay in the cache (keys include the dataset version, so appends never hit stale ones)
+SCATTER_SAMPLE_POINTS = 2000
+DENSITY_GRID_BINS = 64
+SCATTER_CACHE_TIMEOUT = 60 * 60
+# Rendered PDF reports are kept under MEDIA_ROOT/reports/, least recently used evicted first
+REPORT_CACHE_ENABLED = os.environ.get("REPORT_CACHE_ENABLED", "True") == "True"
+REPORT_CACHE_MAX_BYTES = int(os.environ.get("REPORT_CACHE_MAX_BYTES", str(512 * 1024 ** 2)))
+# Queue a job rendering the report after every ingest, so the first download is cached too
+REPORT_PRERENDER = os.environ.get("REPORT_PRERENDER", "False") == "True"
+# Maximum number of bad cells echoed back in an upload's validation report
+CSV_VALIDATION_MAX_ERRORS = 20
+
+# Background jobs (run workers with `python manage.py run_worker`)
+# When True, uploads are queued and answered with 202 + a job instead of being processed inline
+INGEST_ASYNC = os.environ.get("INGEST_ASYNC", "False") == "True"
+# A running job whose lease is not renewed within this many seconds can be re-claimed
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "900"))
+JOB_MAX_ATTEMPTS = 3
+JOB_POLL_INTERVAL = 1.0
+# Jobs a worker runs at once, each in its own process (run_worker --concurrency overrides)
+JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "1"))
+# Report jobs (POST datasets/{id}/report-jobs/) go to the worker; defaults to INGEST_ASYNC.
+# Otherwise they are rendered within the request that starts them.
+REPORT_ASYNC = os.environ.get("REPORT_ASYNC", str(INGEST_ASYNC)) == "True"
+
+# Each user keeps this many of their newest datasets; older ones are purged after an upload.
+# RETENTION_ASYNC queues the purge (and file removal) for the worker instead of running it
+# right after the upload commits; it defaults to INGEST_ASYNC.
+DATASET_RETENTION_LIMIT = int(os.environ.get("DATASET_RETENTION_LIMIT", "5"))
+RETENTION_ASYNC = os.environ.get("RETENTION_ASYNC", str(INGEST_ASYNC)) == "True"
+
 # Rich Logging Configuration
 LOGGING = {
     "version": 1,
@@ -1,8 +1,35 @@
 """
 API Client for Django Backend Communication
 """
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+import numpy as np
 import requests
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
+
+# Files larger than this go through the resumable upload API
+RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+# Column-oriented response formats; Arrow is preferred when pyarrow is installed
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+COLUMNAR_MEDIA_TYPE = "application/vnd.equipment.columnar+json"
+# Responses kept with their ETag for conditional re-fetching: at most this many, and
+# this many response bytes in all (larger responses are not kept)
+VALIDATOR_CACHE_SIZE = 16
+VALIDATOR_CACHE_MAX_BYTES = 16 * 1024 * 1024
+# Seconds between status requests while a job (report render, queued ingest) runs on the server
+JOB_POLL_INTERVAL = 1.0
 
 
 class ApiClient:
@@ -14,6 +41,11 @@ class ApiClient:
         self.user_id: Optional[int] = None
         self.username: Optional[str] = None
         self.token: Optional[str] = None # Added token storage
+        # Unfinished resumable uploads: (path, size, mtime) -> session id
+        self._pending_uploads: Dict[tuple, str] = {}
+        # (url, params, Accept) -> (ETag, decoded response, body size), least recently used first
+        self._validators: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._validator_bytes = 0
     
     def _url(self, endpoint: str) -> str:
         """Build full URL from endpoint"""
@@ -40,6 +72,60 @@ class ApiClient:
             raise ApiError(error_msg, response.status_code)
         
         return data
+
+    def _handle_upload(self, response: requests.Response,
+                       on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Process an upload's response into the dataset. A server that ingests in
+        the background answers 202 with the job instead: it is waited for, and
+        the dataset it created is fetched.
+        """
+        data = self._handle_response(response)
+        if response.status_code != 202:
+            return data
+        job = self.wait_for_job(data, on_progress, failure="Processing the upload failed")
+        return self.get_dataset(job["dataset"])
+
+    def _get_cached(self, endpoint: str, decode: Callable[[requests.Response], Any],
+                    params: Optional[Dict[str, Any]] = None,
+                    headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        GET with a local validator cache. The ETag and decoded result of the last
+        response per URL, parameters and Accept header are kept; the request sends
+        If-None-Match, and a 304 answer returns the kept result without a body.
+        The cache is bounded by VALIDATOR_CACHE_SIZE entries and, counting response
+        bodies, VALIDATOR_CACHE_MAX_BYTES.
+        """
+        headers = {**self._get_headers(), **(headers or {})}
+        url = self._url(endpoint)
+        key = (url, tuple(sorted((params or {}).items())), headers.get("Accept", ""))
+        cached = self._validators.get(key)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = self.session.get(url, params=params, headers=headers)
+        if response.status_code == 304 and cached:
+            self._validators.move_to_end(key)
+            return cached[1]
+        result = decode(response)
+        if cached:
+            # Replaced below, or stale
+            self._drop_validator(key)
+        etag = response.headers.get("ETag")
+        size = len(response.content)
+        if response.ok and etag and size <= VALIDATOR_CACHE_MAX_BYTES:
+            self._validators[key] = (etag, result, size)
+            self._validator_bytes += size
+            while (len(self._validators) > VALIDATOR_CACHE_SIZE
+                   or self._validator_bytes > VALIDATOR_CACHE_MAX_BYTES):
+                self._drop_validator(next(iter(self._validators)))
+        return result
+
+    def _drop_validator(self, key: tuple) -> None:
+        self._validator_bytes -= self._validators.pop(key)[2]
+
+    def _clear_validators(self) -> None:
+        self._validators.clear()
+        self._validator_bytes = 0
     
     # ============ Authentication ============
     
@@ -53,6 +139,7 @@ class ApiClient:
         self.user_id = data.get("user_id")
         self.username = data.get("username")
         self.token = data.get("token") # Store token
+        self._clear_validators()
         return data
     
     def register(self, username: str, password: str, email: str = "") -> Dict[str, Any]:
@@ -70,11 +157,17 @@ class ApiClient:
         return data
     
     def logout(self):
-        """Clear session data"""
+        """Revoke the token on the server (best effort) and clear session data"""
+        if self.token:
+            try:
+                self.session.post(self._url("logout/"), headers=self._get_headers(), timeout=5)
+            except requests.RequestException:
+                pass  # Logging out locally must not depend on the server
         self.user_id = None
         self.username = None
         self.token = None
         self.session = requests.Session()
+        self._clear_validators()
     
     @property
     def is_logged_in(self) -> bool:
@@ -82,13 +175,179 @@ class ApiClient:
     
     # ============ Dataset Operations ============
     
-    def upload_csv(self, file_path: str) -> Dict[str, Any]:
-        """Upload CSV file to backend"""
+    def upload_csv(self, file_path: str, compress: Optional[str] = None,
+                   file_name: Optional[str] = None,
+                   on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Upload CSV file to backend. compress="gzip" or "zstd" compresses the
+        file on the fly (into a temporary file) before sending it. If the server
+        queues the ingest, on_progress(job) is called with every status update.
+        """
+        if compress and not is_compressed(file_path):
+            with compressed_copy(file_path, compress) as (tmp_path, name):
+                return self.upload_csv(tmp_path, file_name=name, on_progress=on_progress)
+
+        return self._post_file("upload/", file_path, file_name or base_name(file_path), on_progress)
+    
+    def upload_batch(self, file_paths: List[str], compress: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Upload several CSVs (or zips of CSVs) as one batch. The server validates
+        them in parallel and reports the outcome per file in "results".
+        """
+        with ExitStack() as stack:
+            files = []
+            for file_path in file_paths:
+                name = base_name(file_path)
+                if compress and not is_compressed(file_path):
+                    file_path, name = stack.enter_context(compressed_copy(file_path, compress))
+                f = stack.enter_context(open(file_path, 'rb'))
+                files.append(('files', (name, f, 'application/octet-stream' if is_compressed(name) else 'text/csv')))
+            response = self.session.post(self._url("upload/batch/"), files=files, headers=self._get_headers())
+        return self._handle_response(response)
+
+    def append_csv(self, dataset_id: int, file_path: str, compress: Optional[str] = None) -> Dict[str, Any]:
+        """Append the rows of a CSV to an existing dataset; returns the updated dataset."""
+        if compress and not is_compressed(file_path):
+            with compressed_copy(file_path, compress) as (tmp_path, name):
+                return self._post_file(f"datasets/{dataset_id}/append/", tmp_path, name)
+        return self._post_file(f"datasets/{dataset_id}/append/", file_path, base_name(file_path))
+
+    def _post_file(self, endpoint: str, file_path: str, file_name: str,
+                   on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         with open(file_path, 'rb') as f:
-            files = {'file': (file_path.split('\\')[-1].split('/')[-1], f, 'text/csv')}
-            response = self.session.post(self._url("upload/"), files=files, headers=self._get_headers())
+            files = {'file': (file_name, f, 'application/octet-stream' if is_compressed(file_name) else 'text/csv')}
+            response = self.session.post(self._url(endpoint), files=files, headers=self._get_headers())
+        return self._handle_upload(response, on_progress)
+
+    def find_dataset_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the dataset already uploaded with this SHA-256, or None"""
+        response = self.session.get(
+            self._url(f"datasets/by-hash/{content_hash}/"), headers=self._get_headers()
+        )
+        if response.status_code == 404:
+            return None
         return self._handle_response(response)
-    
+
+    def upload_file(self, file_path: str, compress: Optional[str] = None,
+                    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Upload a CSV, switching to the resumable protocol for large files.
+        If the server already has identical content, nothing is sent.
+        compress="gzip" or "zstd" compresses plain CSVs before sending.
+        Returns the dataset, also when the server ingests in the background;
+        on_progress(job) is then called with every status update.
+        """
+        if compress and not is_compressed(file_path):
+            with compressed_copy(file_path, compress) as (tmp_path, name):
+                return self._upload_prepared(tmp_path, name, on_progress)
+        return self._upload_prepared(file_path, base_name(file_path), on_progress)
+
+    def _upload_prepared(self, file_path: str, file_name: str,
+                         on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        content_hash = file_sha256(file_path)
+        existing = self.find_dataset_by_hash(content_hash)
+        if existing:
+            return existing
+        size = os.path.getsize(file_path)
+        if size > RESUMABLE_UPLOAD_THRESHOLD:
+            return self.upload_csv_resumable(
+                file_path, file_name=file_name, resume_key=(content_hash, size), on_progress=on_progress
+            )
+        return self.upload_csv(file_path, file_name=file_name, on_progress=on_progress)
+
+    # ============ Resumable Uploads ============
+
+    def create_upload_session(self, file_name: str, size: int, part_size: int) -> Dict[str, Any]:
+        """Start a resumable upload session"""
+        response = self.session.post(
+            self._url("uploads/"),
+            json={"filename": file_name, "size": size, "part_size": part_size},
+            headers=self._get_headers()
+        )
+        return self._handle_response(response)
+
+    def get_upload_session(self, session_id: str) -> Dict[str, Any]:
+        """Get received/missing parts of an upload session"""
+        response = self.session.get(self._url(f"uploads/{session_id}/"), headers=self._get_headers())
+        return self._handle_response(response)
+
+    def upload_part(self, session_id: str, number: int, data: bytes) -> Dict[str, Any]:
+        """Send one part of a resumable upload"""
+        headers = self._get_headers()
+        headers["Content-Type"] = "application/octet-stream"
+        headers["X-Content-SHA256"] = hashlib.sha256(data).hexdigest()
+        response = self.session.put(
+            self._url(f"uploads/{session_id}/parts/{number}/"), data=data, headers=headers
+        )
+        return self._handle_response(response)
+
+    def complete_upload_session(self, session_id: str,
+                                on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Finish a resumable upload and ingest the file; returns the dataset"""
+        response = self.session.post(self._url(f"uploads/{session_id}/complete/"), headers=self._get_headers())
+        return self._handle_upload(response, on_progress)
+
+    def upload_csv_resumable(
+        self,
+        file_path: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_workers: int = 4,
+        retries: int = 3,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        file_name: Optional[str] = None,
+        resume_key: Optional[tuple] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a CSV in parallel parts. If a previous attempt for the same file
+        (or the same resume_key) failed, its session is resumed and only the
+        missing parts are sent. progress_callback(parts_done, parts_total) is
+        called as parts land, and on_progress(job) while a queued ingest runs.
+        """
+        stat = os.stat(file_path)
+        key = resume_key or (os.path.abspath(file_path), stat.st_size, stat.st_mtime)
+        file_name = file_name or base_name(file_path)
+
+        state = None
+        session_id = self._pending_uploads.get(key)
+        if session_id:
+            try:
+                state = self.get_upload_session(session_id)
+            except ApiError as e:
+                if e.status_code != 404:
+                    raise
+        if state is None or state.get("state") != "open":
+            state = self.create_upload_session(file_name, stat.st_size, part_size)
+        session_id = state["id"]
+        part_size = state["part_size"]
+        self._pending_uploads[key] = session_id
+
+        missing = state["missing"]
+        total = state["part_count"]
+        done = total - len(missing)
+
+        def send(number: int):
+            with open(file_path, 'rb') as f:
+                f.seek(number * part_size)
+                data = f.read(part_size)
+            for attempt in range(retries + 1):
+                try:
+                    return self.upload_part(session_id, number, data)
+                except (requests.RequestException, ApiError) as e:
+                    if attempt == retries or (isinstance(e, ApiError) and 400 <= e.status_code < 500):
+                        raise
+                    time.sleep(2 ** attempt)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for _ in pool.map(send, missing):
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total)
+
+        result = self.complete_upload_session(session_id, on_progress)
+        self._pending_uploads.pop(key, None)
+        return result
+
     def get_datasets(self) -> List[Dict[str, Any]]:
         """Get list of all datasets"""
         response = self.session.get(self._url("datasets/"), headers=self._get_headers())
@@ -96,18 +355,79 @@ class ApiClient:
     
     def get_dataset(self, dataset_id: int) -> Dict[str, Any]:
         """Get single dataset details"""
-        response = self.session.get(self._url(f"datasets/{dataset_id}/"), headers=self._get_headers())
-        return self._handle_response(response)
+        return self._get_cached(f"datasets/{dataset_id}/", self._handle_response)
     
     def get_equipment(self, dataset_id: int) -> List[Dict[str, Any]]:
         """Get equipment list for a dataset"""
-        response = self.session.get(self._url(f"datasets/{dataset_id}/equipment/"), headers=self._get_headers())
+        return self._get_cached(f"datasets/{dataset_id}/equipment/", self._handle_response)
+    
+    def get_equipment_columns(self, dataset_id: int) -> Dict[str, np.ndarray]:
+        """
+        Get all equipment rows as {field: NumPy array}, transferred column by
+        column (Arrow IPC when pyarrow is installed, columnar JSON otherwise).
+        """
+        endpoint = f"datasets/{dataset_id}/equipment/"
+        if importlib.util.find_spec("pyarrow") is not None:
+            # The server ignores q-values, so ask for one format at a time
+            try:
+                return self._get_cached(endpoint, self._handle_columns, headers={"Accept": ARROW_MEDIA_TYPE})
+            except ApiError as e:
+                if e.status_code != 406:
+                    raise
+        return self._get_cached(endpoint, self._handle_columns, headers={"Accept": COLUMNAR_MEDIA_TYPE})
+
+    def _handle_columns(self, response: requests.Response) -> Dict[str, np.ndarray]:
+        columns, meta = decode_columns(response)
+        if not response.ok:
+            error_msg = (meta or {}).get("error") or (meta or {}).get("detail")
+            raise ApiError(error_msg or f"Request failed with status {response.status_code}",
+                           response.status_code)
+        return columns
+    
+    def get_equipment_page(self, dataset_id: int, limit: int = 50, cursor: Optional[str] = None,
+                           **filters: Any) -> Dict[str, Any]:
+        """
+        Get one page of equipment rows, filtered on the server. filters are
+        name, search, type and flowrate_min/_max, pressure_min/_max,
+        temperature_min/_max. Returns {"results", "next_cursor", "next"};
+        pass next_cursor back to get the following page.
+        """
+        params = {k: v for k, v in filters.items() if v not in (None, "")}
+        params["limit"] = limit
+        if cursor:
+            params["cursor"] = cursor
+        response = self.session.get(
+            self._url(f"datasets/{dataset_id}/equipment/"), params=params, headers=self._get_headers()
+        )
         return self._handle_response(response)
     
     def get_summary(self, dataset_id: int) -> Dict[str, Any]:
         """Get summary statistics for a dataset"""
-        response = self.session.get(self._url(f"datasets/{dataset_id}/summary/"), headers=self._get_headers())
-        return self._handle_response(response)
+        return self._get_cached(f"datasets/{dataset_id}/summary/", self._handle_response)
+    
+    def get_analytics(self, dataset_id: int, bins: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get chart-ready statistics computed at ingest: by_type (count and
+        mean/std/min/max per parameter), histograms ({edges, counts} per
+        parameter) and correlation ({fields, matrix}).
+        """
+        params = {"bins": bins} if bins else None
+        return self._get_cached(f"datasets/{dataset_id}/analytics/", self._handle_response, params=params)
+    
+    def get_scatter(self, dataset_id: int, x: str = "temperature", y: str = "pressure",
+                    mode: str = "sample", points: Optional[int] = None,
+                    bins: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get x against y at a bounded size: mode "sample" returns at most
+        `points` rows grouped by type ({type, count, x, y} per group), mode
+        "density" returns row counts on a bins x bins grid (x_edges, y_edges, counts).
+        """
+        params = {"x": x, "y": y, "mode": mode}
+        if points:
+            params["points"] = points
+        if bins:
+            params["bins"] = bins
+        return self._get_cached(f"datasets/{dataset_id}/scatter/", self._handle_response, params=params)
     
     def get_history(self) -> List[Dict[str, Any]]:
         """Get last 5 uploaded datasets"""
@@ -121,10 +441,125 @@ class ApiClient:
 
     def download_report(self, dataset_id: int) -> bytes:
         """Download PDF report for dataset"""
-        response = self.session.get(self._url(f"datasets/{dataset_id}/report/"), headers=self._get_headers())
+        def content(response: requests.Response) -> bytes:
+            if not response.ok:
+                raise ApiError(f"Failed to download report: {response.status_code}", response.status_code)
+            return response.content
+        return self._get_cached(f"datasets/{dataset_id}/report/", content)
+    
+    def start_report(self, dataset_id: int) -> Dict[str, Any]:
+        """Start rendering a dataset's PDF report on the server; returns the job"""
+        response = self.session.post(
+            self._url(f"datasets/{dataset_id}/report-jobs/"), headers=self._get_headers()
+        )
+        return self._handle_response(response)
+    
+    def get_job(self, job_id: int) -> Dict[str, Any]:
+        """Get a background job's state, progress and error"""
+        response = self.session.get(self._url(f"jobs/{job_id}/"), headers=self._get_headers())
+        return self._handle_response(response)
+    
+    def download_report_job(self, job_id: int) -> bytes:
+        """Download the PDF produced by a succeeded report job"""
+        response = self.session.get(self._url(f"jobs/{job_id}/report/"), headers=self._get_headers())
         if not response.ok:
-            raise ApiError(f"Failed to download report: {response.status_code}", response.status_code)
+            self._handle_response(response)
         return response.content
+    
+    def wait_for_job(self, job: Dict[str, Any],
+                     on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     poll_interval: float = JOB_POLL_INTERVAL,
+                     failure: str = "Job failed") -> Dict[str, Any]:
+        """
+        Poll a background job until it finishes and return it; a failed job raises
+        ApiError with the server's error (or `failure`). on_progress(job) is called
+        with every status update.
+        """
+        while job["state"] not in ("succeeded", "failed"):
+            if on_progress:
+                on_progress(job)
+            time.sleep(poll_interval)
+            job = self.get_job(job["id"])
+        if on_progress:
+            on_progress(job)
+        if job["state"] == "failed":
+            error = job.get("error") or {}
+            raise ApiError(error.get("error", failure))
+        return job
+
+    def render_report(self, dataset_id: int,
+                      on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      poll_interval: float = JOB_POLL_INTERVAL) -> bytes:
+        """
+        Render a report in the background on the server, wait for it and download
+        it. on_progress(job) is called with every status update.
+        """
+        job = self.start_report(dataset_id)
+        job = self.wait_for_job(job, on_progress, poll_interval, failure="Report rendering failed")
+        return self.download_report_job(job["id"])
+
+
+def base_name(file_path: str) -> str:
+    return file_path.split('\\')[-1].split('/')[-1]
+
+
+def is_compressed(file_path: str) -> bool:
+    return file_path.lower().endswith(('.gz', '.zst', '.zip'))
+
+
+@contextmanager
+def compressed_copy(file_path: str, method: str, block_size: int = 1024 * 1024):
+    """
+    Stream-compress a file into a temporary file, yielding (temp_path, upload_name).
+    gzip output is deterministic (no timestamp), so re-uploads hash the same.
+    """
+    if method not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {method}")
+    suffix = COMPRESSION_SUFFIXES[method]
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as out, open(file_path, 'rb') as src:
+            if method == "gzip":
+                with gzip.GzipFile(filename='', mode='wb', fileobj=out, mtime=0) as writer:
+                    shutil.copyfileobj(src, writer, block_size)
+            else:
+                import zstandard
+                with zstandard.ZstdCompressor().stream_writer(out, closefd=False) as writer:
+                    shutil.copyfileobj(src, writer, block_size)
+        yield tmp_path, base_name(file_path) + suffix
+    finally:
+        os.remove(tmp_path)
+
+
+def decode_columns(response: requests.Response):
+    """
+    Decode an Arrow IPC or columnar JSON response into ({field: NumPy array},
+    everything else in the response or None).
+    """
+    if response.headers.get("Content-Type", "").startswith(ARROW_MEDIA_TYPE):
+        import pyarrow as pa
+        table = pa.ipc.open_stream(response.content).read_all()
+        metadata = table.schema.metadata or {}
+        meta = json.loads(metadata[b"meta"]) if b"meta" in metadata else None
+        columns = {name: table.column(name).to_numpy(zero_copy_only=False)
+                   for name in table.column_names}
+        return columns, meta
+    try:
+        data = response.json()
+    except ValueError:
+        return {}, {"error": "Invalid response from server"}
+    if not response.ok:
+        return {}, data
+    return {name: np.asarray(values) for name, values in data.items()}, None
+
+
+def file_sha256(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """Hash a file in blocks without reading it into memory"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 class ApiError(Exception):
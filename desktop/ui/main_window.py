@@ -18,7 +18,7 @@ from api import api_client, ApiError
 
 class DataLoadWorker(QObject):
     """Worker for loading dataset data"""
-    finished = pyqtSignal(dict, list)
+    finished = pyqtSignal(dict, dict, dict)
     error = pyqtSignal(str)
     
     def __init__(self, dataset_id: int):
@@ -28,8 +28,9 @@ class DataLoadWorker(QObject):
     def run(self):
         try:
             summary = api_client.get_summary(self.dataset_id)
-            equipment = api_client.get_equipment(self.dataset_id)
-            self.finished.emit(summary, equipment)
+            analytics = api_client.get_analytics(self.dataset_id)
+            scatter = api_client.get_scatter(self.dataset_id)
+            self.finished.emit(summary, analytics, scatter)
         except ApiError as e:
             self.error.emit(e.message)
         except Exception as e:
@@ -224,7 +225,7 @@ class MainWindow(QMainWindow):
         
         self.load_thread.start()
     
-    def _on_data_loaded(self, summary: dict, equipment: list):
+    def _on_data_loaded(self, summary: dict, analytics: dict, scatter: dict):
         """Handle loaded data"""
         # Get dataset info
         try:
@@ -235,8 +236,8 @@ class MainWindow(QMainWindow):
         
         # Update all views with data
         self.dashboard_view.update_stats(summary)
-        self.data_view.set_data(equipment)
-        self.charts_view.set_data(summary, equipment)
+        self.data_view.set_dataset(self.current_dataset_id, summary)
+        self.charts_view.set_data(summary, analytics, scatter)
         self.report_view.set_dataset(
             self.current_dataset_id, 
             self.current_dataset_name, 
@@ -117,7 +117,10 @@ class ChartsView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.summary_data = {}
-        self.equipment_data = []
+        # Per-type stats, histograms and correlation computed by the server
+        self.analytics = {}
+        # Temperature vs pressure sample, as returned by ApiClient.get_scatter
+        self.scatter = {}
         self._setup_ui()
     
     def _setup_ui(self):
@@ -204,12 +207,13 @@ class ChartsView(QWidget):
         layout.addWidget(self.no_data_alert)
         self.no_data_alert.hide()
     
-    def set_data(self, summary: dict, equipment: list):
+    def set_data(self, summary: dict, analytics: dict, scatter: dict):
         """Update charts with new data"""
         self.summary_data = summary
-        self.equipment_data = equipment
+        self.analytics = analytics
+        self.scatter = scatter
         
-        if not equipment:
+        if not self._has_rows():
             self.tabs.hide()
             self.no_data_alert.show()
             return
@@ -225,28 +229,24 @@ class ChartsView(QWidget):
         self._draw_correlation_chart()
         self._draw_histogram_chart()
     
+    def _has_rows(self) -> bool:
+        return self.analytics.get('count', 0) > 0
+    
     def _draw_bar_chart(self):
         """Draw bar chart showing averages by equipment type"""
         ax = self.bar_canvas.axes
         ax.clear()
         
-        if not self.equipment_data:
+        if not self._has_rows():
             return
         
-        # Calculate averages by type
-        type_data = {}
-        for eq in self.equipment_data:
-            eq_type = eq.get('equipment_type', 'Unknown')
-            if eq_type not in type_data:
-                type_data[eq_type] = {'flow': [], 'pressure': [], 'temp': []}
-            type_data[eq_type]['flow'].append(eq.get('flowrate', 0))
-            type_data[eq_type]['pressure'].append(eq.get('pressure', 0))
-            type_data[eq_type]['temp'].append(eq.get('temperature', 0))
-        
-        types = list(type_data.keys())
-        avg_flow = [sum(type_data[t]['flow'])/len(type_data[t]['flow']) for t in types]
-        avg_pres = [sum(type_data[t]['pressure'])/len(type_data[t]['pressure']) for t in types]
-        avg_temp = [sum(type_data[t]['temp'])/len(type_data[t]['temp']) for t in types]
+        # Averages by type, as computed at ingest
+        by_type = self.analytics.get('by_type', [])
+        types = [entry['type'] for entry in by_type]
+        avg_flow, avg_pres, avg_temp = (
+            [entry[field]['mean'] for entry in by_type]
+            for field in ('flowrate', 'pressure', 'temperature')
+        )
         
         x = range(len(types))
         width = 0.25
@@ -315,26 +315,24 @@ class ChartsView(QWidget):
         ax = self.scatter_canvas.axes
         ax.clear()
         
-        if not self.equipment_data:
+        if not self._has_rows():
             return
         
-        temps = [eq.get('temperature', 0) for eq in self.equipment_data]
-        pressures = [eq.get('pressure', 0) for eq in self.equipment_data]
-        types = [eq.get('equipment_type', 'Unknown') for eq in self.equipment_data]
-        
-        # Color by type
-        unique_types = list(set(types))
+        # The server sends at most a few thousand points, sampled per type
+        groups = sorted(self.scatter.get('groups', []), key=lambda group: group['type'])
         colors = ['#00D9A5', '#FF6B35', '#00A8E8', '#FFD166', '#EF476F', '#8338EC']
-        type_colors = {t: colors[i % len(colors)] for i, t in enumerate(unique_types)}
+        size = 60 if self.scatter.get('points', 0) <= 500 else 12
         
-        for eq_type in unique_types:
-            type_temps = [temps[i] for i in range(len(temps)) if types[i] == eq_type]
-            type_pres = [pressures[i] for i in range(len(pressures)) if types[i] == eq_type]
-            ax.scatter(type_temps, type_pres, c=type_colors[eq_type], label=eq_type, alpha=0.7, s=60)
+        for i, group in enumerate(groups):
+            if group['x']:
+                ax.scatter(group['x'], group['y'], c=colors[i % len(colors)], label=group['type'], alpha=0.7, s=size)
         
+        title = 'Temperature vs Pressure Correlation'
+        if self.scatter.get('points', 0) < self.scatter.get('count', 0):
+            title += f"\n({self.scatter['points']:,} of {self.scatter['count']:,} points)"
         ax.set_xlabel('Temperature', fontsize=10, color='#E8E8E8')
         ax.set_ylabel('Pressure', fontsize=10, color='#E8E8E8')
-        ax.set_title('Temperature vs Pressure Correlation', fontsize=12, fontweight='bold', color='#FFFFFF', pad=16)
+        ax.set_title(title, fontsize=12, fontweight='bold', color='#FFFFFF', pad=16)
         ax.legend(loc='upper right', facecolor='#252525', edgecolor='#444444', fontsize=9)
         ax.grid(alpha=0.3, color='#444444')
         
@@ -349,17 +347,11 @@ class ChartsView(QWidget):
         ax = self.corr_canvas.axes
         ax.clear()
         
-        if not self.equipment_data:
+        if not self._has_rows():
             return
             
-        # Extract data
-        temps = [eq.get('temperature', 0) for eq in self.equipment_data]
-        pressures = [eq.get('pressure', 0) for eq in self.equipment_data]
-        flows = [eq.get('flowrate', 0) for eq in self.equipment_data]
-        
-        # Compute correlation matrix
-        data = np.array([flows, pressures, temps])
-        corr_matrix = np.corrcoef(data)
+        # Correlation matrix computed at ingest; None where a parameter is constant
+        corr_matrix = np.array(self.analytics['correlation']['matrix'], dtype=float)
         labels = ['Flow', 'Pressure', 'Temp']
         
         # Plot heatmap
@@ -376,7 +368,7 @@ class ChartsView(QWidget):
         # Show values
         for i in range(len(labels)):
             for j in range(len(labels)):
-                text = ax.text(j, i, f"{corr_matrix[i, j]:.2f}",
+                text = ax.text(j, i, f"{corr_matrix[i, j]:.2f}" if np.isfinite(corr_matrix[i, j]) else "n/a",
                              ha="center", va="center", color="white",
                              fontweight="bold", fontsize=10)
                              
@@ -393,24 +385,21 @@ class ChartsView(QWidget):
         fig = self.hist_canvas.figure
         fig.clear()
         
-        if not self.equipment_data:
+        if not self._has_rows():
             return
             
-        # Extract data
-        flows = [eq.get('flowrate', 0) for eq in self.equipment_data]
-        pressures = [eq.get('pressure', 0) for eq in self.equipment_data]
-        temps = [eq.get('temperature', 0) for eq in self.equipment_data]
+        histograms = self.analytics['histograms']
         
         # Create subplots (1 row, 3 columns)
         axes = fig.subplots(1, 3)
         
         params = [
-            (flows, 'Flowrate', '#00D9A5'),
-            (pressures, 'Pressure', '#FF6B35'),
-            (temps, 'Temperature', '#00A8E8')
+            ('flowrate', 'Flowrate', '#00D9A5'),
+            ('pressure', 'Pressure', '#FF6B35'),
+            ('temperature', 'Temperature', '#00A8E8')
         ]
         
-        for i, (data, label, color) in enumerate(params):
+        for i, (field, label, color) in enumerate(params):
             ax = axes[i]
             ax.set_facecolor('#1A1A1A')
             ax.spines['bottom'].set_color('#444444')
@@ -419,7 +408,9 @@ class ChartsView(QWidget):
             ax.spines['right'].set_color('#444444')
             ax.tick_params(colors='#888888', labelsize=9)
             
-            ax.hist(data, bins=15, color=color, alpha=0.7, rwidth=0.9)
+            # Pre-binned on the server: one weighted sample per bin
+            edges = histograms[field]['edges']
+            ax.hist(edges[:-1], bins=edges, weights=histograms[field]['counts'], color=color, alpha=0.7, rwidth=0.9)
             ax.set_title(f'{label} Dist.', color='#E8E8E8', fontsize=11, fontweight='bold')
             ax.grid(axis='y', alpha=0.3, color='#444444')
             
@@ -6,17 +6,57 @@ from PyQt5.QtWidgets import (
     QTableWidget, QTableWidgetItem, QHeaderView,
     QPushButton, QLineEdit, QComboBox, QFrame, QSizePolicy
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QObject, QTimer
 from PyQt5.QtGui import QFont
 from ..components.cards import AlertCard
+from api import api_client, ApiError
+
+PAGE_SIZE = 200
+
+
+class EquipmentPageWorker(QObject):
+    """Worker for fetching one filtered page of equipment rows"""
+    finished = pyqtSignal(int, dict)
+    error = pyqtSignal(int, str)
+    
+    def __init__(self, request_id: int, dataset_id: int, cursor, filters: dict):
+        super().__init__()
+        self.request_id = request_id
+        self.dataset_id = dataset_id
+        self.cursor = cursor
+        self.filters = filters
+    
+    def run(self):
+        try:
+            page = api_client.get_equipment_page(
+                self.dataset_id, limit=PAGE_SIZE, cursor=self.cursor, **self.filters
+            )
+            self.finished.emit(self.request_id, page)
+        except ApiError as e:
+            self.error.emit(self.request_id, e.message)
+        except Exception as e:
+            self.error.emit(self.request_id, str(e))
 
 
 class DataTableView(QWidget):
-    """View for displaying equipment data in table format"""
+    """
+    View for displaying equipment data in table format. Rows are fetched a page
+    at a time and filtered on the server, so large datasets open instantly.
+    """
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.equipment_data = []
+        self.dataset_id = None
+        self.total_count = 0
+        self.loaded_rows = 0
+        self.next_cursor = None
+        self._request_id = 0
+        self._threads = []
+        # Wait for typing to pause before asking the server
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(300)
+        self._filter_timer.timeout.connect(self._reload)
         self._setup_ui()
     
     def _setup_ui(self):
@@ -53,7 +93,7 @@ class DataTableView(QWidget):
         self.search_input.setPlaceholderText("🔍  Search by name or type...")
         self.search_input.setMinimumWidth(350)
         self.search_input.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        self.search_input.textChanged.connect(self._filter_data)
+        self.search_input.textChanged.connect(self._filter_timer.start)
         filter_row.addWidget(self.search_input, 1)
         
         # Type filter
@@ -64,7 +104,7 @@ class DataTableView(QWidget):
         self.type_filter = QComboBox()
         self.type_filter.addItem("All Types")
         self.type_filter.setMinimumWidth(150)
-        self.type_filter.currentTextChanged.connect(self._filter_data)
+        self.type_filter.currentTextChanged.connect(self._reload)
         filter_row.addWidget(self.type_filter)
         
         filter_row.addStretch()
@@ -97,6 +137,12 @@ class DataTableView(QWidget):
         
         layout.addWidget(self.table)
         
+        # Next page
+        self.load_more_btn = QPushButton("Load more")
+        self.load_more_btn.clicked.connect(self._load_more)
+        self.load_more_btn.hide()
+        layout.addWidget(self.load_more_btn, 0, Qt.AlignCenter)
+        
         # No data placeholder
         self.no_data_alert = AlertCard(
             "No equipment data available. Upload a CSV file to view data.",
@@ -104,23 +150,80 @@ class DataTableView(QWidget):
         )
         layout.addWidget(self.no_data_alert)
     
-    def set_data(self, equipment_list: list):
-        """Set table data from equipment list"""
-        self.equipment_data = equipment_list
-        self._populate_table(equipment_list)
-        self._update_type_filter(equipment_list)
-        
-        # Show/hide elements based on data
-        has_data = len(equipment_list) > 0
+    def set_dataset(self, dataset_id: int, summary: dict):
+        """Show a dataset; the type filter comes from its summary, rows from the server"""
+        self.dataset_id = dataset_id
+        self.total_count = summary.get('total_count', 0)
+        self._update_type_filter(summary.get('type_distribution', {}))
+        self._reload()
+    
+    def _filters(self) -> dict:
+        selected_type = self.type_filter.currentText()
+        return {
+            'search': self.search_input.text().strip(),
+            'type': '' if selected_type == "All Types" else selected_type,
+        }
+    
+    def _reload(self):
+        """Fetch the first page for the current filters"""
+        if self.dataset_id is None:
+            return
+        self.table.setRowCount(0)
+        self.loaded_rows = 0
+        self.next_cursor = None
+        self._fetch(None)
+    
+    def _load_more(self):
+        if self.next_cursor:
+            self.load_more_btn.setEnabled(False)
+            self._fetch(self.next_cursor)
+    
+    def _fetch(self, cursor):
+        self._request_id += 1
+        thread = QThread()
+        worker = EquipmentPageWorker(self._request_id, self.dataset_id, cursor, self._filters())
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(self._on_page_loaded)
+        worker.error.connect(self._on_page_error)
+        worker.finished.connect(thread.quit)
+        worker.error.connect(thread.quit)
+        thread.finished.connect(lambda: self._threads.remove((thread, worker)))
+        self._threads.append((thread, worker))
+        thread.start()
+    
+    def _on_page_loaded(self, request_id: int, page: dict):
+        if request_id != self._request_id:
+            return  # Superseded by a newer filter
+        rows = page.get('results', [])
+        self._populate_table(rows, append=True)
+        self.loaded_rows += len(rows)
+        self.next_cursor = page.get('next_cursor')
+        self.load_more_btn.setEnabled(True)
+        self.load_more_btn.setVisible(bool(self.next_cursor))
+        
+        filtered = any(self._filters().values())
+        has_data = self.loaded_rows > 0 or filtered
         self.table.setVisible(has_data)
         self.no_data_alert.setVisible(not has_data)
-        self.count_label.setText(f"{len(equipment_list)} records")
+        more = "+" if self.next_cursor else ""
+        if filtered:
+            self.count_label.setText(f"{self.loaded_rows}{more} of {self.total_count} records")
+        else:
+            self.count_label.setText(f"{self.loaded_rows}{more} of {self.total_count} records loaded")
+    
+    def _on_page_error(self, request_id: int, message: str):
+        if request_id != self._request_id:
+            return
+        self.load_more_btn.setEnabled(True)
+        self.count_label.setText(f"Could not load rows: {message}")
     
-    def _populate_table(self, data: list):
-        """Populate table with data"""
-        self.table.setRowCount(len(data))
+    def _populate_table(self, data: list, append: bool = False):
+        """Populate table with data, optionally after the rows already shown"""
+        start = self.table.rowCount() if append else 0
+        self.table.setRowCount(start + len(data))
         
-        for row, equipment in enumerate(data):
+        for row, equipment in enumerate(data, start):
             name_item = QTableWidgetItem(equipment.get('equipment_name', ''))
             type_item = QTableWidgetItem(equipment.get('equipment_type', ''))
             
@@ -146,14 +249,14 @@ class DataTableView(QWidget):
             self.table.setItem(row, 3, pres_item)
             self.table.setItem(row, 4, temp_item)
     
-    def _update_type_filter(self, data: list):
+    def _update_type_filter(self, type_distribution: dict):
         """Update type filter dropdown with available types"""
         current = self.type_filter.currentText()
+        self.type_filter.blockSignals(True)
         self.type_filter.clear()
         self.type_filter.addItem("All Types")
         
-        types = sorted(set(eq.get('equipment_type', '') for eq in data))
-        for t in types:
+        for t in sorted(type_distribution):
             if t:
                 self.type_filter.addItem(t)
         
@@ -161,26 +264,4 @@ class DataTableView(QWidget):
         idx = self.type_filter.findText(current)
         if idx >= 0:
             self.type_filter.setCurrentIndex(idx)
-    
-    def _filter_data(self):
-        """Filter table based on search and type filter"""
-        search_text = self.search_input.text().lower()
-        selected_type = self.type_filter.currentText()
-        
-        filtered = []
-        for eq in self.equipment_data:
-            name = eq.get('equipment_name', '').lower()
-            eq_type = eq.get('equipment_type', '')
-            
-            # Search filter
-            if search_text and search_text not in name and search_text not in eq_type.lower():
-                continue
-            
-            # Type filter
-            if selected_type != "All Types" and eq_type != selected_type:
-                continue
-            
-            filtered.append(eq)
-        
-        self._populate_table(filtered)
-        self.count_label.setText(f"{len(filtered)} of {len(self.equipment_data)} records")
+        self.type_filter.blockSignals(False)
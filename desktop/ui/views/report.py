@@ -3,7 +3,7 @@ Report View - PDF report generation and download
 """
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-    QPushButton, QFileDialog, QFrame, QSizePolicy
+    QPushButton, QFileDialog, QFrame, QSizePolicy, QProgressBar
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QThread, QObject
 from PyQt5.QtGui import QFont
@@ -12,8 +12,9 @@ from api import api_client, ApiError
 
 
 class ReportDownloadWorker(QObject):
-    """Worker thread for downloading report"""
+    """Worker thread that has the server render the report, then downloads it"""
     finished = pyqtSignal(bytes, str)
+    progress = pyqtSignal(str, int)  # job state, percent done
     error = pyqtSignal(str)
     
     def __init__(self, dataset_id: int, dataset_name: str):
@@ -23,7 +24,10 @@ class ReportDownloadWorker(QObject):
     
     def run(self):
         try:
-            pdf_data = api_client.download_report(self.dataset_id)
+            pdf_data = api_client.render_report(
+                self.dataset_id,
+                on_progress=lambda job: self.progress.emit(job["state"], int(job.get("progress", 0) * 100)),
+            )
             self.finished.emit(pdf_data, self.dataset_name)
         except ApiError as e:
             self.error.emit(e.message)
@@ -183,6 +187,14 @@ class ReportView(QWidget):
         
         layout.addWidget(action_container)
         
+        # Render progress reported by the server
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        self.progress.setFixedHeight(8)
+        self.progress.setTextVisible(False)
+        self.progress.hide()
+        layout.addWidget(self.progress)
+        
         # Status & Alerts
         self.status_container = QWidget()
         self.status_container.setStyleSheet("background-color: transparent;")
@@ -219,6 +231,8 @@ class ReportView(QWidget):
             return
         
         self.download_btn.setEnabled(False)
+        self.progress.setValue(0)
+        self.progress.show()
         self._show_status("Generating report...", "info")
         
         self.download_thread = QThread()
@@ -229,6 +243,7 @@ class ReportView(QWidget):
         self.download_worker.moveToThread(self.download_thread)
         
         self.download_thread.started.connect(self.download_worker.run)
+        self.download_worker.progress.connect(self._on_progress)
         self.download_worker.finished.connect(self._on_download_success)
         self.download_worker.error.connect(self._on_download_error)
         self.download_worker.finished.connect(self.download_thread.quit)
@@ -236,9 +251,20 @@ class ReportView(QWidget):
         
         self.download_thread.start()
     
+    def _on_progress(self, state: str, percent: int):
+        """Show the server-side render's progress"""
+        self.progress.setValue(percent)
+        if state == "queued":
+            self._show_status("Waiting for a report worker...", "info")
+        elif state == "running":
+            self._show_status(f"Generating report... {percent}%", "info")
+        elif state == "succeeded":
+            self._show_status("Downloading report...", "info")
+    
     def _on_download_success(self, pdf_data: bytes, dataset_name: str):
         """Handle successful download"""
         self.download_btn.setEnabled(True)
+        self.progress.hide()
         
         # Open save dialog
         default_name = f"{dataset_name.replace('.csv', '')}_report.pdf"
@@ -259,6 +285,7 @@ class ReportView(QWidget):
     def _on_download_error(self, error_msg: str):
         """Handle download error"""
         self.download_btn.setEnabled(True)
+        self.progress.hide()
         self._show_status(f"❌ Error: {error_msg}", "error")
     
     def _show_status(self, message: str, status_type: str):
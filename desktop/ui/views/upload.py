@@ -1,6 +1,8 @@
 """
 CSV Upload View - File selection and upload interface
 """
+import os
+
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QFileDialog, QProgressBar, QFrame
@@ -10,10 +12,27 @@ from PyQt5.QtGui import QFont, QDragEnterEvent, QDropEvent
 from ..components.cards import AlertCard
 from api import api_client, ApiError
 
+UPLOAD_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst', '.zip')
+
+
+def expand_paths(paths):
+    """Returns the uploadable files among paths, walking into any folders."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, n) for n in sorted(names)
+                             if n.lower().endswith(UPLOAD_SUFFIXES))
+        elif path.lower().endswith(UPLOAD_SUFFIXES):
+            files.append(path)
+    return files
+
 
 class UploadWorker(QObject):
     """Worker thread for file upload"""
     finished = pyqtSignal(dict)
+    progress = pyqtSignal(str, int)  # ingest job state, percent done
     error = pyqtSignal(str)
     
     def __init__(self, file_path: str):
@@ -22,7 +41,29 @@ class UploadWorker(QObject):
     
     def run(self):
         try:
-            result = api_client.upload_csv(self.file_path)
+            result = api_client.upload_file(
+                self.file_path, compress="gzip",
+                on_progress=lambda job: self.progress.emit(job["state"], int(job.get("progress", 0) * 100)),
+            )
+            self.finished.emit(result)
+        except ApiError as e:
+            self.error.emit(e.message)
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class BatchUploadWorker(QObject):
+    """Worker thread for uploading several files as one batch"""
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, file_paths: list):
+        super().__init__()
+        self.file_paths = file_paths
+
+    def run(self):
+        try:
+            result = api_client.upload_batch(self.file_paths, compress="gzip")
             self.finished.emit(result)
         except ApiError as e:
             self.error.emit(e.message)
@@ -33,7 +74,7 @@ class UploadWorker(QObject):
 class DropZone(QFrame):
     """Drag and drop zone for file upload"""
     
-    file_dropped = pyqtSignal(str)
+    files_dropped = pyqtSignal(list)
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -54,7 +95,7 @@ class DropZone(QFrame):
         self.icon_label.setAlignment(Qt.AlignCenter)
         
         # Text
-        self.main_text = QLabel("Drag & Drop CSV file here")
+        self.main_text = QLabel("Drag & Drop CSV files or a folder here")
         self.main_text.setFont(QFont("Source Sans 3", 16, QFont.DemiBold))
         self.main_text.setStyleSheet("color: #E8E8E8;")
         self.main_text.setAlignment(Qt.AlignCenter)
@@ -92,8 +133,8 @@ class DropZone(QFrame):
     
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
-            urls = event.mimeData().urls()
-            if urls and urls[0].toLocalFile().endswith('.csv'):
+            paths = [url.toLocalFile() for url in event.mimeData().urls()]
+            if any(os.path.isdir(p) or p.lower().endswith(UPLOAD_SUFFIXES) for p in paths):
                 event.acceptProposedAction()
                 self._set_hover_style()
                 return
@@ -104,18 +145,16 @@ class DropZone(QFrame):
     
     def dropEvent(self, event: QDropEvent):
         self._set_normal_style()
-        urls = event.mimeData().urls()
-        if urls:
-            file_path = urls[0].toLocalFile()
-            if file_path.endswith('.csv'):
-                self.file_dropped.emit(file_path)
+        files = expand_paths(url.toLocalFile() for url in event.mimeData().urls())
+        if files:
+            self.files_dropped.emit(files)
     
     def mousePressEvent(self, event):
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select CSV File", "", "CSV Files (*.csv)"
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select CSV Files", "", "CSV Files (*.csv *.csv.gz *.csv.zst *.zip)"
         )
-        if file_path:
-            self.file_dropped.emit(file_path)
+        if file_paths:
+            self.files_dropped.emit(file_paths)
 
 
 class UploadView(QWidget):
@@ -143,7 +182,7 @@ class UploadView(QWidget):
         header.setFont(QFont("Source Sans 3", 24, QFont.Bold))
         layout.addWidget(header)
         
-        subtitle = QLabel("Upload a CSV file containing chemical equipment data")
+        subtitle = QLabel("Upload one or more CSV files containing chemical equipment data")
         subtitle.setObjectName("muted")
         subtitle.setFont(QFont("Source Sans 3", 13))
         layout.addWidget(subtitle)
@@ -152,9 +191,14 @@ class UploadView(QWidget):
         
         # Drop zone
         self.drop_zone = DropZone()
-        self.drop_zone.file_dropped.connect(self._on_file_selected)
+        self.drop_zone.files_dropped.connect(self._on_files_selected)
         layout.addWidget(self.drop_zone, 0, Qt.AlignCenter)
         
+        folder_btn = QPushButton("Choose Folder…")
+        folder_btn.setFont(QFont("Source Sans 3", 12))
+        folder_btn.clicked.connect(self._choose_folder)
+        layout.addWidget(folder_btn, 0, Qt.AlignCenter)
+        
         # Selected file info
         self.file_info = QLabel("")
         self.file_info.setFont(QFont("JetBrains Mono", 12))
@@ -201,11 +245,11 @@ class UploadView(QWidget):
         
         layout.addStretch()
         
-        self.selected_file = None
+        self.selected_files = []
     
     def reset_state(self):
         """Reset view state when navigating to it"""
-        self.selected_file = None
+        self.selected_files = []
         self.file_info.hide()
         self.progress.hide()
         self.upload_btn.setEnabled(False)
@@ -219,46 +263,98 @@ class UploadView(QWidget):
                 widget.setParent(None)
                 widget.deleteLater()
     
-    def _on_file_selected(self, file_path: str):
+    def _choose_folder(self):
+        """Select every CSV in a folder"""
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder")
+        if not folder:
+            return
+        files = expand_paths([folder])
+        if files:
+            self._on_files_selected(files)
+        else:
+            self._show_status("No CSV files found in that folder.", "error")
+    
+    def _on_files_selected(self, file_paths: list):
         """Handle file selection"""
-        self.selected_file = file_path
-        file_name = file_path.split('/')[-1].split('\\')[-1]
-        self.file_info.setText(f"📄 {file_name}")
+        self.selected_files = list(file_paths)
+        if len(file_paths) == 1:
+            file_name = file_paths[0].split('/')[-1].split('\\')[-1]
+            self.file_info.setText(f"📄 {file_name}")
+            message = "File selected. Click 'Upload to Server' to proceed."
+        else:
+            self.file_info.setText(f"📄 {len(file_paths)} files")
+            message = f"{len(file_paths)} files selected. Click 'Upload to Server' to upload them as one batch."
         self.file_info.show()
         self.upload_btn.setEnabled(True)
-        self._show_status("File selected. Click 'Upload to Server' to proceed.", "info")
+        self._show_status(message, "info")
     
     def _start_upload(self):
         """Start file upload in background thread"""
-        if not self.selected_file:
+        if not self.selected_files:
             return
         
         self.upload_btn.setEnabled(False)
+        self.progress.setRange(0, 0)  # Indeterminate until the server reports progress
         self.progress.show()
         self._show_status("Uploading...", "info")
         
         # Create worker and thread
         self.upload_thread = QThread()
-        self.upload_worker = UploadWorker(self.selected_file)
+        if len(self.selected_files) == 1:
+            self.upload_worker = UploadWorker(self.selected_files[0])
+            self.upload_worker.progress.connect(self._on_progress)
+            self.upload_worker.finished.connect(self._on_upload_success)
+        else:
+            self.upload_worker = BatchUploadWorker(self.selected_files)
+            self.upload_worker.finished.connect(self._on_batch_success)
         self.upload_worker.moveToThread(self.upload_thread)
         
         # Connect signals
         self.upload_thread.started.connect(self.upload_worker.run)
-        self.upload_worker.finished.connect(self._on_upload_success)
         self.upload_worker.error.connect(self._on_upload_error)
         self.upload_worker.finished.connect(self.upload_thread.quit)
         self.upload_worker.error.connect(self.upload_thread.quit)
         
         self.upload_thread.start()
     
+    def _on_progress(self, state: str, percent: int):
+        """Show the progress of an ingest the server queued as a background job"""
+        self.progress.setRange(0, 100)
+        self.progress.setValue(percent)
+        if state == "queued":
+            self._show_status("Uploaded. Waiting for the server to process it...", "info")
+        elif state == "running":
+            self._show_status(f"Processing on the server... {percent}%", "info")
+    
     def _on_upload_success(self, result: dict):
         """Handle successful upload"""
         self.progress.hide()
         self._show_status("✅ Upload successful! Dataset processed.", "success")
-        self.selected_file = None
+        self.selected_files = []
         self.file_info.hide()
         self.upload_complete.emit(result)
     
+    def _on_batch_success(self, result: dict):
+        """Handle a finished batch: summarize per-file outcomes and open the last new dataset"""
+        self.progress.hide()
+        self.selected_files = []
+        self.file_info.hide()
+        
+        message = (f"Batch finished: {result.get('created', 0)} created, "
+                   f"{result.get('duplicates', 0)} already uploaded, {result.get('failed', 0)} failed.")
+        failures = [r for r in result.get('results', []) if r.get('status') == 'failed']
+        for failure in failures[:5]:
+            message += f"\n❌ {failure['file']}: {failure.get('error', 'failed')}"
+        if len(failures) > 5:
+            message += f"\n… and {len(failures) - 5} more"
+        self._show_status(message, "warning" if failures else "success")
+        
+        loaded = [r for r in result.get('results', []) if r.get('dataset')]
+        if loaded:
+            last = loaded[-1]
+            name = last['file'].split('/')[-1].split('\\')[-1]
+            self.upload_complete.emit({'id': last['dataset'], 'name': name})
+    
     def _on_upload_error(self, error_msg: str):
         """Handle upload error"""
         self.progress.hide()
@@ -9,8 +9,7 @@ import {
     Legend,
 } from 'chart.js';
 import { Bar } from 'react-chartjs-2';
-import type { Equipment } from '../../services/api';
-import { calculateAveragesByType } from '../../utils/analytics';
+import type { Analytics } from '../../services/api';
 import { Card } from '../ui/Card';
 
 ChartJS.register(
@@ -23,12 +22,12 @@ ChartJS.register(
 );
 
 interface BarChartProps {
-    data: Equipment[];
+    analytics: Analytics;
 }
 
-export const BarChart = ({ data }: BarChartProps) => {
+export const BarChart = ({ analytics }: BarChartProps) => {
     const chartData = useMemo(() => {
-        const averages = calculateAveragesByType(data);
+        const averages = analytics.by_type;
         const labels = averages.map(a => a.type);
 
         return {
@@ -36,22 +35,22 @@ export const BarChart = ({ data }: BarChartProps) => {
             datasets: [
                 {
                     label: 'Avg Flowrate',
-                    data: averages.map(a => a.flowrate),
+                    data: averages.map(a => a.flowrate.mean),
                     backgroundColor: '#00D9A5',
                 },
                 {
                     label: 'Avg Pressure',
-                    data: averages.map(a => a.pressure),
+                    data: averages.map(a => a.pressure.mean),
                     backgroundColor: '#FF6B35',
                 },
                 {
                     label: 'Avg Temperature',
-                    data: averages.map(a => a.temperature),
+                    data: averages.map(a => a.temperature.mean),
                     backgroundColor: '#00A8E8',
                 },
             ],
         };
-    }, [data]);
+    }, [analytics]);
 
     const options = {
         responsive: true,
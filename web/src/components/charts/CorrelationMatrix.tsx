@@ -1,36 +1,17 @@
 import { useMemo } from 'react';
-import type { Equipment } from '../../services/api';
-import { calculateCorrelation } from '../../utils/analytics';
+import type { Analytics } from '../../services/api';
 import { Card } from '../ui/Card';
 
 interface CorrelationMatrixProps {
-    data: Equipment[];
+    analytics: Analytics;
 }
 
-export const CorrelationMatrix = ({ data }: CorrelationMatrixProps) => {
-    const matrix = useMemo(() => {
-        const flow = data.map(d => d.flowrate);
-        const pressure = data.map(d => d.pressure);
-        const temp = data.map(d => d.temperature);
-
-        return [
-            [
-                calculateCorrelation(flow, flow),
-                calculateCorrelation(flow, pressure),
-                calculateCorrelation(flow, temp)
-            ],
-            [
-                calculateCorrelation(pressure, flow),
-                calculateCorrelation(pressure, pressure),
-                calculateCorrelation(pressure, temp)
-            ],
-            [
-                calculateCorrelation(temp, flow),
-                calculateCorrelation(temp, pressure),
-                calculateCorrelation(temp, temp)
-            ]
-        ];
-    }, [data]);
+export const CorrelationMatrix = ({ analytics }: CorrelationMatrixProps) => {
+    // Constant parameters have no correlation (null); show them as 0
+    const matrix = useMemo(
+        () => analytics.correlation.matrix.map(row => row.map(val => val ?? 0)),
+        [analytics]
+    );
 
     const labels = ['Flow', 'Pressure', 'Temp'];
 
@@ -9,23 +9,22 @@ import {
     Legend,
 } from 'chart.js';
 import { Bar } from 'react-chartjs-2';
-import type { Equipment } from '../../services/api';
-import { calculateHistogram } from '../../utils/analytics';
+import type { Analytics, Parameter } from '../../services/api';
+import { histogramBins } from '../../utils/analytics';
 import { Card } from '../ui/Card';
 
 ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend);
 
 interface HistogramChartProps {
-    data: Equipment[];
-    parameter: 'flowrate' | 'pressure' | 'temperature';
+    analytics: Analytics;
+    parameter: Parameter;
     label: string;
     color: string;
 }
 
-export const HistogramChart = ({ data, parameter, label, color }: HistogramChartProps) => {
+export const HistogramChart = ({ analytics, parameter, label, color }: HistogramChartProps) => {
     const chartData = useMemo(() => {
-        const values = data.map(d => d[parameter]);
-        const bins = calculateHistogram(values, 10);
+        const bins = histogramBins(analytics, parameter);
 
         return {
             labels: bins.map(b => b.label),
@@ -39,7 +38,7 @@ export const HistogramChart = ({ data, parameter, label, color }: HistogramChart
                 },
             ],
         };
-    }, [data, parameter, label, color]);
+    }, [analytics, parameter, label, color]);
 
     const options = {
         responsive: true,
@@ -8,34 +8,28 @@ import {
     Legend,
 } from 'chart.js';
 import { Scatter } from 'react-chartjs-2';
-import type { Equipment } from '../../services/api';
+import type { ScatterSample } from '../../services/api';
 import { Card } from '../ui/Card';
 
 ChartJS.register(LinearScale, PointElement, LineElement, Tooltip, Legend);
 
 interface ScatterChartProps {
-    data: Equipment[];
+    sample: ScatterSample;
 }
 
-export const ScatterChart = ({ data }: ScatterChartProps) => {
+export const ScatterChart = ({ sample }: ScatterChartProps) => {
     const chartData = useMemo(() => {
-        const datasets: { label: string; data: { x: number; y: number; }[]; backgroundColor: string; }[] = [];
-        const types = Array.from(new Set(data.map(d => d.equipment_type)));
         const colors = ['#00D9A5', '#FF6B35', '#00A8E8', '#FFD166', '#EF476F', '#8338EC'];
-
-        types.forEach((type, index) => {
-            datasets.push({
-                label: type,
-                data: data.filter(d => d.equipment_type === type).map(d => ({
-                    x: d.temperature,
-                    y: d.pressure
-                })),
-                backgroundColor: colors[index % colors.length],
-            });
-        });
+        // The server sends at most a few thousand points, already split by type
+        const datasets = sample.groups.map((group, index) => ({
+            label: group.type,
+            data: group.x.map((x, i) => ({ x, y: group.y[i] })),
+            backgroundColor: colors[index % colors.length],
+            pointRadius: sample.points > 500 ? 2 : 3,
+        }));
 
         return { datasets };
-    }, [data]);
+    }, [sample]);
 
     const options = {
         responsive: true,
@@ -61,7 +55,14 @@ export const ScatterChart = ({ data }: ScatterChartProps) => {
 
     return (
         <Card className="p-4 bg-bg-secondary w-full">
-            <h3 className="text-xl font-heading font-semibold text-white mb-4">Temperature vs Pressure</h3>
+            <h3 className="text-xl font-heading font-semibold text-white mb-4">
+                Temperature vs Pressure
+                {sample.points < sample.count && (
+                    <span className="text-sm font-normal text-text-secondary ml-2">
+                        {sample.points.toLocaleString()} of {sample.count.toLocaleString()} points
+                    </span>
+                )}
+            </h3>
             <Scatter options={options} data={chartData} />
         </Card>
     );
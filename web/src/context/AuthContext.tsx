@@ -62,6 +62,10 @@ export const AuthProvider = ({ children }: { children: ReactNode }) => {
     };
 
     const logout = () => {
+        // Revoke the token server-side; the local session ends either way
+        if (token) {
+            authService.logout(token).catch(() => undefined);
+        }
         setToken(null);
         setUser(null);
         localStorage.removeItem('token');
@@ -10,11 +10,13 @@ import { HistogramChart } from '../components/charts/HistogramChart';
 import { CorrelationMatrix } from '../components/charts/CorrelationMatrix';
 import { Activity, Thermometer, Droplets, Wind, FileText, Download } from 'lucide-react';
 import { datasetService } from '../services/api';
-import type { Dataset } from '../services/api';
+import type { Analytics, Dataset, ScatterSample } from '../services/api';
 
 export const Dashboard = () => {
     const navigate = useNavigate();
     const [dataset, setDataset] = useState<Dataset | null>(null);
+    const [analytics, setAnalytics] = useState<Analytics | null>(null);
+    const [scatter, setScatter] = useState<ScatterSample | null>(null);
     const [loading, setLoading] = useState(true);
     const [downloading, setDownloading] = useState(false);
 
@@ -26,9 +28,15 @@ export const Dashboard = () => {
         try {
             const history = await datasetService.getHistory();
             if (history.length > 0) {
-                // Fetch full details of the latest dataset
-                const fullData = await datasetService.getById(history[0].id);
+                // Charts are drawn from server-side aggregates, so the rows are not fetched
+                const [fullData, chartData, sample] = await Promise.all([
+                    datasetService.getById(history[0].id, 'summary'),
+                    datasetService.getAnalytics(history[0].id),
+                    datasetService.getScatter(history[0].id),
+                ]);
                 setDataset(fullData);
+                setAnalytics(chartData);
+                setScatter(sample);
             }
         } catch (error) {
             console.error("Failed to load data", error);
@@ -57,7 +65,7 @@ export const Dashboard = () => {
         );
     }
 
-    if (!dataset || !dataset.summary || !dataset.equipment) {
+    if (!dataset || !dataset.summary || !analytics || !scatter) {
         return (
             <div className="flex flex-col items-center justify-center h-full text-text-secondary">
                 <FileText className="w-16 h-16 mb-4 opacity-50" />
@@ -70,7 +78,7 @@ export const Dashboard = () => {
         );
     }
 
-    const { summary, equipment } = dataset;
+    const { summary } = dataset;
 
     return (
         <div className="space-y-6">
@@ -119,18 +127,18 @@ export const Dashboard = () => {
             {/* Charts Grid */}
             <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
                 {/* Row 1: Bar & Pie */}
-                <BarChart data={equipment} />
+                <BarChart analytics={analytics} />
                 <PieChart distribution={summary.type_distribution} />
 
                 {/* Row 2: Scatter & Correlation */}
-                <ScatterChart data={equipment} />
-                <CorrelationMatrix data={equipment} />
+                <ScatterChart sample={scatter} />
+                <CorrelationMatrix analytics={analytics} />
 
                 {/* Row 3: Histograms */}
                 <div className="lg:col-span-2 grid grid-cols-1 md:grid-cols-3 gap-6">
-                    <HistogramChart data={equipment} parameter="flowrate" label="Flowrate" color="#00D9A5" />
-                    <HistogramChart data={equipment} parameter="pressure" label="Pressure" color="#FF6B35" />
-                    <HistogramChart data={equipment} parameter="temperature" label="Temperature" color="#00A8E8" />
+                    <HistogramChart analytics={analytics} parameter="flowrate" label="Flowrate" color="#00D9A5" />
+                    <HistogramChart analytics={analytics} parameter="pressure" label="Pressure" color="#FF6B35" />
+                    <HistogramChart analytics={analytics} parameter="temperature" label="Temperature" color="#00A8E8" />
                 </div>
             </div>
         </div>
@@ -24,6 +24,46 @@ export interface Dataset {
     equipment?: Equipment[];
 }
 
+export interface ParameterStats {
+    mean: number;
+    std: number;
+    min: number;
+    max: number;
+}
+
+export type Parameter = 'flowrate' | 'pressure' | 'temperature';
+
+// Chart-ready aggregates computed by the server at ingest
+export interface Analytics {
+    count: number;
+    by_type: ({ type: string; count: number } & Record<Parameter, ParameterStats>)[];
+    histograms: Record<Parameter, { edges: number[]; counts: number[] }>;
+    correlation: { fields: Parameter[]; matrix: (number | null)[][] };
+}
+
+// At most `points` rows of x against y, sampled per equipment type
+export interface ScatterSample {
+    mode: 'sample';
+    x: Parameter;
+    y: Parameter;
+    count: number;
+    points: number;
+    groups: { type: string; count: number; x: number[]; y: number[] }[];
+}
+
+// A background job on the server (queued ingest, report render)
+export interface Job {
+    id: number;
+    kind: string;
+    state: 'queued' | 'running' | 'succeeded' | 'failed';
+    dataset: number | null;
+    progress: number;
+    error: { error?: string } | null;
+}
+
+// Seconds between status requests while a job runs on the server
+const JOB_POLL_INTERVAL = 1;
+
 // Auth Service
 export const authService = {
     login: async (username: string, password: string) => {
@@ -34,6 +74,10 @@ export const authService = {
         const response = await api.post('register/', { username, password, email });
         return response.data;
     },
+    logout: async (token: string) => {
+        // Sent explicitly: the stored token is cleared before the request goes out
+        await api.post('logout/', null, { headers: { Authorization: `Token ${token}` } });
+    },
     validateToken: async () => {
         const response = await api.get('validate-token/');
         return response.data;
@@ -42,25 +86,62 @@ export const authService = {
 
 export const datasetService = {
 
-    upload: async (file: File) => {
+    upload: async (file: File, onProgress?: (job: Job) => void) => {
         const formData = new FormData();
         formData.append('file', file);
         const response = await api.post('upload/', formData, {
             headers: { 'Content-Type': 'multipart/form-data' },
         });
+        if (response.status !== 202) {
+            return response.data as Dataset;
+        }
+        // The server queued the ingest: wait for the job, then load what it created
+        const job = await datasetService.waitForJob(response.data as Job, onProgress);
+        return datasetService.getById(job.dataset as number, 'summary');
+    },
+
+    getJob: async (id: number) => {
+        const response = await api.get<Job>(`jobs/${id}/`);
         return response.data;
     },
 
+    waitForJob: async (job: Job, onProgress?: (job: Job) => void) => {
+        while (job.state !== 'succeeded' && job.state !== 'failed') {
+            onProgress?.(job);
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL * 1000));
+            job = await datasetService.getJob(job.id);
+        }
+        onProgress?.(job);
+        if (job.state === 'failed') {
+            throw new Error(job.error?.error ?? 'Job failed');
+        }
+        return job;
+    },
+
     getAll: async () => {
         const response = await api.get<Dataset[]>('datasets/');
         return response.data;
     },
 
-    getById: async (id: number) => {
-        const response = await api.get<Dataset>(`datasets/${id}/`);
-        // Fetch equipment and summary if not included (depending on API design)
-        // Desktop app sees them in detail endpoints, but let's assume getById might need extra calls if serializer is minimal.
-        // Based on serializers.py, DatasetSerializer includes equipment and summary.
+    getById: async (id: number, include = 'equipment,summary') => {
+        // The row list is only sent when asked for
+        const response = await api.get<Dataset>(`datasets/${id}/`, {
+            params: { include },
+        });
+        return response.data;
+    },
+
+    getAnalytics: async (id: number, bins?: number) => {
+        const response = await api.get<Analytics>(`datasets/${id}/analytics/`, {
+            params: bins ? { bins } : undefined,
+        });
+        return response.data;
+    },
+
+    getScatter: async (id: number, x: Parameter = 'temperature', y: Parameter = 'pressure', points?: number) => {
+        const response = await api.get<ScatterSample>(`datasets/${id}/scatter/`, {
+            params: points ? { x, y, points } : { x, y },
+        });
         return response.data;
     },
 